@@ -0,0 +1,90 @@
+"""
+Benchmark: construção do cubo em série x pool de processos por faixas de linhas.
+
+Para cada tamanho de base sintética (gerada ou reaproveitada), mede a
+construção do cubo em série — o caminho padrão de load_cube — e com 2, 4, ...
+processos (construir_cubo_paralelo, inclusive a partida do pool), conferindo
+que o cubo combinado é igual ao construído em série. Ao final, indica a menor
+base em que o pool vence a série nesta máquina: é esse o valor a considerar
+antes de definir HR_PROCESSOS (ver partitioned_store).
+
+Uso:
+    python benchmarks/bench_particoes.py --linhas 1000000 5000000 20000000 --processos 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'streamlit'))
+
+from aggregate_cube import DIMENSOES, MEDIDAS, AggregateCube  # noqa: E402
+from data_store import ensure_store, load_columns  # noqa: E402
+from gerar_dados import gerar_csv  # noqa: E402
+from partitioned_store import construir_cubo_paralelo  # noqa: E402
+
+DADOS_DIR = Path(__file__).resolve().parent / '.data'
+
+
+def _ordenar(cubo: AggregateCube):
+    cells = cubo.cells.copy()
+    for col in DIMENSOES:
+        cells[col] = cells[col].astype(str)
+    return cells.sort_values(DIMENSOES).reset_index(drop=True)
+
+
+def conferir(serial: AggregateCube, paralelo: AggregateCube) -> bool:
+    """Mesmas células e mesmos agregados (a menos da ordem das células)"""
+    a, b = _ordenar(serial), _ordenar(paralelo)
+    return (a.shape == b.shape and bool((a[DIMENSOES] == b[DIMENSOES]).all().all())
+            and np.allclose(a.drop(columns=DIMENSOES).to_numpy(float), b.drop(columns=DIMENSOES).to_numpy(float)))
+
+
+def _melhor(funcao, repeticoes: int):
+    """Menor tempo entre as repetições e o resultado da última"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000_000, 5_000_000, 20_000_000])
+    parser.add_argument('--processos', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições por medição (vale a menor)')
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} núcleos')
+    print(f"{'linhas':>12} {'processos':>10} {'tempo (s)':>10} {'aceleração':>11}  confere")
+    virada = {}
+    for linhas in sorted(args.linhas):
+        csv = DADOS_DIR / f'hr_{linhas}.csv'
+        if not csv.exists():
+            gerar_csv(linhas, csv)
+        ensure_store(csv)
+
+        colunas = [col for col in DIMENSOES if col != 'age_bucket'] + MEDIDAS
+        base, serial = _melhor(lambda: AggregateCube.build(load_columns(colunas, csv)), args.repeticoes)
+        print(f'{linhas:>12,} {"série":>10} {base:>10.2f} {1:>10.2f}x')
+        for processos in args.processos:
+            tempo, paralelo = _melhor(lambda: construir_cubo_paralelo(csv, processos), args.repeticoes)
+            print(f'{linhas:>12,} {processos:>10} {tempo:>10.2f} {base / tempo:>10.2f}x  {conferir(serial, paralelo)}')
+            if tempo < base:
+                virada.setdefault(processos, linhas)
+
+    for processos in args.processos:
+        if processos in virada:
+            print(f'{processos} processos: vencem a série a partir de {virada[processos]:,} linhas')
+        else:
+            print(f'{processos} processos: não venceram a série em nenhum tamanho medido')
+
+
+if __name__ == '__main__':
+    main()
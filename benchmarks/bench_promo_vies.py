@@ -0,0 +1,114 @@
+"""
+Benchmark: detecção de viés em promoções.
+
+Compara três planos para a mesma análise:
+- a consulta original, com duas subconsultas correlacionadas por grupo;
+- a consulta atual de sql/advanced_queries/promo_vies.sql (agregados por
+  departamento calculados uma vez e unidos aos grupos);
+- a função vetorizada `detectar_vies_promocao`.
+
+O número de departamentos cresce com a base (--grupos-por-milhao), de modo que
+o custo das subconsultas por grupo aparece na escala. Antes de medir, os três
+resultados são conferidos entre si.
+
+Uso:
+    python benchmarks/bench_promo_vies.py --linhas 50000 1000000 10000000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'streamlit'))
+
+from bench_region_kernel import gerar_base, medir  # noqa: E402
+from promotion_bias import detectar_vies_promocao  # noqa: E402
+from sql_engine import MAIN_TABLE_VIEW, SQL_DIR  # noqa: E402
+
+CONSULTA_ORIGINAL = """
+SELECT gender, education, department, observed_promotion_rate, expected_promotion_rate,
+    (observed_promotion_rate - expected_promotion_rate) AS promotion_gap,
+    CASE WHEN ABS(observed_promotion_rate - expected_promotion_rate) > 2 * std_dev THEN 'Significativo'
+         ELSE 'Dentro do Esperado' END AS gap_status
+FROM (
+    SELECT gender, education, department,
+        AVG(is_promoted::INT) * 100 AS observed_promotion_rate,
+        (SELECT AVG(is_promoted::INT) * 100 FROM main_table m2 WHERE m2.department = m1.department)
+            AS expected_promotion_rate,
+        (SELECT STDDEV(is_promoted::INT) * 100 FROM main_table m3 WHERE m3.department = m1.department) AS std_dev
+    FROM main_table m1
+    GROUP BY gender, education, department
+) analysis
+WHERE observed_promotion_rate IS NOT NULL
+ORDER BY gender, education, department
+"""
+
+CONSULTA_ATUAL = (SQL_DIR / 'advanced_queries' / 'promo_vies.sql').read_text(encoding='utf-8')
+
+
+def preparar_base(n: int, grupos_por_milhao: int) -> pd.DataFrame:
+    """Base sintética com departamentos em número proporcional ao tamanho"""
+    df = gerar_base(n)
+    k = max(len(df['department'].cat.categories), n * grupos_por_milhao // 1_000_000)
+    rng = np.random.default_rng(1)
+    departamentos = [f'dept_{i:05d}' for i in range(k)]
+    df['department'] = pd.Categorical.from_codes(rng.integers(0, k, n), categories=departamentos)
+    return df
+
+
+def conectar(df: pd.DataFrame, threads: int) -> duckdb.DuckDBPyConnection:
+    """Conexão DuckDB com a base exposta como main_table"""
+    con = duckdb.connect()
+    con.execute(f'SET threads = {threads}')
+    con.register('base_processada', df)
+    con.execute(MAIN_TABLE_VIEW)
+    return con
+
+
+def conferir(esperado: pd.DataFrame, obtido: pd.DataFrame) -> None:
+    """Os planos devem produzir os mesmos grupos, taxas e classificações"""
+    chaves = ['gender', 'education', 'department']
+    esperado = esperado.sort_values(chaves).reset_index(drop=True)
+    obtido = obtido.sort_values(chaves).reset_index(drop=True)
+    assert len(esperado) == len(obtido)
+    for coluna in chaves + ['gap_status']:
+        rotulos = [tabela[coluna].astype(object).fillna('<nulo>').to_numpy() for tabela in (esperado, obtido)]
+        assert (rotulos[0] == rotulos[1]).all(), coluna
+    for coluna in ['observed_promotion_rate', 'expected_promotion_rate', 'promotion_gap']:
+        assert np.allclose(esperado[coluna].to_numpy(dtype=float), obtido[coluna].to_numpy(dtype=float),
+                           equal_nan=True), coluna
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, nargs='+', default=[50_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--grupos-por-milhao', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=1, help='Threads do DuckDB (1 = comparação justa)')
+    parser.add_argument('--sem-original', action='store_true', help='Não executa a consulta correlacionada')
+    args = parser.parse_args()
+
+    print(f"{'linhas':>12} {'grupos':>8} {'original (s)':>13} {'join (s)':>11} {'python (s)':>11}")
+    for n in args.linhas:
+        df = preparar_base(n, args.grupos_por_milhao)
+        con = conectar(df, args.threads)
+
+        atual = con.execute(CONSULTA_ATUAL).df()
+        conferir(atual, detectar_vies_promocao(df))
+        t_original = float('nan')
+        if not args.sem_original:
+            conferir(atual, con.execute(CONSULTA_ORIGINAL).df())
+            t_original = medir(lambda: con.execute(CONSULTA_ORIGINAL).df(), args.repeticoes)
+
+        t_atual = medir(lambda: con.execute(CONSULTA_ATUAL).df(), args.repeticoes)
+        t_python = medir(lambda: detectar_vies_promocao(df), args.repeticoes)
+        print(f'{n:>12,} {len(atual):>8,} {t_original:>13.4f} {t_atual:>11.4f} {t_python:>11.4f}')
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
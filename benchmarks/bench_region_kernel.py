@@ -0,0 +1,107 @@
+"""
+Benchmark: kernel regional de passada única x caminho original em pandas.
+
+Compara as seis agregações de `analisar_region` (value_counts, três
+groupby().mean(), groupby().agg() do mapa de calor e pd.crosstab) com o
+kernel bincount sobre as linhas brutas e sobre o cubo de agregados.
+
+Uso:
+    python benchmarks/bench_region_kernel.py --linhas 50000 1000000 5000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'streamlit'))
+
+from aggregate_cube import AggregateCube  # noqa: E402
+from region_kernel import resumir_cubo, resumir_dataframe  # noqa: E402
+
+DEPARTAMENTOS = ['Sales & Marketing', 'Operations', 'Technology', 'Procurement', 'Analytics',
+                 'Finance', 'HR', 'Legal', 'R&D']
+
+
+def gerar_base(n: int, seed: int = 0) -> pd.DataFrame:
+    """Gera uma base sintética com as colunas usadas na análise regional"""
+    rng = np.random.default_rng(seed)
+    regioes = [f'region_{i}' for i in range(1, 35)]
+    return pd.DataFrame({
+        'region': pd.Categorical.from_codes(rng.integers(0, len(regioes), n), categories=regioes),
+        'department': pd.Categorical.from_codes(rng.integers(0, len(DEPARTAMENTOS), n), categories=DEPARTAMENTOS),
+        'gender': pd.Categorical.from_codes(rng.integers(0, 2, n), categories=['f', 'm']),
+        'education': pd.Categorical.from_codes(rng.integers(0, 3, n),
+                                               categories=["Bachelor's", 'Below Secondary', "Master's & above"]),
+        'is_promoted': (rng.random(n) < 0.085).astype('int8'),
+        'avg_training_score': rng.integers(39, 100, n).astype('int16'),
+        'KPIs_met >80%': rng.integers(0, 2, n).astype('int8'),
+        'age': rng.integers(20, 61, n).astype('int8'),
+        'length_of_service': rng.integers(1, 35, n).astype('int8'),
+        'awards_won?': (rng.random(n) < 0.02).astype('int8')
+    })
+
+
+def caminho_pandas(df: pd.DataFrame) -> None:
+    """Agregações do `analisar_region` original"""
+    df['region'].value_counts()
+    df.groupby('region', observed=True)['is_promoted'].mean()
+    df.groupby('region', observed=True)['avg_training_score'].mean()
+    df.groupby('region', observed=True)['KPIs_met >80%'].mean()
+    df.groupby('region', observed=True).agg({
+        'is_promoted': 'mean',
+        'avg_training_score': 'mean',
+        'KPIs_met >80%': 'mean',
+        'age': 'mean',
+        'length_of_service': 'mean',
+        'awards_won?': 'mean'
+    }).corr()
+    pd.crosstab(df['region'], df['department'], normalize='index')
+
+
+def caminho_kernel(df: pd.DataFrame) -> None:
+    """Kernel de passada única sobre as linhas brutas"""
+    resumo = resumir_dataframe(df)
+    resumo.contagens()
+    resumo.medias().corr()
+    resumo.crosstab()
+
+
+def medir(func: Callable[[], None], repeticoes: int) -> float:
+    """Melhor tempo (s) entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, nargs='+', default=[50_000, 1_000_000, 5_000_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>12} {'pandas (s)':>12} {'kernel (s)':>12} {'cubo (s)':>12} {'ganho':>8}")
+    for n in args.linhas:
+        df = gerar_base(n)
+        cubo = AggregateCube.build(df)
+
+        # Confere que os dois caminhos produzem as mesmas médias
+        esperado = df.groupby('region', observed=True)['avg_training_score'].mean()
+        obtido = resumir_dataframe(df).medias()['avg_training_score']
+        assert np.allclose(esperado.to_numpy(), obtido.loc[esperado.index].to_numpy())
+
+        t_pandas = medir(lambda: caminho_pandas(df), args.repeticoes)
+        t_kernel = medir(lambda: caminho_kernel(df), args.repeticoes)
+        t_cubo = medir(lambda: resumir_cubo(cubo).medias(), args.repeticoes)
+        print(f'{n:>12,} {t_pandas:>12.4f} {t_kernel:>12.4f} {t_cubo:>12.4f} {t_pandas / t_kernel:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Teste de carga da API de métricas (streamlit/metrics_api.py).
+
+Abre conexões HTTP/1.1 persistentes (asyncio, apenas a biblioteca padrão),
+cada uma disparando requisições em sequência durante --duracao segundos,
+como ferramentas de BI consultando os números em alta frequência. As URLs
+alternam entre as rotas departamental e regional e as combinações de filtros
+do painel de gênero (departamentos de /versao x faixas etárias).
+
+Com --etag, cada conexão reenvia o último ETag de cada URL (If-None-Match)
+e recebe 304 enquanto a versão dos dados não muda. O aquecimento inicial
+não é contabilizado: as medições refletem o cache de respostas já populado.
+
+São reportados requisições por segundo, p50/p90/p99 e máximo da latência
+(total e por rota) e a contagem por status. Sem --url, a API é iniciada em
+um subprocesso sobre a base sintética de --linhas linhas; cliente e servidor
+disputam então os mesmos núcleos — para números de produção, aponte --url
+para um servidor em outra máquina.
+
+Uso:
+    python benchmarks/carga_api.py --linhas 1000000 --conexoes 32 --duracao 20
+    python benchmarks/carga_api.py --url http://127.0.0.1:8502 --etag
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from harness import DADOS_DIR, RAIZ, RESULTADOS_DIR, _commit
+from gerar_dados import gerar_csv
+
+API = RAIZ / 'streamlit' / 'metrics_api.py'
+FAIXAS = [(25, 55), (20, 35), (35, 60)]
+TIMEOUT = 300
+
+
+def urls_de_teste(base: str) -> List[str]:
+    """Rotas fixas e as combinações de filtros do painel de gênero"""
+    with urllib.request.urlopen(f'{base}/versao', timeout=TIMEOUT) as resposta:
+        departamentos = json.load(resposta)['departamentos']
+    urls = ['/metricas/departamento', '/metricas/regiao']
+    for departamento in ['Todos'] + departamentos:
+        for lo, hi in FAIXAS:
+            urls.append('/metricas/genero?' + urlencode({'departamento': departamento,
+                                                         'idade_min': lo, 'idade_max': hi}))
+    return urls
+
+
+async def _conexao(host: str, porta: int, urls: List[str], inicio_medicao: float, fim: float, deslocamento: int,
+                   etag: bool, medicoes: List[Tuple[str, int, float]]) -> None:
+    """Uma conexão persistente: requisições em sequência até o fim do teste"""
+    reader, writer = await asyncio.open_connection(host, porta)
+    etags: Dict[str, bytes] = {}
+    i = deslocamento
+    try:
+        while time.perf_counter() < fim:
+            url = urls[i % len(urls)]
+            i += 1
+            pedido = f'GET {url} HTTP/1.1\r\nHost: {host}\r\n'.encode()
+            if etag and url in etags:
+                pedido += b'If-None-Match: ' + etags[url] + b'\r\n'
+
+            inicio = time.perf_counter()
+            writer.write(pedido + b'\r\n')
+            status = int((await reader.readline()).split()[1])
+            cabecalhos = {}
+            while (linha := await reader.readline()) not in (b'\r\n', b''):
+                nome, _, valor = linha.partition(b':')
+                cabecalhos[nome.strip().lower()] = valor.strip()
+            await reader.readexactly(int(cabecalhos.get(b'content-length', 0)))
+            fim_requisicao = time.perf_counter()
+
+            if b'etag' in cabecalhos:
+                etags[url] = cabecalhos[b'etag']
+            if inicio >= inicio_medicao:
+                medicoes.append((urlsplit(url).path, status, fim_requisicao - inicio))
+    finally:
+        writer.close()
+
+
+async def carga(base: str, urls: List[str], conexoes: int, duracao: float, aquecimento: float,
+                etag: bool) -> List[Tuple[str, int, float]]:
+    """Dispara as conexões concorrentes e retorna (rota, status, latência) das requisições medidas"""
+    alvo = urlsplit(base)
+    medicoes: List[Tuple[str, int, float]] = []
+    inicio_medicao = time.perf_counter() + aquecimento
+    fim = inicio_medicao + duracao
+    await asyncio.gather(*(_conexao(alvo.hostname, alvo.port or 80, urls, inicio_medicao, fim,
+                                    k * len(urls) // conexoes, etag, medicoes) for k in range(conexoes)))
+    return medicoes
+
+
+def resumo(latencias: List[float]) -> Dict[str, float]:
+    """Percentis da latência em milissegundos"""
+    ms = sorted(latencia * 1000 for latencia in latencias)
+    if not ms:
+        return dict.fromkeys(('p50', 'p90', 'p99', 'max'))
+    # quantiles exige ao menos dois valores
+    percentis = statistics.quantiles(ms * 2 if len(ms) == 1 else ms, n=100, method='inclusive')
+    return {'p50': percentis[49], 'p90': percentis[89], 'p99': percentis[98], 'max': ms[-1]}
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_api(linhas: int) -> Tuple[subprocess.Popen, str]:
+    """Sobe a API em um subprocesso sobre a base sintética e espera a primeira resposta"""
+    origem = DADOS_DIR / f'hr_{linhas}.csv'
+    if not origem.exists():
+        print(f'  gerando {origem.name}...', flush=True)
+        gerar_csv(linhas, origem)
+    porta = _porta_livre()
+    processo = subprocess.Popen([sys.executable, str(API), str(origem), '--porta', str(porta)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    base = f'http://127.0.0.1:{porta}'
+    limite = time.perf_counter() + TIMEOUT
+    while time.perf_counter() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f'a API terminou ao iniciar: {processo.stderr.read().strip()}')
+        try:
+            urllib.request.urlopen(f'{base}/versao', timeout=1).close()
+            return processo, base
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError('a API não respondeu a tempo')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=None, help='API já em execução (padrão: sobe uma sobre a base sintética)')
+    parser.add_argument('--linhas', type=int, default=50_000, help='Linhas da base sintética (sem --url)')
+    parser.add_argument('--conexoes', type=int, default=16, help='Conexões concorrentes')
+    parser.add_argument('--duracao', type=float, default=10.0, help='Segundos medidos')
+    parser.add_argument('--aquecimento', type=float, default=2.0, help='Segundos iniciais não contabilizados')
+    parser.add_argument('--etag', action='store_true', help='Revalida com If-None-Match (respostas 304)')
+    parser.add_argument('--nao-salvar', action='store_true', help='Não grava o resultado em resultados/')
+    args = parser.parse_args()
+
+    processo: Optional[subprocess.Popen] = None
+    base = args.url.rstrip('/') if args.url else None
+    try:
+        if base is None:
+            processo, base = iniciar_api(args.linhas)
+        urls = urls_de_teste(base)
+        print(f'{len(urls)} URLs · {args.conexoes} conexões · {args.duracao:.0f}s'
+              f"{' · revalidação por ETag' if args.etag else ''} → {base}")
+        medicoes = asyncio.run(carga(base, urls, args.conexoes, args.duracao, args.aquecimento, args.etag))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    por_rota = defaultdict(list)
+    for rota, _, latencia in medicoes:
+        por_rota[rota].append(latencia)
+    status = Counter(str(codigo) for _, codigo, _ in medicoes)
+    resultado: Dict[str, Any] = {
+        'requisicoes': len(medicoes),
+        'rps': len(medicoes) / args.duracao,
+        'latencia_ms': resumo([latencia for _, _, latencia in medicoes]),
+        'rotas': {rota: {'requisicoes': len(valores), **resumo(valores)} for rota, valores in sorted(por_rota.items())},
+        'status': dict(sorted(status.items()))
+    }
+
+    def linha(nome: str, n: int, lat: Dict[str, float]) -> str:
+        return f"{nome:<26} {n:>8} {lat['p50']:>8.2f} {lat['p90']:>8.2f} {lat['p99']:>8.2f} {lat['max']:>8.2f}"
+
+    print(f"{'rota':<26} {'req.':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    for rota, dados in resultado['rotas'].items():
+        print(linha(rota, dados['requisicoes'], dados))
+    if medicoes:
+        print(linha('total', len(medicoes), resultado['latencia_ms']))
+    print(f"{resultado['rps']:.0f} req/s · status {resultado['status']}")
+
+    if not args.nao_salvar:
+        destino = RESULTADOS_DIR / 'api'
+        destino.mkdir(parents=True, exist_ok=True)
+        commit = _commit()
+        registro = {'data': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+                    'python': sys.version.split()[0], 'linhas': None if args.url else args.linhas,
+                    'conexoes': args.conexoes, 'duracao': args.duracao, 'etag': args.etag, **resultado}
+        nome = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{commit}.json"
+        (destino / nome).write_text(json.dumps(registro, indent=2), encoding='utf-8')
+        print(f'Resultados gravados em {destino / nome}')
+
+    if not medicoes or set(status) - {'200', '304'}:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Gerador de dados sintéticos de RH no esquema de train_atualizado.csv.
+
+As frequências das categorias seguem a base original do Kaggle (~55 mil
+linhas, ver data/info_dataset.txt e a saída de notebook/data_cleaning.ipynb):
+concentração regional forte (region_2 com ~22%), Sales & Marketing como
+maior departamento, ~70% de homens e poucos 'referred'. As variáveis
+numéricas têm faixas e formas próximas às reais, e a promoção depende de
+KPIs, prêmios, avaliação e score de treinamento, como na base original.
+
+O arquivo é escrito em blocos, permitindo gerar de 50 mil a 50 milhões de
+linhas com memória limitada. Com --brutos, a saída imita a base antes da
+limpeza (nulos em education e previous_year_rating), para medir o pipeline.
+
+Uso:
+    python benchmarks/gerar_dados.py 1000000 benchmarks/.data/hr_1000000.csv
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+BLOCO = 1_000_000
+
+# Frequências observadas na base original (contagens após a limpeza)
+DEPARTAMENTOS = {
+    'Sales & Marketing': 16840, 'Operations': 11348, 'Procurement': 7138, 'Technology': 7138,
+    'Analytics': 5352, 'Finance': 2536, 'HR': 2418, 'Legal': 1039, 'R&D': 999
+}
+REGIOES = {
+    'region_2': 12343, 'region_22': 6428, 'region_7': 4843, 'region_15': 2808, 'region_13': 2648,
+    'region_26': 2260, 'region_31': 1935, 'region_4': 1703, 'region_27': 1659, 'region_16': 1465,
+    'region_28': 1318, 'region_11': 1315, 'region_23': 1175, 'region_29': 994, 'region_32': 945,
+    'region_19': 874, 'region_20': 850, 'region_14': 827, 'region_25': 819, 'region_17': 796,
+    'region_5': 766, 'region_6': 690, 'region_30': 657, 'region_8': 655, 'region_10': 648,
+    'region_1': 610, 'region_24': 508, 'region_12': 500, 'region_9': 420, 'region_21': 411,
+    'region_3': 346, 'region_34': 292, 'region_33': 269, 'region_18': 31
+}
+EDUCACAO = {"Bachelor's": 38355, "Master's & above": 15611, 'Below Secondary': 842}
+GENERO = {'m': 38496, 'f': 16312}
+CANAIS = {'other': 30446, 'sourcing': 23220, 'referred': 1142}
+AVALIACOES = {1.0: 6223, 2.0: 4225, 3.0: 18618, 4.0: 9877, 5.0: 11741}
+TREINAMENTOS = {1: 44378, 2: 7987, 3: 1776, 4: 468, 5: 128, 6: 44, 7: 12, 8: 5, 9: 5, 10: 5}
+
+# Score médio de treinamento por departamento (perfis técnicos pontuam mais)
+SCORE_DEPARTAMENTO = {
+    'Sales & Marketing': 50, 'Operations': 60, 'Procurement': 70, 'Technology': 80, 'Analytics': 84,
+    'Finance': 61, 'HR': 50, 'Legal': 59, 'R&D': 85
+}
+
+# Proporção de nulos na base bruta
+NULOS_EDUCACAO = 0.044
+NULOS_AVALIACAO = 0.075
+
+COLUNAS = ['employee_id', 'department', 'region', 'education', 'gender', 'recruitment_channel',
+           'no_of_trainings', 'age', 'previous_year_rating', 'length_of_service', 'KPIs_met >80%',
+           'awards_won?', 'avg_training_score', 'is_promoted']
+
+
+def _distribuicao(frequencias: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Valores e probabilidades normalizadas de um dicionário de contagens"""
+    valores = np.array(list(frequencias), dtype=object)
+    pesos = np.array(list(frequencias.values()), dtype=np.float64)
+    return valores, pesos / pesos.sum()
+
+
+def _categorica(rng: np.random.Generator, frequencias: Dict, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorteia códigos segundo as frequências; retorna (códigos, rótulos)"""
+    valores, probs = _distribuicao(frequencias)
+    return rng.choice(len(valores), size=n, p=probs), valores
+
+
+def gerar_bloco(n: int, rng: np.random.Generator, primeiro_id: int = 1, brutos: bool = False) -> pa.Table:
+    """
+    Gera um bloco de n funcionários.
+
+    Parâmetros:
+        n (int): Número de linhas
+        rng: Gerador de números aleatórios
+        primeiro_id (int): employee_id da primeira linha
+        brutos (bool): Inclui nulos em education e previous_year_rating
+
+    Retorna:
+        pa.Table: Bloco no esquema de train_atualizado.csv
+    """
+    dept, depts = _categorica(rng, DEPARTAMENTOS, n)
+    regiao, regioes = _categorica(rng, REGIOES, n)
+    educ, educacoes = _categorica(rng, EDUCACAO, n)
+    genero, generos = _categorica(rng, GENERO, n)
+    canal, canais = _categorica(rng, CANAIS, n)
+    aval_valores, aval_probs = _distribuicao(AVALIACOES)
+    trein_valores, trein_probs = _distribuicao(TREINAMENTOS)
+
+    idade = np.clip(np.rint(rng.normal(34.8, 7.7, n)), 20, 60).astype(np.int8)
+    # Tempo de serviço assimétrico (maioria com poucos anos), limitado pela idade
+    servico = np.minimum(np.ceil(rng.gamma(2.0, 2.9, n)), np.maximum(idade - 19, 1)).astype(np.int8)
+    servico = np.clip(servico, 1, 37)
+    avaliacao = rng.choice(aval_valores.astype(np.float64), size=n, p=aval_probs)
+    kpis = (rng.random(n) < 0.20 + 0.06 * (avaliacao - 1)).astype(np.int8)
+    premios = (rng.random(n) < 0.023).astype(np.int8)
+    media_dept = np.array([SCORE_DEPARTAMENTO[d] for d in depts], dtype=np.float64)[dept]
+    score = np.clip(np.rint(rng.normal(media_dept, 7.0)), 39, 99).astype(np.int16)
+
+    # Promoção: modelo logístico calibrado para ~8,5% de promovidos
+    logito = (-3.45 + 1.6 * kpis + 1.9 * premios + 0.25 * (avaliacao - 3)
+              + 0.06 * (score - media_dept))
+    promovido = (rng.random(n) < 1 / (1 + np.exp(-logito))).astype(np.int8)
+
+    educacao = educacoes[educ]
+    if brutos:
+        educacao = educacao.copy()
+        educacao[rng.random(n) < NULOS_EDUCACAO] = None
+        avaliacao = np.where(rng.random(n) < NULOS_AVALIACAO, np.nan, avaliacao)
+
+    return pa.table({
+        'employee_id': np.arange(primeiro_id, primeiro_id + n, dtype=np.int64),
+        'department': depts[dept],
+        'region': regioes[regiao],
+        'education': educacao,
+        'gender': generos[genero],
+        'recruitment_channel': canais[canal],
+        'no_of_trainings': rng.choice(trein_valores.astype(np.int8), size=n, p=trein_probs),
+        'age': idade,
+        'previous_year_rating': avaliacao,
+        'length_of_service': servico,
+        'KPIs_met >80%': kpis,
+        'awards_won?': premios,
+        'avg_training_score': score,
+        'is_promoted': promovido
+    }).select(COLUNAS)
+
+
+def gerar_csv(linhas: int, saida: Path, seed: int = 0, brutos: bool = False, bloco: int = BLOCO) -> Path:
+    """
+    Escreve um CSV sintético em blocos de `bloco` linhas.
+
+    Parâmetros:
+        linhas (int): Total de linhas
+        saida (Path): Arquivo de destino
+        seed (int): Semente (mesma semente = mesmo arquivo)
+        brutos (bool): Gera a versão bruta, com nulos
+        bloco (int): Linhas por bloco
+
+    Retorna:
+        Path: Caminho do arquivo gerado
+    """
+    saida = Path(saida)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    # Cabeçalho sem aspas, como no CSV processado pelo pandas
+    opcoes = pacsv.WriteOptions(include_header=False, quoting_style='none')
+    with open(saida, 'wb') as f:
+        f.write((','.join(COLUNAS) + '\n').encode('utf-8'))
+        writer = None
+        try:
+            for inicio in range(0, linhas, bloco):
+                tabela = gerar_bloco(min(bloco, linhas - inicio), rng, inicio + 1, brutos)
+                if writer is None:
+                    writer = pacsv.CSVWriter(f, tabela.schema, write_options=opcoes)
+                writer.write_table(tabela)
+        finally:
+            if writer is not None:
+                writer.close()
+    return saida
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('linhas', type=int, help='Número de linhas (ex.: 50000, 1000000, 10000000, 50000000)')
+    parser.add_argument('saida', type=Path, help='Arquivo CSV de destino')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--brutos', action='store_true', help='Inclui nulos (base antes da limpeza)')
+    args = parser.parse_args()
+
+    gerar_csv(args.linhas, args.saida, args.seed, args.brutos)
+    print(f'{args.linhas:,} linhas gravadas em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""
+Suíte de benchmarks de desempenho (estilo asv).
+
+Cada benchmark é registrado com @benchmark e recebe um Contexto com a base
+sintética do tamanho pedido (gerada por gerar_dados.py e reaproveitada entre
+execuções). São medidos o carregamento dos dados, as métricas calculadas no
+main() de cada dashboard, a análise regional, o score de promoção e as
+funções do pipeline de limpeza.
+
+Os resultados são gravados em benchmarks/resultados/ (um JSON por execução,
+com commit, máquina e tempos) e comparados com a execução anterior; quedas
+de desempenho acima do limite são destacadas como regressão.
+
+Uso:
+    python benchmarks/harness.py --linhas 50000 1000000
+    python benchmarks/harness.py --linhas 10000000 --filtro regiao --repeticoes 3
+    python benchmarks/harness.py --listar
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'streamlit'))
+sys.path.insert(0, str(RAIZ / 'notebook'))
+
+from aggregate_cube import AggregateCube  # noqa: E402
+from data_store import ensure_store, load_columns  # noqa: E402
+from filter_engine import FilterEngine  # noqa: E402
+from gerar_dados import gerar_csv  # noqa: E402
+from pipeline_limpeza import (executar_pipeline, remover_espacos,  # noqa: E402
+                              substituir_valores_nulos_com_media,
+                              substituir_valores_nulos_proporcional)
+from promotion_stats import comparar_grupos  # noqa: E402
+from region_kernel import resumir_cubo  # noqa: E402
+from scoring import ScoringEngine  # noqa: E402
+from sketches import ResumoAproximado  # noqa: E402
+
+DADOS_DIR = Path(__file__).resolve().parent / '.data'
+RESULTADOS_DIR = Path(__file__).resolve().parent / 'resultados'
+TAMANHOS = {'50k': 50_000, '1M': 1_000_000, '10M': 10_000_000, '50M': 50_000_000}
+
+
+class Contexto:
+    """Bases e estruturas de um tamanho, criadas sob demanda e reaproveitadas"""
+
+    def __init__(self, linhas: int, seed: int = 0):
+        self.linhas = linhas
+        self.seed = seed
+
+    def _arquivo(self, brutos: bool) -> Path:
+        nome = f"hr_{self.linhas}{'_brutos' if brutos else ''}.csv"
+        caminho = DADOS_DIR / nome
+        if not caminho.exists():
+            print(f'  gerando {nome}...', flush=True)
+            gerar_csv(self.linhas, caminho, self.seed, brutos)
+        return caminho
+
+    @cached_property
+    def csv(self) -> Path:
+        """Base processada (esquema de train_atualizado.csv)"""
+        return self._arquivo(brutos=False)
+
+    @cached_property
+    def csv_brutos(self) -> Path:
+        """Base bruta, com nulos, para o pipeline de limpeza"""
+        return self._arquivo(brutos=True)
+
+    @cached_property
+    def df(self) -> pd.DataFrame:
+        ensure_store(self.csv)
+        return load_columns(source=self.csv)
+
+    @cached_property
+    def brutos(self) -> pd.DataFrame:
+        return pd.read_csv(self.csv_brutos)
+
+    @cached_property
+    def cubo(self) -> AggregateCube:
+        return AggregateCube.build(self.df)
+
+
+@dataclass
+class Benchmark:
+    nome: str
+    executar: Callable[[Any], Any]
+    preparar: Callable[[Contexto], Any]
+    preparar_cada: Optional[Callable[[Any], Any]] = None
+
+
+REGISTRO: Dict[str, Benchmark] = {}
+
+
+def benchmark(nome: str, preparar: Callable[[Contexto], Any] = lambda ctx: ctx,
+              preparar_cada: Optional[Callable[[Any], Any]] = None):
+    """
+    Registra uma função de benchmark.
+
+    Parâmetros:
+        nome (str): Identificador (ex.: 'genero.metricas')
+        preparar: Monta o estado a partir do contexto (fora da medição)
+        preparar_cada: Prepara o estado antes de cada repetição (fora da medição),
+            para operações que alteram a entrada
+    """
+    def registrar(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        REGISTRO[nome] = Benchmark(nome, func, preparar, preparar_cada)
+        return func
+    return registrar
+
+
+# ---------------------------
+# Carregamento dos dados
+# ---------------------------
+def _limpar_store(csv: Path) -> Path:
+    shutil.rmtree(csv.parent / '.store', ignore_errors=True)
+    return csv
+
+
+@benchmark('dados.conversao_csv', preparar=lambda ctx: ctx.csv, preparar_cada=_limpar_store)
+def bench_conversao(csv: Path) -> None:
+    """CSV -> armazenamento colunar (primeira carga de uma versão)"""
+    ensure_store(csv)
+
+
+@benchmark('dados.load_data', preparar=lambda ctx: (ensure_store(ctx.csv), ctx.csv)[1])
+def bench_load_data(csv: Path) -> None:
+    """Colunas do load_data do dashboard de gênero, via memory-map"""
+    load_columns(['gender', 'is_promoted', 'department', 'age', 'avg_training_score', 'KPIs_met >80%'], csv)
+
+
+# ---------------------------
+# Métricas dos dashboards
+# ---------------------------
+@benchmark('genero.indexacao', preparar=lambda ctx: ctx.df)
+def bench_genero_indexacao(df: pd.DataFrame) -> None:
+    """Construção dos bitmaps do motor de filtros (get_engine)"""
+    FilterEngine(df.dropna(subset=['gender']))
+
+
+@benchmark('genero.metricas', preparar=lambda ctx: FilterEngine(ctx.df))
+def bench_genero_metricas(engine: FilterEngine) -> None:
+    """Dicionários de métricas do main() para um estado de filtro"""
+    engine.avaliar((25, 55), {'department': engine.categorias['department'][0]})
+
+
+@benchmark('genero.sketches', preparar=lambda ctx: ctx.df)
+def bench_genero_sketches(df: pd.DataFrame) -> None:
+    """Construção do agregado por chave e dos t-digests do modo agregado (get_resumo_aproximado)"""
+    ResumoAproximado.build(df.dropna(subset=['gender']))
+
+
+@benchmark('genero.aproximado', preparar=lambda ctx: ResumoAproximado.build(ctx.df.dropna(subset=['gender'])))
+def bench_genero_aproximado(resumo: ResumoAproximado) -> None:
+    """Métricas do modo agregado para o mesmo estado de filtro de genero.metricas (custo constante)"""
+    resumo.avaliar((25, 55), {'department': resumo.categorias['department'][0]})
+
+
+@benchmark('departamento.cubo', preparar=lambda ctx: ctx.df)
+def bench_departamento_cubo(df: pd.DataFrame) -> None:
+    """Construção do cubo de agregados compartilhado"""
+    AggregateCube.build(df)
+
+
+@benchmark('departamento.metricas', preparar=lambda ctx: ctx.cubo)
+def bench_departamento_metricas(cubo: AggregateCube) -> None:
+    """Dicionários de métricas do main() do dashboard departamental"""
+    contagem = cubo.counts('department')
+    medias = cubo.mean('department')
+    {
+        'contagem': contagem.to_dict(),
+        'promocao': medias['is_promoted'].mul(100).round(1).to_dict(),
+        'scores': medias['avg_training_score'].round(1).to_dict(),
+        'kpis': medias['KPIs_met >80%'].mul(100).round(1).to_dict(),
+        'tempo_servico': medias['length_of_service'].round(1).to_dict(),
+    }
+    cubo.rollup(['department', 'education'])
+
+
+@benchmark('regiao.analisar_region', preparar=lambda ctx: ctx.cubo)
+def bench_analisar_region(cubo: AggregateCube) -> None:
+    """Agregações de analisar_region (contagens, médias, correlação e crosstab)"""
+    resumo = resumir_cubo(cubo)
+    resumo.contagens()
+    resumo.medias().corr()
+    resumo.crosstab()
+
+
+def _agregados_regiao(cubo: AggregateCube) -> pd.DataFrame:
+    return cubo.rollup('region')[['count', 'is_promoted:sum']].set_axis(['n', 'promovidos'], axis=1)
+
+
+@benchmark('estatistica.bootstrap_regiao', preparar=lambda ctx: _agregados_regiao(ctx.cubo))
+def bench_bootstrap_regiao(agregados: pd.DataFrame) -> None:
+    """Intervalos bootstrap e permutação da taxa de promoção por região"""
+    comparar_grupos(agregados)
+
+
+@benchmark('ranking.score', preparar=lambda ctx: ctx.df)
+def bench_ranking(df: pd.DataFrame) -> None:
+    """Score de promoção e percentil exato"""
+    ScoringEngine().adicionar(df).ranking()
+
+
+# ---------------------------
+# Pipeline de limpeza
+# ---------------------------
+def _copiar(df: pd.DataFrame) -> pd.DataFrame:
+    return df.copy()
+
+
+@benchmark('limpeza.media', preparar=lambda ctx: ctx.brutos, preparar_cada=_copiar)
+def bench_limpeza_media(df: pd.DataFrame) -> None:
+    substituir_valores_nulos_com_media(df, 'previous_year_rating')
+
+
+@benchmark('limpeza.proporcional', preparar=lambda ctx: ctx.brutos, preparar_cada=_copiar)
+def bench_limpeza_proporcional(df: pd.DataFrame) -> None:
+    substituir_valores_nulos_proporcional(df, 'education')
+
+
+@benchmark('limpeza.remover_espacos', preparar=lambda ctx: ctx.brutos, preparar_cada=_copiar)
+def bench_limpeza_espacos(df: pd.DataFrame) -> None:
+    remover_espacos(df)
+
+
+@benchmark('limpeza.pipeline', preparar=lambda ctx: ctx.brutos, preparar_cada=_copiar)
+def bench_limpeza_pipeline(df: pd.DataFrame) -> None:
+    """Sequência completa do notebook em memória"""
+    executar_pipeline(df)
+
+
+# ---------------------------
+# Execução e registro
+# ---------------------------
+def medir(bench: Benchmark, ctx: Contexto, repeticoes: int) -> Dict[str, Any]:
+    """Executa um benchmark e resume os tempos (s)"""
+    estado = bench.preparar(ctx)
+    tempos = []
+    for _ in range(repeticoes):
+        entrada = bench.preparar_cada(estado) if bench.preparar_cada else estado
+        inicio = time.perf_counter()
+        bench.executar(entrada)
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        'benchmark': bench.nome,
+        'linhas': ctx.linhas,
+        'repeticoes': repeticoes,
+        'min': min(tempos),
+        'mediana': statistics.median(tempos),
+        'media': statistics.fmean(tempos)
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def ultimo_resultado(excluir: Optional[Path] = None) -> Optional[dict]:
+    """Execução anterior mais recente gravada em resultados/"""
+    arquivos = sorted(p for p in RESULTADOS_DIR.glob('*.json') if p != excluir)
+    if not arquivos:
+        return None
+    return json.loads(arquivos[-1].read_text(encoding='utf-8'))
+
+
+def comparar(atual: List[Dict[str, Any]], anterior: Optional[dict], limite: float) -> List[str]:
+    """Benchmarks cujo tempo mínimo piorou mais que `limite` (razão) frente à execução anterior"""
+    if not anterior:
+        return []
+    base = {(r['benchmark'], r['linhas']): r['min'] for r in anterior['resultados']}
+    regressoes = []
+    for r in atual:
+        referencia = base.get((r['benchmark'], r['linhas']))
+        if referencia and r['min'] / referencia > limite:
+            regressoes.append(f"{r['benchmark']} @ {r['linhas']:,}: {referencia:.4f}s -> {r['min']:.4f}s "
+                              f"({r['min'] / referencia:.2f}x)")
+    return regressoes
+
+
+def _tamanho(valor: str) -> int:
+    return TAMANHOS.get(valor) or int(valor.replace('_', ''))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=_tamanho, nargs='+', default=[50_000, 1_000_000],
+                        help='Tamanhos das bases (números ou 50k, 1M, 10M, 50M)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--filtro', default='', help='Executa apenas benchmarks cujo nome contém o texto')
+    parser.add_argument('--limite', type=float, default=1.2, help='Razão de tempo considerada regressão')
+    parser.add_argument('--nao-salvar', action='store_true', help='Não grava o resultado em resultados/')
+    parser.add_argument('--falhar-em-regressao', action='store_true', help='Código de saída 1 se houver regressão')
+    parser.add_argument('--listar', action='store_true', help='Lista os benchmarks registrados')
+    args = parser.parse_args()
+
+    selecionados = [b for nome, b in REGISTRO.items() if args.filtro in nome]
+    if args.listar:
+        for bench in selecionados:
+            print(bench.nome)
+        return
+
+    resultados = []
+    for linhas in args.linhas:
+        print(f'== {linhas:,} linhas')
+        ctx = Contexto(linhas)
+        for bench in selecionados:
+            resultado = medir(bench, ctx, args.repeticoes)
+            resultados.append(resultado)
+            print(f"  {bench.nome:<28} min {resultado['min']:>9.4f}s  mediana {resultado['mediana']:>9.4f}s")
+
+    registro = {
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'maquina': platform.node(),
+        'processador': platform.processor() or platform.machine(),
+        'resultados': resultados
+    }
+    anterior = ultimo_resultado()
+    if not args.nao_salvar:
+        RESULTADOS_DIR.mkdir(parents=True, exist_ok=True)
+        nome = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{registro['commit']}.json"
+        (RESULTADOS_DIR / nome).write_text(json.dumps(registro, indent=2), encoding='utf-8')
+        print(f'Resultados gravados em {RESULTADOS_DIR / nome}')
+
+    regressoes = comparar(resultados, anterior, args.limite)
+    if anterior:
+        print(f"Comparação com {anterior['commit']} ({anterior['data']}): "
+              f"{len(regressoes) or 'nenhuma'} regressão(ões) acima de {args.limite:.2f}x")
+        for linha in regressoes:
+            print(f'  {linha}')
+    if regressoes and args.falhar_em_regressao:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
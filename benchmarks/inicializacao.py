@@ -0,0 +1,226 @@
+"""
+Perfil de inicialização (cold start) das páginas Streamlit com orçamento de tempo.
+
+Cada página roda em um interpretador novo, como em um pod recém-criado:
+- importacao: import do streamlit e do módulo da página, sem executá-la;
+- renderizacao: primeira execução completa da página (AppTest) com os caches
+  do Streamlit vazios — carga dos dados, métricas e figuras;
+- primeira_tela: soma das duas (tempo até a primeira renderização);
+- processo: tempo do subprocesso, incluindo a partida do interpretador.
+
+A base sintética (gerar_dados.py) fica em benchmarks/.data/inicializacao/
+com o armazenamento colunar e o cubo já construídos, como em uma imagem com
+os dados preparados; --store-frio apaga o .store antes de cada medição.
+
+A mediana das repetições é comparada com benchmarks/orcamento_inicializacao.json
+(valores padrão e por página, em segundos): o código de saída é 1 se alguma
+página estourar o orçamento ou falhar. Com --importtime, os imports mais
+caros de cada página são listados (python -X importtime).
+
+Em CI, o orçamento é verificado pela suíte de testes (tests/test_inicializacao.py,
+um teste por página com as mesmas medições): `python -m pytest tests`. O
+script serve para investigar um estouro e para registrar os tempos em
+resultados/.
+
+Uso:
+    python benchmarks/inicializacao.py
+    python benchmarks/inicializacao.py --paginas dashboard_region.py --importtime
+"""
+
+# Apenas a biblioteca padrão no topo: o mesmo arquivo roda as medições no
+# subprocesso, e nada pode ser importado antes do início da contagem
+import argparse
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+RAIZ = Path(__file__).resolve().parent.parent
+STREAMLIT_DIR = RAIZ / 'streamlit'
+ORCAMENTO_PATH = Path(__file__).resolve().parent / 'orcamento_inicializacao.json'
+METRICAS = ('importacao', 'renderizacao', 'primeira_tela', 'processo')
+TIMEOUT = 300
+
+
+def _medir_pagina(pagina: str) -> None:
+    """Executado no subprocesso: mede importação e primeira renderização e imprime um JSON"""
+    sys.path.insert(0, str(STREAMLIT_DIR))
+    inicio = time.perf_counter()
+    import streamlit  # noqa: F401
+    importlib.import_module(Path(pagina).stem)
+    importacao = time.perf_counter() - inicio
+
+    from streamlit.testing.v1 import AppTest
+    inicio = time.perf_counter()
+    at = AppTest.from_file(str(STREAMLIT_DIR / pagina), default_timeout=TIMEOUT).run()
+    renderizacao = time.perf_counter() - inicio
+
+    print(json.dumps({
+        'importacao': importacao,
+        'renderizacao': renderizacao,
+        'primeira_tela': importacao + renderizacao,
+        'erros': [e.value for e in at.exception] + [e.value for e in at.error]
+    }))
+
+
+def _imports_mais_caros(saida: str, pagina: str, n: int = 5) -> List[Dict[str, Any]]:
+    """Pacotes com maior tempo acumulado de import (níveis 0 e 1 da saída de -X importtime)"""
+    custos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        _, acumulado, nome = linha.split('|')
+        nivel = (len(nome) - len(nome.lstrip(' ')) - 1) // 2
+        nome = nome.strip()
+        pacote = nome.split('.')[0]
+        # A própria página e o AppTest (fora do caminho de produção) ficam de fora
+        if nivel > 1 or not acumulado.strip().isdigit() or nome.startswith('streamlit.testing') \
+                or pacote == Path(pagina).stem:
+            continue
+        custos[pacote] = max(custos.get(pacote, 0), int(acumulado))
+    mais_caros = sorted(custos.items(), key=lambda item: item[1], reverse=True)[:n]
+    return [{'modulo': nome, 'segundos': us / 1e6} for nome, us in mais_caros]
+
+
+def preparar_dados(linhas: int) -> Path:
+    """Base sintética em .data/inicializacao/data/processed com o store e o cubo prontos"""
+    sys.path.insert(0, str(STREAMLIT_DIR))
+    from aggregate_cube import load_cube
+    from gerar_dados import gerar_csv
+    from harness import DADOS_DIR
+
+    origem = DADOS_DIR / f'hr_{linhas}.csv'
+    if not origem.exists():
+        print(f'  gerando {origem.name}...', flush=True)
+        gerar_csv(linhas, origem)
+
+    raiz = DADOS_DIR / 'inicializacao'
+    destino = raiz / 'data' / 'processed' / 'train_atualizado.csv'
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    (raiz / 'streamlit').mkdir(exist_ok=True)
+    if not (destino.exists() and os.path.samefile(destino, origem)):
+        destino.unlink(missing_ok=True)
+        try:
+            destino.symlink_to(origem)
+        except OSError:
+            shutil.copyfile(origem, destino)
+    load_cube(destino)
+    return destino
+
+
+def medir(pagina: str, dados: Path, store_frio: bool, importtime: bool) -> Dict[str, Any]:
+    """Mede uma página em um subprocesso novo"""
+    if store_frio:
+        shutil.rmtree(dados.parent / '.store', ignore_errors=True)
+    comando = [sys.executable, *(['-X', 'importtime'] if importtime else []), __file__, '--_pagina', pagina]
+    inicio = time.perf_counter()
+    # O diretório de trabalho imita o da pasta streamlit/ (caminho '../data/processed' das páginas)
+    execucao = subprocess.run(comando, cwd=dados.parent.parent.parent / 'streamlit', capture_output=True,
+                              text=True, timeout=TIMEOUT)
+    processo = time.perf_counter() - inicio
+    if execucao.returncode != 0:
+        return {'processo': processo, 'erros': [execucao.stderr.strip().splitlines()[-1]]}
+    resultado = json.loads(execucao.stdout.strip().splitlines()[-1])
+    resultado['processo'] = processo
+    if importtime:
+        resultado['imports'] = _imports_mais_caros(execucao.stderr, pagina)
+    return resultado
+
+
+def limites(orcamento: Dict[str, Any], pagina: str) -> Dict[str, float]:
+    """Limites da página: valores padrão sobrescritos pelos específicos"""
+    return {**orcamento.get('padrao', {}), **orcamento.get('paginas', {}).get(pagina, {})}
+
+
+def paginas_padrao() -> List[str]:
+    """App multipágina e todos os dashboards"""
+    return ['app.py'] + sorted(p.name for p in STREAMLIT_DIR.glob('dashboard_*.py'))
+
+
+def avaliar_pagina(pagina: str, dados: Path, orcamento: Dict[str, Any], repeticoes: int = 3,
+                   store_frio: bool = False, importtime: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Mede uma página `repeticoes` vezes e compara as medianas com o orçamento.
+
+    Retorna:
+        tuple: (resultado com as medianas de cada métrica e os erros, estouros do orçamento)
+    """
+    execucoes = [medir(pagina, dados, store_frio, importtime) for _ in range(repeticoes)]
+    erros = sorted({erro for execucao in execucoes for erro in execucao.get('erros', [])})
+    resultado = {'pagina': pagina, 'repeticoes': repeticoes, 'erros': erros}
+    for metrica in METRICAS:
+        valores = [execucao[metrica] for execucao in execucoes if metrica in execucao]
+        resultado[metrica] = statistics.median(valores) if valores else None
+    if importtime:
+        resultado['imports'] = execucoes[-1].get('imports', [])
+
+    estouros = [f'{metrica} {resultado[metrica]:.2f}s > {limite:.2f}s'
+                for metrica, limite in limites(orcamento, pagina).items()
+                if resultado.get(metrica) is not None and resultado[metrica] > limite]
+    if erros:
+        estouros.append(f'falhou: {erros[0]}')
+    return resultado, estouros
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paginas', nargs='+', default=None, help='Arquivos em streamlit/ (padrão: app e dashboards)')
+    parser.add_argument('--linhas', type=int, default=50_000, help='Linhas da base sintética')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--orcamento', type=Path, default=ORCAMENTO_PATH, help='JSON com os limites em segundos')
+    parser.add_argument('--store-frio', action='store_true', help='Apaga o armazenamento colunar antes de cada medição')
+    parser.add_argument('--importtime', action='store_true', help='Lista os imports mais caros de cada página')
+    parser.add_argument('--nao-salvar', action='store_true', help='Não grava o resultado em resultados/')
+    parser.add_argument('--_pagina', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._pagina:
+        _medir_pagina(args._pagina)
+        return
+
+    paginas = args.paginas or paginas_padrao()
+    dados = preparar_dados(args.linhas)
+    orcamento = json.loads(args.orcamento.read_text(encoding='utf-8'))
+
+    print(f"{'página':<26} {'importação':>10} {'render.':>8} {'1ª tela':>8} {'processo':>9}  orçamento")
+    resultados, falhas = [], []
+    for pagina in paginas:
+        resultado, estouros = avaliar_pagina(pagina, dados, orcamento, args.repeticoes, args.store_frio,
+                                             args.importtime)
+        resultado['linhas'] = args.linhas
+        falhas += [f'{pagina}: {estouro}' for estouro in estouros]
+        resultados.append(resultado)
+
+        tempos = ' '.join(f"{resultado[m]:>{w}.2f}s" if resultado[m] is not None else f"{'-':>{w + 1}}"
+                          for m, w in zip(METRICAS, (9, 7, 7, 8)))
+        print(f"{pagina:<26} {tempos}  {'estourou' if estouros else 'ok'}")
+        for item in resultado.get('imports', []):
+            print(f"    {item['modulo']:<40} {item['segundos']:.3f}s")
+
+    if not args.nao_salvar:
+        from harness import RESULTADOS_DIR, _commit
+        destino = RESULTADOS_DIR / 'inicializacao'
+        destino.mkdir(parents=True, exist_ok=True)
+        commit = _commit()
+        registro = {'data': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+                    'python': sys.version.split()[0], 'store_frio': args.store_frio, 'resultados': resultados}
+        nome = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{commit}.json"
+        (destino / nome).write_text(json.dumps(registro, indent=2), encoding='utf-8')
+        print(f'Resultados gravados em {destino / nome}')
+
+    if falhas:
+        print(f'{len(falhas)} página(s) fora do orçamento ({args.orcamento.name}):')
+        for falha in falhas:
+            print(f'  {falha}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
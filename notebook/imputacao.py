@@ -0,0 +1,122 @@
+"""
+Motor de imputação proporcional para colunas categóricas.
+
+Os nulos de várias colunas são preenchidos por amostragem ponderada
+vetorizada: as probabilidades de cada grupo viram uma tabela acumulada e uma
+única chamada a np.searchsorted sorteia o valor de todos os nulos. A
+amostragem é determinística por semente (um gerador independente por coluna)
+e pode ser condicionada a grupos, por exemplo ['department', 'region'].
+Grupos sem valores observados usam a distribuição global da coluna.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Sementes = Union[None, int, Dict[str, np.random.Generator]]
+
+
+def criar_geradores(seed: Optional[int], colunas: Sequence[str]) -> Dict[str, np.random.Generator]:
+    """
+    Cria um gerador independente por coluna a partir de uma única semente.
+
+    Reutilizar os mesmos geradores entre blocos de um arquivo produz o mesmo
+    resultado da imputação em memória.
+    """
+    filhos = np.random.SeedSequence(seed).spawn(len(colunas))
+    return {coluna: np.random.default_rng(filho) for coluna, filho in zip(colunas, filhos)}
+
+
+def contar_frequencias(df: pd.DataFrame, coluna: str, por: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Tabela de frequências dos valores não nulos (grupos x categorias).
+
+    Parâmetros:
+        df (pd.DataFrame): Base de dados
+        coluna (str): Coluna categórica
+        por: Colunas de agrupamento (None = uma única linha com a distribuição global)
+
+    Retorna:
+        pd.DataFrame: Contagens com uma linha por grupo e uma coluna por categoria (em ordem)
+    """
+    if not por:
+        tabela = df[coluna].value_counts().to_frame().T.reset_index(drop=True)
+    else:
+        tabela = df.groupby(list(por) + [coluna], observed=True).size().unstack(fill_value=0)
+    # Categorias em ordem fixa: tabelas de blocos diferentes somam e sorteiam igual
+    tabela = tabela.sort_index(axis=1)
+    tabela.columns.name = None
+    return tabela
+
+
+def _amostrar(probabilidades: np.ndarray, grupos: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Sorteia uma categoria por entrada, usando a linha de probabilidades do seu grupo"""
+    n_grupos, k = probabilidades.shape
+    acumulado = np.cumsum(probabilidades, axis=1)
+    acumulado[:, -1] = 1.0
+    # Desloca cada linha pelo índice do grupo para resolver todos os sorteios em uma busca
+    plano = (acumulado + np.arange(n_grupos)[:, None]).ravel()
+    sorteios = rng.random(len(grupos)) + grupos
+    escolhidos = np.searchsorted(plano, sorteios, side='right') - grupos * k
+    return np.clip(escolhidos, 0, k - 1)
+
+
+def imputar_categoricas(df: pd.DataFrame, colunas: Sequence[str], seed: Sementes = None,
+                        por: Optional[Sequence[str]] = None,
+                        frequencias: Optional[Dict[str, pd.DataFrame]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Preenche os nulos das colunas por amostragem proporcional à frequência.
+
+    Parâmetros:
+        df (pd.DataFrame): Base de dados (alterada no lugar)
+        colunas: Colunas categóricas a imputar
+        seed: Semente inteira ou geradores por coluna (ver criar_geradores)
+        por: Colunas de agrupamento para imputação condicional
+        frequencias: Tabelas de contar_frequencias já calculadas (ex.: estatísticas globais
+            de um arquivo processado em blocos); por padrão são calculadas sobre df
+
+    Retorna:
+        pd.DataFrame: Base com os nulos substituídos
+        pd.DataFrame: Distribuição antes/depois por (coluna, valor)
+    """
+    geradores = seed if isinstance(seed, dict) else criar_geradores(seed, colunas)
+    relatorios = []
+
+    for coluna in colunas:
+        tabela = frequencias[coluna] if frequencias and coluna in frequencias else contar_frequencias(df, coluna, por)
+        categorias = tabela.columns.to_numpy(dtype=object)
+        contagens = tabela.to_numpy(dtype=np.float64)
+
+        # Última linha = distribuição global, usada por grupos vazios ou não vistos
+        contagens = np.vstack([contagens, contagens.sum(axis=0)])
+        vazios = contagens.sum(axis=1) == 0
+        contagens[vazios] = contagens[-1]
+        probabilidades = contagens / contagens.sum(axis=1, keepdims=True)
+
+        nulos = df[coluna].isnull().to_numpy()
+        if por:
+            chaves = df.loc[nulos, list(por)]
+            rotulos = pd.MultiIndex.from_frame(chaves) if len(por) > 1 else pd.Index(chaves.iloc[:, 0])
+            grupos = tabela.index.get_indexer(rotulos)
+            grupos[grupos < 0] = len(tabela)
+        else:
+            grupos = np.zeros(int(nulos.sum()), dtype=np.intp)
+
+        antes = df[coluna].value_counts().reindex(categorias, fill_value=0).to_numpy()
+        escolhidos = _amostrar(probabilidades, grupos, geradores[coluna])
+        df.loc[nulos, coluna] = categorias[escolhidos]
+
+        imputados = np.bincount(escolhidos, minlength=len(categorias))
+        relatorios.append(pd.DataFrame({
+            'Coluna': coluna,
+            'Valor': categorias,
+            'Antes': antes,
+            'Imputados': imputados,
+            'Depois': antes + imputados,
+            'Proporção Antes (%)': antes / max(antes.sum(), 1) * 100,
+            'Proporção Depois (%)': (antes + imputados) / max((antes + imputados).sum(), 1) * 100
+        }))
+
+    relatorio = pd.concat(relatorios, ignore_index=True) if relatorios else pd.DataFrame()
+    return df, relatorio
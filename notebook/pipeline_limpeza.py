@@ -0,0 +1,552 @@
+"""
+Pipeline de limpeza da base de RH extraído de `data_cleaning.ipynb`.
+
+As funções mantêm os nomes e contratos do notebook, com implementações
+vetorizadas (operações .str apenas sobre as categorias, preenchimentos com
+NumPy, verificações por máscaras). O modo em blocos limpa CSVs maiores que a
+memória em duas passadas (estatísticas globais e limpeza) e grava a saída de
+forma incremental.
+
+Ao salvar, a limpeza grava ao lado do CSV o dicionário canônico de cada
+coluna categórica (`<arquivo>_dicionarios.json`): a lista ordenada de
+rótulos que define os códigos inteiros usados pelo armazenamento colunar e
+pelos dashboards. Rótulos de versões anteriores mantêm a posição e os novos
+entram no final, em ordem natural (region_2 antes de region_10).
+
+Uso:
+    python pipeline_limpeza.py ../data/raw/train.csv ../data/processed/train_atualizado.csv --chunksize 1000000
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from imputacao import contar_frequencias, criar_geradores, imputar_categoricas
+
+# Semente padrão da imputação proporcional (resultados reprodutíveis)
+SEED = 42
+
+# Tipagem otimizada aplicada ao final da limpeza
+COLUNAS_TIPOS = {
+    'employee_id': 'int32',
+    'department': 'category',
+    'region': 'category',
+    'education': 'category',
+    'gender': 'category',
+    'recruitment_channel': 'category',
+    'no_of_trainings': 'int8',
+    'age': 'int8',
+    'previous_year_rating': 'float32',
+    'length_of_service': 'int8',
+    'KPIs_met >80%': 'int8',
+    'awards_won?': 'int8',
+    'avg_training_score': 'int16',
+    'is_promoted': 'int8'
+}
+
+# Colunas codificadas por dicionário
+COLUNAS_CATEGORICAS = [coluna for coluna, tipo in COLUNAS_TIPOS.items() if tipo == 'category']
+
+
+def carregar_dados(caminho_arquivo, coluna_data=None):
+    """
+    Carrega um arquivo CSV com dados.
+
+    Parâmetros:
+    - caminho_arquivo (str): Caminho do arquivo CSV.
+    - coluna_data (str, opcional): Nome da coluna de datas para converter para datetime.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os dados carregados.
+    """
+    dados = pd.read_csv(caminho_arquivo)
+    if coluna_data:
+        dados[coluna_data] = pd.to_datetime(dados[coluna_data], utc=True)
+    return dados
+
+
+def verificar_tamanho_base(df):
+    """
+    Verifica o tamanho da base de dados em termos de número de linhas e colunas.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser verificado.
+
+    Retorna:
+    - dict: Dicionário com o número de linhas e colunas.
+    """
+    return {
+        'Número de Linhas': df.shape[0],
+        'Número de Colunas': df.shape[1]
+    }
+
+
+def verificar_valores_ausentes(df):
+    """
+    Verifica a quantidade e o percentual de valores ausentes em cada coluna de um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser verificado.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com a quantidade e o percentual de valores ausentes por coluna.
+    """
+    valores_ausentes = df.isnull().sum()
+    percentual_ausentes = (valores_ausentes / df.shape[0]) * 100
+
+    tabela_ausentes = pd.DataFrame({
+        'Quantidade de Valores Ausentes': valores_ausentes,
+        'Percentual de Valores Ausentes (%)': percentual_ausentes
+    })
+    tabela_ausentes = tabela_ausentes[tabela_ausentes['Quantidade de Valores Ausentes'] > 0]
+    return tabela_ausentes.sort_values(by='Percentual de Valores Ausentes (%)', ascending=False)
+
+
+def substituir_valores_nulos_com_media(df, coluna):
+    """
+    Substitui os valores nulos de uma coluna pela média arredondada dessa coluna.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame contendo a coluna.
+    - coluna (str): Nome da coluna cujos valores nulos serão substituídos.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os valores nulos substituídos.
+    - str: Mensagem indicando o sucesso da operação e o número de valores nulos substituídos.
+    """
+    media_arredondada = round(df[coluna].mean())
+    nulos_antes = df[coluna].isnull().sum()
+    df[coluna] = df[coluna].fillna(media_arredondada)
+    nulos_depois = df[coluna].isnull().sum()
+
+    if nulos_depois == 0:
+        mensagem = f"Operação bem-sucedida! {nulos_antes} valores nulos foram substituídos na coluna '{coluna}'."
+    else:
+        mensagem = f"Operação parcialmente bem-sucedida. Restam {nulos_depois} valores nulos na coluna '{coluna}'."
+    return df, mensagem
+
+
+def substituir_valores_nulos_proporcional(df, coluna, seed=SEED, por=None):
+    """
+    Substitui os valores nulos de uma coluna por valores únicos de forma proporcional à sua frequência.
+
+    Os valores são sorteados (amostragem ponderada com semente) em vez de
+    atribuídos em blocos na ordem das linhas, evitando que os primeiros nulos
+    recebam sempre a categoria mais comum.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame contendo a coluna.
+    - coluna (str): Nome da coluna cujos valores nulos serão substituídos.
+    - seed (int, opcional): Semente da amostragem.
+    - por (list, opcional): Colunas de agrupamento para imputar proporcionalmente dentro de cada grupo.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os valores nulos substituídos.
+    - str: Mensagem indicando o sucesso da operação e a distribuição dos valores antes e depois da substituição.
+    """
+    nulos_antes = int(df[coluna].isnull().sum())
+    df, relatorio = imputar_categoricas(df, [coluna], seed=seed, por=por)
+
+    mensagem = f"Operação bem-sucedida! {nulos_antes} valores nulos foram substituídos na coluna '{coluna}'.\n"
+    mensagem += "Distribuição dos valores antes e depois da substituição:\n"
+    mensagem += relatorio[['Valor', 'Antes', 'Depois']].to_string(index=False)
+    return df, mensagem
+
+
+def detectar_valores_duplicados(df):
+    """
+    Detecta e remove valores duplicados de um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser verificado
+
+    Retorna:
+    - pandas.DataFrame: DataFrame sem duplicatas
+    """
+    duplicatas = df.duplicated(keep=False)
+    n_duplicatas = duplicatas.sum()
+
+    if n_duplicatas == 0:
+        print("✅ Nenhum valor duplicado foi encontrado.")
+        return df
+    print(f"⚠️ Foram encontradas {n_duplicatas} linhas duplicadas.")
+    return df.drop_duplicates(keep='first')
+
+
+def verificar_tipo_dados(df):
+    """
+    Verifica o tipo dos dados/colunas de um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser verificado.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os nomes das colunas e seus respectivos tipos de dados.
+    """
+    tipos_dados = df.dtypes
+    return pd.DataFrame({
+        'Coluna': tipos_dados.index,
+        'Tipo de Dado': tipos_dados.values
+    })
+
+
+def modificar_tipo_colunas(df, colunas_tipos, verbose=True):
+    """
+    Modifica o tipo de dado de colunas específicas em um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame original.
+    - colunas_tipos (dict): Dicionário onde as chaves são os nomes das colunas e os valores são os tipos de dados desejados.
+    - verbose (bool): Exibe o resultado de cada conversão.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os tipos de dados modificados.
+    """
+    colunas_invalidas = [col for col in colunas_tipos.keys() if col not in df.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    for coluna, tipo in colunas_tipos.items():
+        try:
+            df[coluna] = df[coluna].astype(tipo)
+            if verbose:
+                print(f"✅ Coluna '{coluna}' convertida para '{tipo}' com sucesso.")
+        except Exception as e:
+            if verbose:
+                print(f"⚠️ Erro ao converter a coluna '{coluna}' para '{tipo}': {e}")
+    return df
+
+
+def verificar_colunas_numericas(df, colunas):
+    """
+    Verifica se as colunas especificadas contêm apenas valores numéricos.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser verificado.
+    - colunas (list): Lista de nomes das colunas a serem verificadas.
+
+    Retorna:
+    - dict: Dicionário com o nome da coluna e um booleano indicando se contém apenas números.
+    - pandas.DataFrame: DataFrame com as inconsistências encontradas.
+    """
+    resultado = {}
+    inconsistencias = []
+
+    for coluna in colunas:
+        if coluna not in df.columns:
+            resultado[coluna] = False
+            print(f"⚠️ Coluna '{coluna}' não encontrada no DataFrame.")
+            continue
+
+        # Máscara das posições que não convertem para número
+        invalidos = pd.to_numeric(df[coluna], errors='coerce').isnull().to_numpy()
+        resultado[coluna] = not invalidos.any()
+        if invalidos.any():
+            inconsistencias.append(pd.DataFrame({
+                'Coluna': coluna,
+                'Posição': df.index[invalidos],
+                'Valor': df[coluna].to_numpy()[invalidos]
+            }))
+
+    df_inconsistencias = pd.concat(inconsistencias, ignore_index=True) if inconsistencias else pd.DataFrame()
+    return resultado, df_inconsistencias
+
+
+def detectar_valores_unicos(df, coluna):
+    """
+    Detecta valores únicos em uma coluna de um DataFrame e exibe esses valores de forma amigável.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser analisado.
+    - coluna (str): Nome da coluna cujos valores únicos serão detectados.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os valores únicos e suas contagens.
+    - str: Mensagem indicando o sucesso da operação e o número de valores únicos encontrados.
+    """
+    if coluna not in df.columns:
+        raise ValueError(f"Coluna '{coluna}' não encontrada no DataFrame.")
+
+    valores_unicos = df[coluna].value_counts().reset_index()
+    valores_unicos.columns = [coluna, 'Contagem']
+    mensagem = f"Operação bem-sucedida! Foram encontrados {valores_unicos.shape[0]} valores únicos na coluna '{coluna}'."
+    return valores_unicos, mensagem
+
+
+def _remover_espacos_categoria(serie: pd.Series) -> Tuple[pd.Series, int]:
+    """Aplica strip apenas às categorias, unindo as que passam a coincidir"""
+    categorias = serie.cat.categories
+    try:
+        limpas = categorias.str.strip()
+    except AttributeError:
+        # Categorias não textuais
+        return serie, 0
+    alteradas = np.asarray(limpas != categorias)
+    codes = serie.cat.codes.to_numpy()
+    espacos_antes = int(np.bincount(codes[codes >= 0], minlength=len(categorias))[alteradas].sum())
+    if not alteradas.any():
+        return serie, espacos_antes
+
+    novas, remapeamento = np.unique(np.asarray(limpas, dtype=object), return_inverse=True)
+    novos_codes = np.where(codes >= 0, remapeamento[codes], -1)
+    limpa = pd.Series(pd.Categorical.from_codes(novos_codes, categories=novas), index=serie.index, name=serie.name)
+    return limpa, espacos_antes
+
+
+def _remover_espacos_texto(serie: pd.Series) -> Tuple[pd.Series, int]:
+    """Aplica strip vetorizado às strings de uma coluna de texto"""
+    try:
+        limpas = serie.str.strip()
+    except AttributeError:
+        # Coluna object sem nenhuma string
+        return serie, 0
+    alteradas = (limpas.notnull() & (limpas != serie)).to_numpy()
+    espacos_antes = int(alteradas.sum())
+    if espacos_antes:
+        serie = serie.where(~alteradas, limpas)
+    return serie, espacos_antes
+
+
+def remover_espacos(df):
+    """
+    Remove espaços em branco à esquerda e à direita das strings em todas as colunas de um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser processado.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os espaços removidos.
+    - pandas.DataFrame: DataFrame com informações sobre as remoções realizadas.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise ValueError("O argumento fornecido não é um DataFrame.")
+
+    informacoes_remocoes = []
+    for col in df.select_dtypes(include=['object', 'string', 'category']).columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col], espacos_antes = _remover_espacos_categoria(df[col])
+        else:
+            df[col], espacos_antes = _remover_espacos_texto(df[col])
+
+        # Após o strip vetorizado nenhuma string mantém espaços nas bordas
+        informacoes_remocoes.append({
+            'Coluna': col,
+            'Espaços Antes': espacos_antes,
+            'Espaços Depois': 0,
+            'Remoção Bem-Sucedida': True
+        })
+
+    return df, pd.DataFrame(informacoes_remocoes)
+
+
+def _chave_natural(valor):
+    """Chave de ordenação que compara os trechos numéricos como números"""
+    partes = re.split(r'(\d+)', str(valor))
+    return [(0, int(parte), '') if parte.isdigit() else (1, 0, parte) for parte in partes if parte]
+
+
+def _ordenar_rotulos(presentes, anteriores):
+    """Rótulos anteriores ainda presentes (na mesma ordem) seguidos dos novos em ordem natural"""
+    mantidos = [rotulo for rotulo in anteriores if rotulo in presentes]
+    return mantidos + sorted(set(presentes).difference(mantidos), key=_chave_natural)
+
+
+def _rotulos_presentes(serie):
+    """Rótulos não nulos observados em uma coluna"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        return {str(rotulo) for rotulo in serie.cat.categories[np.unique(codigos[codigos >= 0])]}
+    return {str(rotulo) for rotulo in serie.dropna().unique()}
+
+
+def caminho_dicionarios(caminho_arquivo):
+    """Arquivo do dicionário canônico gravado ao lado do CSV processado"""
+    caminho = Path(caminho_arquivo)
+    return caminho.with_name(f'{caminho.stem}_dicionarios.json')
+
+
+def carregar_dicionarios(caminho_arquivo):
+    """
+    Lê o dicionário canônico associado a um CSV processado.
+
+    Parâmetros:
+    - caminho_arquivo (str): Caminho do CSV processado.
+
+    Retorna:
+    - dict: {coluna: lista ordenada de rótulos}; vazio se ainda não existir.
+    """
+    try:
+        with open(caminho_dicionarios(caminho_arquivo), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def gerar_dicionarios(df, colunas=COLUNAS_CATEGORICAS, existentes=None):
+    """
+    Gera o dicionário canônico (rótulos ordenados) das colunas categóricas.
+
+    Parâmetros:
+    - df (pandas.DataFrame): Base limpa (ou um bloco dela).
+    - colunas (list): Colunas categóricas.
+    - existentes (dict, opcional): Dicionário anterior; seus rótulos ainda presentes mantêm a ordem.
+
+    Retorna:
+    - dict: {coluna: rótulos}, com os rótulos novos no final em ordem natural.
+    """
+    existentes = existentes or {}
+    return {coluna: _ordenar_rotulos(_rotulos_presentes(df[coluna]), existentes.get(coluna, []))
+            for coluna in colunas}
+
+
+def salvar_dicionarios(dicionarios, caminho_arquivo_saida):
+    """
+    Grava o dicionário canônico ao lado do CSV processado.
+
+    Parâmetros:
+    - dicionarios (dict): {coluna: rótulos}.
+    - caminho_arquivo_saida (str): Caminho do CSV processado.
+
+    Retorna:
+    - Path: Caminho do arquivo JSON gravado.
+    """
+    destino = caminho_dicionarios(caminho_arquivo_saida)
+    destino.write_text(json.dumps(dicionarios, ensure_ascii=False, indent=2), encoding='utf-8')
+    return destino
+
+
+def salvar_dados(df, caminho_arquivo_saida, colunas_categoricas=COLUNAS_CATEGORICAS):
+    """
+    Salva o DataFrame em um arquivo CSV, com o dicionário canônico das colunas categóricas.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser salvo.
+    - caminho_arquivo_saida (str): Caminho do arquivo CSV de saída.
+    - colunas_categoricas (list): Colunas incluídas no dicionário.
+    """
+    df.to_csv(caminho_arquivo_saida, index=False)
+    colunas = [coluna for coluna in colunas_categoricas if coluna in df.columns]
+    dicionarios = gerar_dicionarios(df, colunas, carregar_dicionarios(caminho_arquivo_saida))
+    salvar_dicionarios(dicionarios, caminho_arquivo_saida)
+    print(f"✅ Dados salvos com sucesso em '{caminho_arquivo_saida}'")
+
+
+def executar_pipeline(df, colunas_tipos=COLUNAS_TIPOS, coluna_media='previous_year_rating',
+                      coluna_proporcional='education', seed=SEED):
+    """
+    Executa em memória a mesma sequência de etapas do notebook.
+
+    Parâmetros:
+    - df (pandas.DataFrame): Base bruta.
+    - colunas_tipos (dict): Tipagem final das colunas.
+    - coluna_media (str): Coluna com nulos substituídos pela média arredondada.
+    - coluna_proporcional (str): Coluna com nulos substituídos proporcionalmente.
+    - seed (int): Semente da imputação proporcional.
+
+    Retorna:
+    - pandas.DataFrame: Base limpa.
+    """
+    df, _ = substituir_valores_nulos_com_media(df, coluna_media)
+    df, _ = substituir_valores_nulos_proporcional(df, coluna_proporcional, seed=seed)
+    df = df.drop_duplicates(keep='first')
+    df = modificar_tipo_colunas(df, colunas_tipos, verbose=False)
+    df, _ = remover_espacos(df)
+    return df
+
+
+def limpar_csv_em_blocos(caminho_entrada, caminho_saida, chunksize=1_000_000, colunas_tipos=COLUNAS_TIPOS,
+                         coluna_media='previous_year_rating', coluna_proporcional='education',
+                         seed=SEED) -> Dict[str, int]:
+    """
+    Limpa um CSV maior que a memória em duas passadas, gravando a saída de forma incremental.
+
+    A primeira passada acumula as estatísticas globais (média e frequências);
+    a segunda aplica as mesmas etapas de `executar_pipeline` bloco a bloco,
+    removendo duplicatas entre blocos por hash de linha. O resultado é igual
+    ao da execução em memória.
+
+    Parâmetros:
+    - caminho_entrada (str): CSV bruto.
+    - caminho_saida (str): CSV limpo (sobrescrito).
+    - chunksize (int): Linhas por bloco.
+    - colunas_tipos (dict): Tipagem final das colunas.
+    - coluna_media (str): Coluna com nulos substituídos pela média arredondada.
+    - coluna_proporcional (str): Coluna com nulos substituídos proporcionalmente.
+    - seed (int): Semente da imputação proporcional.
+
+    Retorna:
+    - dict: Linhas lidas, gravadas, duplicatas removidas e nulos substituídos.
+
+    O dicionário canônico das colunas categóricas é acumulado bloco a bloco e
+    gravado ao final, ao lado do CSV de saída.
+    """
+    # 1ª passada: estatísticas globais das colunas com nulos
+    soma, validos, nulos_proporcional = 0.0, 0, 0
+    frequencia: Optional[pd.DataFrame] = None
+    for bloco in pd.read_csv(caminho_entrada, chunksize=chunksize, usecols=[coluna_media, coluna_proporcional]):
+        soma += float(bloco[coluna_media].sum())
+        validos += int(bloco[coluna_media].notnull().sum())
+        nulos_proporcional += int(bloco[coluna_proporcional].isnull().sum())
+        contagem = contar_frequencias(bloco, coluna_proporcional)
+        frequencia = contagem if frequencia is None else frequencia.add(contagem, fill_value=0)
+
+    media_arredondada = round(soma / validos) if validos else 0
+    frequencias = {coluna_proporcional: frequencia}
+    geradores = criar_geradores(seed, [coluna_proporcional])
+
+    # 2ª passada: limpeza bloco a bloco com os parâmetros globais
+    resumo = {'linhas_lidas': 0, 'linhas_gravadas': 0, 'duplicatas_removidas': 0,
+              'nulos_substituidos': nulos_proporcional}
+    vistos = np.empty(0, dtype=np.uint64)
+    colunas_categoricas = [coluna for coluna, tipo in colunas_tipos.items() if tipo == 'category']
+    dicionarios = carregar_dicionarios(caminho_saida)
+    presentes = {coluna: set() for coluna in colunas_categoricas}
+    for i, bloco in enumerate(pd.read_csv(caminho_entrada, chunksize=chunksize)):
+        resumo['linhas_lidas'] += len(bloco)
+        resumo['nulos_substituidos'] += int(bloco[coluna_media].isnull().sum())
+        bloco[coluna_media] = bloco[coluna_media].fillna(media_arredondada)
+
+        # Mesmos geradores em todos os blocos: o sorteio continua a sequência da imputação em memória
+        bloco, _ = imputar_categoricas(bloco, [coluna_proporcional], seed=geradores, frequencias=frequencias)
+
+        # Tipagem antes do hash para que blocos com inferências diferentes gerem o mesmo hash
+        bloco = modificar_tipo_colunas(bloco, colunas_tipos, verbose=False)
+        hashes = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+        _, primeiros = np.unique(hashes, return_index=True)
+        manter = np.zeros(len(bloco), dtype=bool)
+        manter[primeiros] = True
+        manter &= ~np.isin(hashes, vistos)
+        vistos = np.union1d(vistos, hashes[manter])
+        resumo['duplicatas_removidas'] += int(len(bloco) - manter.sum())
+
+        bloco, _ = remover_espacos(bloco[manter].copy())
+        bloco.to_csv(caminho_saida, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+        resumo['linhas_gravadas'] += len(bloco)
+        for coluna in colunas_categoricas:
+            presentes[coluna] |= _rotulos_presentes(bloco[coluna])
+
+    # Rótulos do arquivo inteiro, mantendo a ordem do dicionário anterior
+    salvar_dicionarios({coluna: _ordenar_rotulos(rotulos, dicionarios.get(coluna, []))
+                        for coluna, rotulos in presentes.items()}, caminho_saida)
+    return resumo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Limpeza da base de RH em blocos')
+    parser.add_argument('entrada', help='CSV bruto')
+    parser.add_argument('saida', help='CSV limpo')
+    parser.add_argument('--chunksize', type=int, default=1_000_000, help='Linhas por bloco')
+    args = parser.parse_args()
+
+    resumo = limpar_csv_em_blocos(args.entrada, args.saida, chunksize=args.chunksize)
+    print(f"✅ {resumo['linhas_gravadas']} linhas gravadas em '{args.saida}' "
+          f"({resumo['duplicatas_removidas']} duplicatas removidas, {resumo['nulos_substituidos']} nulos substituídos)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,38 @@
 -- Query: Detecção de Viés em Promoções (Análise de Equidade)
-SELECT 
-    gender,
-    education,
-    department,
-    observed_promotion_rate,
-    expected_promotion_rate,
-    (observed_promotion_rate - expected_promotion_rate) AS promotion_gap,
-    CASE 
-        WHEN ABS(observed_promotion_rate - expected_promotion_rate) > 2 * std_dev THEN 'Significativo'
-        ELSE 'Dentro do Esperado'
-    END AS gap_status
-FROM (
+/* Estatísticas departamentais pré-agregadas uma única vez e unidas aos grupos,
+   em vez de subconsultas correlacionadas que relêem main_table a cada grupo */
+WITH department_stats AS (
+    SELECT 
+        department,
+        /* Taxa esperada baseada na média departamental */
+        AVG(is_promoted::INT) * 100 AS expected_promotion_rate,
+        /* Desvio padrão histórico do departamento */
+        STDDEV(is_promoted::INT) * 100 AS std_dev
+    FROM main_table
+    GROUP BY department
+),
+group_rates AS (
     SELECT 
         gender,
         education,
         department,
         /* Taxa de promoção observada */
-        AVG(is_promoted::INT) * 100 AS observed_promotion_rate,
-        /* Taxa esperada baseada na média departamental */
-        (SELECT AVG(is_promoted::INT) * 100 FROM main_table m2 WHERE m2.department = m1.department) AS expected_promotion_rate,
-        /* Desvio padrão histórico do departamento */
-        (SELECT STDDEV(is_promoted::INT) * 100 FROM main_table m3 WHERE m3.department = m1.department) AS std_dev
-    FROM main_table m1
+        AVG(is_promoted::INT) * 100 AS observed_promotion_rate
+    FROM main_table
     GROUP BY gender, education, department
-) analysis
-WHERE observed_promotion_rate IS NOT NULL;
\ No newline at end of file
+)
+SELECT 
+    g.gender,
+    g.education,
+    g.department,
+    g.observed_promotion_rate,
+    d.expected_promotion_rate,
+    (g.observed_promotion_rate - d.expected_promotion_rate) AS promotion_gap,
+    CASE 
+        WHEN ABS(g.observed_promotion_rate - d.expected_promotion_rate) > 2 * d.std_dev THEN 'Significativo'
+        ELSE 'Dentro do Esperado'
+    END AS gap_status
+FROM group_rates g
+LEFT JOIN department_stats d ON d.department = g.department
+WHERE g.observed_promotion_rate IS NOT NULL
+ORDER BY g.gender, g.education, g.department;
@@ -0,0 +1,224 @@
+"""
+Cubo de agregados pré-calculados para as métricas dos dashboards.
+
+Guarda count, soma e soma dos quadrados de cada medida por célula
+(department, region, gender, education, faixa etária). As métricas dos
+dashboards saem de roll-ups sobre essas poucas células em vez de
+varreduras sobre a base completa. O cubo é construído uma vez por versão
+dos dados e persistido ao lado do armazenamento colunar, de modo que os
+três dashboards compartilham o mesmo arquivo.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from data_store import DATA_PATH, PathLike, _gravar_atomico, data_version, ensure_store, load_columns
+
+DIMENSOES = ['department', 'region', 'gender', 'education', 'age_bucket']
+MEDIDAS = ['is_promoted', 'avg_training_score', 'KPIs_met >80%', 'length_of_service', 'age', 'awards_won?']
+AGE_EDGES = (25, 30, 35, 40, 45, 50, 55)
+
+Filtros = Optional[Dict[str, Union[object, Sequence[object]]]]
+
+
+def age_bucket_labels(edges: Sequence[int] = AGE_EDGES) -> List[str]:
+    """Rótulos das faixas etárias definidas pelos limites (intervalos [a, b))"""
+    labels = [f'<{edges[0]}']
+    labels += [f'{a}-{b - 1}' for a, b in zip(edges[:-1], edges[1:])]
+    labels.append(f'{edges[-1]}+')
+    return labels
+
+
+class AggregateCube:
+    """Cubo com count, sum e sumsq por célula das dimensões"""
+
+    def __init__(self, cells: pd.DataFrame, measures: Sequence[str] = MEDIDAS):
+        self.cells = cells
+        self.measures = list(measures)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, measures: Sequence[str] = MEDIDAS,
+              age_edges: Sequence[int] = AGE_EDGES) -> 'AggregateCube':
+        """
+        Constrói o cubo em uma única passada sobre os dados.
+
+        Parâmetros:
+            df (pd.DataFrame): Base com as dimensões categóricas e as medidas
+            measures: Medidas numéricas a agregar
+            age_edges: Limites das faixas etárias
+
+        Retorna:
+            AggregateCube: Cubo com as células observadas
+        """
+        labels = age_bucket_labels(age_edges)
+        dims = {
+            col: df[col].astype('category') for col in DIMENSOES if col != 'age_bucket'
+        }
+        dims['age_bucket'] = pd.Categorical.from_codes(
+            np.searchsorted(np.asarray(age_edges), df['age'].to_numpy(), side='right'),
+            categories=labels
+        )
+
+        # Combina os códigos (deslocados em 1 para representar nulos) em uma chave única
+        chave = np.zeros(len(df), dtype=np.int64)
+        for col in DIMENSOES:
+            cat = pd.Categorical(dims[col])
+            chave = chave * (len(cat.categories) + 1) + (cat.codes.astype(np.int64) + 1)
+        celulas, inverso = np.unique(chave, return_inverse=True)
+        n_celulas = len(celulas)
+
+        dados = {}
+        restante = celulas
+        for col in reversed(DIMENSOES):
+            cat = pd.Categorical(dims[col])
+            base = len(cat.categories) + 1
+            dados[col] = pd.Categorical.from_codes(restante % base - 1, categories=cat.categories)
+            restante = restante // base
+        cells = pd.DataFrame({col: dados[col] for col in DIMENSOES})
+
+        cells['count'] = np.bincount(inverso, minlength=n_celulas).astype(np.int64)
+        for m in measures:
+            valores = df[m].to_numpy(dtype=np.float64)
+            cells[f'{m}:sum'] = np.bincount(inverso, weights=valores, minlength=n_celulas)
+            cells[f'{m}:sumsq'] = np.bincount(inverso, weights=valores * valores, minlength=n_celulas)
+        return cls(cells, measures)
+
+    @classmethod
+    def merge(cls, cubos: Sequence['AggregateCube']) -> 'AggregateCube':
+        """
+        Combina cubos parciais (por exemplo, um por partição dos dados).
+
+        count, sum e sumsq são aditivos: células iguais em cubos diferentes são
+        somadas. As categorias das dimensões são unificadas entre os cubos.
+
+        Parâmetros:
+            cubos: Cubos parciais com as mesmas medidas
+
+        Retorna:
+            AggregateCube: Cubo equivalente ao construído sobre a base inteira
+        """
+        # União das categorias na ordem de aparição (a do primeiro cubo prevalece)
+        categorias = {
+            col: list(dict.fromkeys(rotulo for cubo in cubos for rotulo in cubo.cells[col].cat.categories))
+            for col in DIMENSOES
+        }
+        cells = pd.concat([
+            cubo.cells.assign(**{col: cubo.cells[col].cat.set_categories(categorias[col]) for col in DIMENSOES})
+            for cubo in cubos
+        ], ignore_index=True)
+        cells = cells.groupby(DIMENSOES, observed=True, dropna=False, sort=False).sum().reset_index()
+        # Células zeradas (todas as linhas retiradas com negado()) deixam o cubo
+        cells = cells[cells['count'] != 0].reset_index(drop=True)
+        return cls(cells, cubos[0].measures)
+
+    def negado(self) -> 'AggregateCube':
+        """Cubo com count, sum e sumsq negados: em merge(), retira as linhas que o formaram"""
+        cells = self.cells.copy()
+        valores = cells.columns.difference(DIMENSOES, sort=False)
+        cells[valores] = -cells[valores]
+        return AggregateCube(cells, self.measures)
+
+    @property
+    def total(self) -> int:
+        """Número total de linhas representadas no cubo"""
+        return int(self.cells['count'].sum())
+
+    def _filtrar(self, where: Filtros) -> pd.DataFrame:
+        cells = self.cells
+        if where:
+            mask = np.ones(len(cells), dtype=bool)
+            for col, valor in where.items():
+                if isinstance(valor, (list, tuple, set)):
+                    mask &= cells[col].isin(valor).to_numpy()
+                else:
+                    mask &= (cells[col] == valor).to_numpy()
+            cells = cells[mask]
+        return cells
+
+    def rollup(self, by: Union[str, Sequence[str]], where: Filtros = None) -> pd.DataFrame:
+        """
+        Soma count, sum e sumsq das células agrupando pelas dimensões pedidas.
+
+        Parâmetros:
+            by: Dimensão ou lista de dimensões do roll-up
+            where: Filtros por dimensão ({coluna: valor ou lista de valores})
+
+        Retorna:
+            pd.DataFrame: Agregados indexados pelas dimensões
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        cells = self._filtrar(where)
+        valores = cells.columns.difference(DIMENSOES, sort=False)
+        if not by:
+            return cells[valores].sum().to_frame().T
+        return cells.groupby(by, observed=True)[list(valores)].sum()
+
+    def counts(self, by: Union[str, Sequence[str]], where: Filtros = None) -> pd.Series:
+        """Contagem de linhas por grupo, em ordem decrescente (como value_counts)"""
+        return self.rollup(by, where)['count'].sort_values(ascending=False)
+
+    def mean(self, by: Union[str, Sequence[str]], measures: Optional[Iterable[str]] = None,
+             where: Filtros = None) -> pd.DataFrame:
+        """Médias das medidas por grupo"""
+        agg = self.rollup(by, where)
+        measures = self.measures if measures is None else list(measures)
+        return pd.DataFrame({m: agg[f'{m}:sum'] / agg['count'] for m in measures})
+
+    def std(self, by: Union[str, Sequence[str]], measures: Optional[Iterable[str]] = None,
+            where: Filtros = None) -> pd.DataFrame:
+        """Desvio padrão amostral das medidas por grupo"""
+        agg = self.rollup(by, where)
+        measures = self.measures if measures is None else list(measures)
+        n = agg['count']
+        resultado = {}
+        for m in measures:
+            var = (agg[f'{m}:sumsq'] - agg[f'{m}:sum'] ** 2 / n) / (n - 1)
+            resultado[m] = np.sqrt(var.clip(lower=0).where(n > 1))
+        return pd.DataFrame(resultado)
+
+    def save(self, path: PathLike) -> None:
+        """Persiste as células do cubo em Arrow IPC"""
+        _gravar_atomico(Path(path), lambda tmp: feather.write_feather(self.cells, tmp, compression='uncompressed'))
+
+    @classmethod
+    def load(cls, path: PathLike) -> 'AggregateCube':
+        """Carrega um cubo persistido"""
+        cells = feather.read_table(path, memory_map=True).to_pandas()
+        measures = [col[:-len(':sum')] for col in cells.columns if col.endswith(':sum')]
+        return cls(cells, measures)
+
+
+def load_cube(source: PathLike = DATA_PATH, processos: Optional[int] = None) -> AggregateCube:
+    """
+    Retorna o cubo da versão atual dos dados, construindo-o se necessário.
+
+    Parâmetros:
+        source: Caminho do CSV processado
+        processos: Com mais de um, constrói o cubo em um pool de processos por faixas
+            de linhas (ver partitioned_store); padrão: em série
+
+    Retorna:
+        AggregateCube: Cubo compartilhado entre os dashboards
+    """
+    versao = data_version(source)
+    cube_path = ensure_store(source).parent / f'cube-{versao}.arrow'
+    if cube_path.exists():
+        return AggregateCube.load(cube_path)
+
+    if processos is not None and processos > 1:
+        from partitioned_store import construir_cubo_paralelo
+        cube = construir_cubo_paralelo(source, processos)
+    else:
+        df = load_columns([col for col in DIMENSOES if col != 'age_bucket'] + MEDIDAS, source)
+        cube = AggregateCube.build(df)
+    cube.save(cube_path)
+
+    # Remove cubos de versões anteriores
+    for antigo in cube_path.parent.glob('cube-*.arrow'):
+        if antigo != cube_path:
+            antigo.unlink(missing_ok=True)
+    return cube
@@ -0,0 +1,49 @@
+"""
+App multipágina: ponto de entrada único para os dashboards de RH.
+
+Todas as páginas rodam no mesmo processo e compartilham a base carregada uma
+única vez (ver shared_data): a tabela Arrow em memory-map e o cubo de
+agregados são recursos únicos por versão dos dados, de modo que novas
+páginas não multiplicam a memória.
+
+O módulo de cada dashboard só é importado quando a página é aberta pela
+primeira vez: a inicialização do app carrega apenas o Streamlit e a página
+inicial.
+
+Uso (a partir da pasta streamlit/):
+    streamlit run app.py
+"""
+
+import importlib
+from typing import Callable
+
+import streamlit as st
+
+# (módulo do dashboard, título, ícone, url)
+PAGINAS = [
+    ('dashboard_gender', "Gênero", "👥", "genero"),
+    ('dashboard_department', "Departamentos", "🏢", "departamentos"),
+    ('dashboard_region', "Regiões", "🗺️", "regioes"),
+    ('dashboard_ranking', "Ranking de Promoção", "🏅", "ranking"),
+    ('dashboard_cohort', "Cohortes", "⏳", "cohortes"),
+]
+
+
+def pagina_sob_demanda(modulo: str) -> Callable[[], None]:
+    """Página que importa o módulo do dashboard apenas quando é aberta"""
+    def pagina() -> None:
+        importlib.import_module(modulo).pagina()
+    return pagina
+
+
+if __name__ == "__main__":
+    st.set_page_config(
+        page_title="Análise de RH",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.navigation([
+        st.Page(pagina_sob_demanda(modulo), title=titulo, icon=icone, url_path=url, default=(i == 0))
+        for i, (modulo, titulo, icone, url) in enumerate(PAGINAS)
+    ]).run()
@@ -0,0 +1,192 @@
+"""
+Kernel vetorizado de cohorte e tempo de serviço.
+
+Equivalente em NumPy de sql/advanced_queries/cohorte.sql (retenção e promoção
+por canal de recrutamento x ano de serviço) e de
+sql/simple_queries/longevidade.sql (grupos de tempo de serviço). Um único
+np.bincount 2-D sobre (código do canal, ano de serviço) produz contagens,
+promovidos e soma das idades por célula; as taxas, os filtros de anos e os
+grupos de tempo de serviço (limites configuráveis) saem dessa matriz
+pequena, sem nova varredura das linhas.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Limites de longevidade.sql: 1-3, 4-7 e 8+ anos
+LIMITES_TEMPO = (4, 8)
+# Anos de serviço de cohorte.sql (WHERE service_year BETWEEN 1 AND 5)
+ANOS_COHORTE = (1, 5)
+
+METRICAS = {
+    'retention_rate': 'Retenção (%)',
+    'promotion_rate': 'Taxa de Promoção (%)',
+    'employees': 'Funcionários'
+}
+
+
+def rotulos_tempo(limites: Sequence[int] = LIMITES_TEMPO, inicio: int = 1) -> List[str]:
+    """Rótulos dos grupos de tempo de serviço definidos pelos limites (intervalos [a, b))"""
+    bordas = [inicio, *limites]
+    rotulos = [f'{a}-{b - 1} anos' for a, b in zip(bordas[:-1], bordas[1:])]
+    rotulos.append(f'{bordas[-1]}+ anos')
+    return rotulos
+
+
+@dataclass(frozen=True)
+class CohortSummary:
+    """Matrizes canal x ano de serviço, base da cohorte e dos grupos de tempo"""
+    canais: List[str]
+    anos: np.ndarray
+    contagem: np.ndarray
+    promovidos: np.ndarray
+    soma_idade: np.ndarray
+
+    @property
+    def total(self) -> int:
+        """Total de linhas com canal definido"""
+        return int(self.contagem.sum())
+
+    def _taxas(self, contagem: np.ndarray, promovidos: np.ndarray, por_canal: np.ndarray) -> dict:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return {
+                'retention_rate': contagem * 100.0 / por_canal[:, None],
+                'promotion_rate': promovidos * 100.0 / contagem,
+                'employees': contagem.astype(np.float64)
+            }
+
+    def matriz(self, metrica: str = 'retention_rate', anos: Optional[Tuple[int, int]] = ANOS_COHORTE) -> pd.DataFrame:
+        """
+        Matriz canal x ano de serviço de uma métrica (base do mapa de calor).
+
+        Parâmetros:
+            metrica: 'retention_rate', 'promotion_rate' ou 'employees'
+            anos: Faixa inclusiva de anos exibidos (None = todos)
+
+        Retorna:
+            pd.DataFrame: Canais nas linhas, anos nas colunas (NaN em células vazias)
+        """
+        por_canal = self.contagem.sum(axis=1)
+        valores = self._taxas(self.contagem, self.promovidos, por_canal)[metrica]
+        colunas = np.ones(len(self.anos), dtype=bool) if anos is None else \
+            (self.anos >= anos[0]) & (self.anos <= anos[1])
+        valores = np.where(self.contagem > 0, valores, np.nan)[:, colunas]
+        return pd.DataFrame(
+            valores,
+            index=pd.Index(self.canais, name='recruitment_cohort'),
+            columns=pd.Index(self.anos[colunas], name='service_year')
+        ).loc[por_canal > 0]
+
+    def cohort(self, anos: Optional[Tuple[int, int]] = ANOS_COHORTE) -> pd.DataFrame:
+        """Resultado de cohorte.sql: uma linha por canal e ano de serviço observado"""
+        partes = {m: self.matriz(m, anos).stack() for m in ('promotion_rate', 'retention_rate', 'employees')}
+        resultado = pd.DataFrame(partes).reset_index()
+        resultado['employees'] = resultado['employees'].astype(np.int64)
+        return resultado[['recruitment_cohort', 'service_year', 'promotion_rate', 'retention_rate', 'employees']]
+
+    def por_canal(self) -> pd.DataFrame:
+        """Funcionários e taxa de promoção de cada canal (todos os anos)"""
+        contagem = self.contagem.sum(axis=1)
+        presentes = contagem > 0
+        return pd.DataFrame({
+            'employees': contagem[presentes],
+            'promotion_rate': self.promovidos.sum(axis=1)[presentes] * 100.0 / contagem[presentes]
+        }, index=pd.Index(np.asarray(self.canais, dtype=object)[presentes], name='recruitment_cohort'))
+
+    def _agrupar_tempo(self, limites: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Soma as colunas de anos em grupos de tempo de serviço (canal x grupo)"""
+        grupo = np.searchsorted(np.asarray(limites), self.anos, side='right')
+        n_grupos = len(limites) + 1
+
+        def somar(matriz: np.ndarray) -> np.ndarray:
+            saida = np.zeros((matriz.shape[0], n_grupos), dtype=np.float64)
+            np.add.at(saida.T, grupo, matriz.T)
+            return saida
+
+        return somar(self.contagem), somar(self.promovidos), somar(self.soma_idade)
+
+    def tempo_por_canal(self, metrica: str = 'promotion_rate', limites: Sequence[int] = LIMITES_TEMPO) -> pd.DataFrame:
+        """Matriz canal x grupo de tempo de serviço de uma métrica"""
+        contagem, promovidos, _ = self._agrupar_tempo(limites)
+        por_canal = contagem.sum(axis=1)
+        valores = np.where(contagem > 0, self._taxas(contagem, promovidos, por_canal)[metrica], np.nan)
+        return pd.DataFrame(
+            valores,
+            index=pd.Index(self.canais, name='recruitment_cohort'),
+            columns=pd.Index(rotulos_tempo(limites, self._inicio()), name='tenure_group')
+        ).loc[por_canal > 0]
+
+    def tempo_servico(self, limites: Sequence[int] = LIMITES_TEMPO) -> pd.DataFrame:
+        """
+        Resultado de longevidade.sql: idade média, taxa de promoção e funcionários por grupo.
+
+        Os grupos seguem a ordem do tempo de serviço; grupos vazios são omitidos.
+        """
+        contagem, promovidos, soma_idade = (m.sum(axis=0) for m in self._agrupar_tempo(limites))
+        presentes = contagem > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'tenure_group': np.asarray(rotulos_tempo(limites, self._inicio()), dtype=object)[presentes],
+                'avg_age': soma_idade[presentes] / contagem[presentes],
+                'promotion_rate': promovidos[presentes] * 100.0 / contagem[presentes],
+                'employees': contagem[presentes].astype(np.int64)
+            })
+
+    def _inicio(self) -> int:
+        """Menor ano de serviço observado (limite inferior do primeiro grupo)"""
+        observados = self.anos[self.contagem.sum(axis=0) > 0]
+        return int(observados.min()) if len(observados) else 1
+
+
+def resumir_cohortes(canal_codes: np.ndarray, anos_servico: np.ndarray, promovido: np.ndarray,
+                     idade: np.ndarray, canais: Sequence[str]) -> CohortSummary:
+    """
+    Agrega as matrizes canal x ano de serviço em uma única passada.
+
+    Parâmetros:
+        canal_codes: Códigos inteiros do canal de recrutamento (-1 = nulo, ignorado)
+        anos_servico: Tempo de serviço (inteiro; frações são truncadas como no FLOOR da consulta)
+        promovido: Flag 0/1 de promoção
+        idade: Idade de cada funcionário
+        canais: Rótulos dos canais na ordem dos códigos
+
+    Retorna:
+        CohortSummary: Contagens, promovidos e soma das idades por célula
+    """
+    c = np.asarray(canal_codes, dtype=np.intp)
+    anos = np.floor(np.asarray(anos_servico, dtype=np.float64)).astype(np.intp)
+    promovido = np.asarray(promovido, dtype=np.float64)
+    idade = np.asarray(idade, dtype=np.float64)
+
+    validos = c >= 0
+    if not validos.all():
+        c, anos, promovido, idade = c[validos], anos[validos], promovido[validos], idade[validos]
+
+    n_canais = len(canais)
+    ano_min = int(anos.min()) if len(anos) else 0
+    n_anos = int(anos.max()) - ano_min + 1 if len(anos) else 0
+    celula = c * n_anos + (anos - ano_min)
+    forma = (n_canais, n_anos)
+
+    def reduzir(pesos: Optional[np.ndarray]) -> np.ndarray:
+        return np.bincount(celula, weights=pesos, minlength=n_canais * n_anos).reshape(forma)
+
+    return CohortSummary(
+        canais=list(canais),
+        anos=np.arange(ano_min, ano_min + n_anos),
+        contagem=reduzir(None).astype(np.int64),
+        promovidos=reduzir(promovido),
+        soma_idade=reduzir(idade)
+    )
+
+
+def resumir_dataframe(df: pd.DataFrame) -> CohortSummary:
+    """Executa o kernel sobre as linhas de um DataFrame"""
+    canal = df['recruitment_channel'].astype('category').cat
+    return resumir_cohortes(
+        canal.codes.to_numpy(), df['length_of_service'].to_numpy(), df['is_promoted'].to_numpy(),
+        df['age'].to_numpy(), list(canal.categories)
+    )
@@ -0,0 +1,218 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from typing import Dict, Any
+from cohort_kernel import ANOS_COHORTE, LIMITES_TEMPO, METRICAS, CohortSummary, resumir_dataframe
+from debug_panel import painel_desempenho, plotly_chart
+from figure_cache import cache_padrao
+from lazy_import import lazy_module
+from profiling import medir, perfilado
+from shared_data import acompanhar_versao, data_version, dataset_columns
+
+# Carregado na primeira figura construída (ver lazy_import)
+px = lazy_module('plotly.express')
+
+# Configuração da página (aplicada pelo app multipágina ou na execução isolada)
+PAGE_CONFIG = {
+    'page_title': "Cohortes e Tempo de Serviço",
+    'page_icon': "⏳",
+    'layout': "wide",
+    'initial_sidebar_state': "expanded"
+}
+
+def aplicar_estilo() -> None:
+    """Estilos CSS personalizados"""
+    st.markdown("""
+    <style>
+    .main { background-color: #FFFFFF; }
+    .header-text {
+        color: #000000;
+        font-family: 'Arial';
+        border-bottom: 2px solid #000000;
+        padding-bottom: 10px;
+        margin-bottom: 1.5rem;
+    }
+    .metric-card {
+        background-color: #F8F9FA;
+        border: 1px solid #E0E0E0;
+        border-radius: 8px;
+        padding: 20px;
+        margin: 10px 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+    }
+    .report-box {
+        border: 1px solid #E0E0E0;
+        border-radius: 8px;
+        padding: 25px;
+        margin: 15px 0;
+        background-color: #FFFFFF;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+@st.cache_resource(max_entries=2, show_spinner="Calculando cohortes...")
+@perfilado()
+def get_resumo(file_path: str, versao: str) -> CohortSummary:
+    """
+    Agrega as matrizes canal x ano de serviço uma vez por versão dos dados.
+    Filtros, métricas e grupos de tempo são derivados dessa matriz pequena,
+    sem nova varredura da base.
+
+    Parâmetros:
+        file_path (str): Caminho do arquivo CSV
+        versao (str): Versão dos dados
+
+    Retorna:
+        CohortSummary: Matrizes da cohorte (None em caso de erro)
+    """
+    try:
+        df = dataset_columns(['recruitment_channel', 'length_of_service', 'is_promoted', 'age'], file_path, versao)
+        return resumir_dataframe(df)
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {str(e)}")
+        return None
+
+@perfilado()
+def create_cohort_heatmap(matriz: pd.DataFrame, metrica: str) -> go.Figure:
+    """Cria o mapa de calor canal de recrutamento x ano de serviço"""
+    fig = px.imshow(
+        matriz,
+        x=matriz.columns.astype(str),
+        y=matriz.index.astype(str),
+        color_continuous_scale='Greys',
+        text_auto='.1f' if metrica != 'employees' else ',.0f',
+        aspect='auto',
+        title=f'{METRICAS[metrica]} por Canal e Ano de Serviço',
+        labels={'x': 'Ano de serviço', 'y': 'Canal de recrutamento', 'color': METRICAS[metrica]}
+    )
+    return fig
+
+@perfilado()
+def create_tenure_channel_plot(tabela: pd.DataFrame, metrica: str) -> go.Figure:
+    """Cria gráfico de barras agrupadas por grupo de tempo de serviço e canal"""
+    dados = tabela.reset_index().melt(id_vars='recruitment_cohort', var_name='tenure_group', value_name='valor')
+    fig = px.bar(
+        dados,
+        x='tenure_group',
+        y='valor',
+        color='recruitment_cohort',
+        barmode='group',
+        title=f'{METRICAS[metrica]} por Grupo de Tempo de Serviço',
+        labels={'tenure_group': 'Tempo de serviço', 'valor': METRICAS[metrica], 'recruitment_cohort': 'Canal'},
+        color_discrete_sequence=['#000000', '#666666', '#B0B0B0']
+    )
+    return fig
+
+@perfilado()
+def create_tenure_plot(tempo: pd.DataFrame) -> go.Figure:
+    """Cria gráfico de funcionários e taxa de promoção por grupo de tempo de serviço"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=tempo['tenure_group'], y=tempo['employees'], name='Funcionários',
+                         marker_color='#B0B0B0'))
+    fig.add_trace(go.Scatter(x=tempo['tenure_group'], y=tempo['promotion_rate'], name='Taxa de Promoção (%)',
+                             mode='lines+markers', marker_color='#000000', yaxis='y2'))
+    fig.update_layout(
+        title='Longevidade: Funcionários e Promoção por Tempo de Serviço',
+        yaxis=dict(title='Funcionários'),
+        yaxis2=dict(title='Taxa de Promoção (%)', overlaying='y', side='right', rangemode='tozero'),
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig
+
+def display_key_metrics(resultados: Dict[str, Any]) -> None:
+    """Exibe métricas principais em cards estilizados"""
+    cols = st.columns(4)
+    metrics = [
+        ('👥 Funcionários', f"{resultados['total']:,}"),
+        ('🔗 Canais', f"{resultados['canais']}"),
+        ('🚀 Canal Destaque', resultados['canal_destaque']),
+        ('⏳ Grupo Destaque', resultados['grupo_destaque'])
+    ]
+
+    for col, (title, value) in zip(cols, metrics):
+        with col:
+            st.markdown(f"<div class='metric-card'><h3>{title}</h3><h2>{value}</h2></div>",
+                        unsafe_allow_html=True)
+
+def sidebar_filtros(resumo: CohortSummary):
+    """Filtros da barra lateral: métrica, faixa de anos e limites dos grupos de tempo"""
+    st.sidebar.header("⚙️ Parâmetros da Cohorte")
+    metrica = st.sidebar.radio("Métrica do mapa de calor", options=list(METRICAS), format_func=METRICAS.get)
+
+    ano_min, ano_max = int(resumo.anos.min()), int(resumo.anos.max())
+    if ano_max - ano_min < 2:
+        return metrica, (ano_min, ano_max), LIMITES_TEMPO
+    anos = st.sidebar.slider("Anos de serviço", ano_min, ano_max,
+                             (max(ANOS_COHORTE[0], ano_min), min(ANOS_COHORTE[1], ano_max)))
+    limites = st.sidebar.slider("Limites dos grupos de tempo de serviço", ano_min + 1, ano_max,
+                                tuple(min(max(limite, ano_min + 1), ano_max) for limite in LIMITES_TEMPO))
+    # Limites iguais gerariam um grupo vazio
+    return metrica, tuple(anos), tuple(sorted(set(limites)))
+
+def main():
+    """Função principal do dashboard"""
+    st.markdown('<h1 class="header-text">⏳ Cohortes por Canal e Tempo de Serviço</h1>', unsafe_allow_html=True)
+
+    data_path = '../data/processed/train_atualizado.csv'
+    # CSV ausente ou ilegível: mesma mensagem do carregamento dos dados
+    try:
+        versao = data_version(data_path)
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {str(e)}")
+        return
+    acompanhar_versao(data_path, versao)
+    resumo = get_resumo(data_path, versao)
+
+    if resumo is None or resumo.total == 0:
+        return
+
+    metrica, anos, limites = sidebar_filtros(resumo)
+
+    # Derivações sobre a matriz canal x ano (independentes do número de linhas)
+    with medir('metricas', linhas=resumo.total):
+        matriz = resumo.matriz(metrica, anos)
+        tempo = resumo.tempo_servico(limites)
+        canais = resumo.por_canal()
+        resultados = {
+            'total': resumo.total,
+            'canais': len(canais),
+            'canal_destaque': str(canais['promotion_rate'].idxmax()),
+            'grupo_destaque': str(tempo.loc[tempo['promotion_rate'].idxmax(), 'tenure_group'])
+        }
+    display_key_metrics(resultados)
+
+    # Gráficos servidos do cache de figuras por parâmetros
+    cache = cache_padrao()
+    plotly_chart(cache.figure(versao, 'cohort_heatmap', {'metrica': metrica, 'anos': anos},
+                              lambda: create_cohort_heatmap(matriz, metrica)),
+                 use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        plotly_chart(cache.figure(versao, 'cohort_tenure', {'limites': limites},
+                                  lambda: create_tenure_plot(tempo)),
+                     use_container_width=True)
+    with col2:
+        plotly_chart(cache.figure(versao, 'cohort_tenure_channel', {'limites': limites},
+                                  lambda: create_tenure_channel_plot(
+                                      resumo.tempo_por_canal('promotion_rate', limites), 'promotion_rate')),
+                     use_container_width=True)
+
+    # Tabelas equivalentes às consultas SQL
+    with st.expander("📄 Tabelas (cohorte.sql e longevidade.sql)", expanded=False):
+        st.dataframe(resumo.cohort(anos).round(2), use_container_width=True, hide_index=True)
+        st.dataframe(tempo.round(2), use_container_width=True, hide_index=True)
+
+    stats = cache.stats()
+    st.sidebar.caption(f"Cache de figuras: {stats['hits']} acertos · {stats['misses']} falhas · "
+                       f"{stats['size']}/{stats['maxsize']} itens")
+
+def pagina():
+    """Página do dashboard (registrada no app multipágina)"""
+    aplicar_estilo()
+    with painel_desempenho('cohortes'):
+        main()
+
+if __name__ == "__main__":
+    st.set_page_config(**PAGE_CONFIG)
+    pagina()
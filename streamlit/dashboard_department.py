@@ -1,20 +1,31 @@
 import streamlit as st
 import pandas as pd
 # Removed unused import
-import plotly.express as px
 import plotly.graph_objects as go
 from typing import Dict, Any
+from aggregate_cube import AggregateCube
+from debug_panel import painel_desempenho, plotly_chart
+from figure_cache import cache_padrao
+from lazy_import import lazy_module
+from page_metrics import generate_department_report, intervalos_departamento, metricas_departamento
+from profiling import medir, perfilado
+from promotion_stats import NIVEL
+from shared_data import acompanhar_versao, data_version, get_cube as get_shared_cube
 
-# Configuração inicial da página
-st.set_page_config(
-    page_title="Análise Departamental",
-    page_icon="🏢",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Carregado na primeira figura construída (ver lazy_import)
+px = lazy_module('plotly.express')
 
-# Estilos CSS personalizados
-st.markdown("""
+# Configuração da página (aplicada pelo app multipágina ou na execução isolada)
+PAGE_CONFIG = {
+    'page_title': "Análise Departamental",
+    'page_icon': "🏢",
+    'layout': "wide",
+    'initial_sidebar_state': "expanded"
+}
+
+def aplicar_estilo() -> None:
+    """Estilos CSS personalizados"""
+    st.markdown("""
     <style>
     .main { background-color: #FFFFFF; }
     .header-text { 
@@ -47,35 +58,30 @@ st.markdown("""
         margin: 15px 0;
     }
     </style>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
-@st.cache_data(show_spinner="Carregando dados...")
-def load_data(file_path: str) -> pd.DataFrame:
+@perfilado()
+def get_cube(file_path: str, versao: str) -> AggregateCube:
     """
-    Carrega e otimiza os dados do arquivo CSV
+    Carrega o cubo de agregados compartilhado da versão atual dos dados
     """
     try:
-        df = pd.read_csv(
-            file_path,
-            usecols=['department', 'is_promoted', 'avg_training_score', 
-                    'KPIs_met >80%', 'length_of_service', 'education'],
-            dtype={
-                'department': 'category',
-                'education': 'category',
-                'is_promoted': 'int8',
-                'avg_training_score': 'int16',
-                'KPIs_met >80%': 'int8',
-                'length_of_service': 'int8'
-            }
-        )
-        return df.dropna(subset=['department'])
+        return get_shared_cube(file_path, versao)
     except Exception:
         st.error("Erro ao carregar dados.")
-        return pd.DataFrame()
+        return None
+
+@st.cache_data(max_entries=16, show_spinner=False)
+@perfilado()
+def calcular_intervalos(_cubo: AggregateCube, versao: str) -> pd.DataFrame:
+    """Intervalos bootstrap e p-valores da taxa de promoção por departamento (uma vez por versão dos dados)"""
+    return intervalos_departamento(_cubo)
 
-def create_department_bar_plot(df: pd.DataFrame, column: str, title: str) -> go.Figure:
-    """Cria gráfico de barras interativo para métricas departamentais"""
-    metric_data = df.groupby('department')[column].mean()
+@perfilado()
+def create_department_bar_plot(medias: pd.DataFrame, column: str, title: str,
+                               intervalos: pd.DataFrame = None) -> go.Figure:
+    """Cria gráfico de barras interativo para métricas departamentais (com IC para a taxa de promoção)"""
+    metric_data = medias[column].rename_axis('department')
     if column == 'is_promoted':
         metric_data *= 100
         
@@ -90,15 +96,27 @@ def create_department_bar_plot(df: pd.DataFrame, column: str, title: str) -> go.
     
     if column == 'is_promoted':
         fig.update_layout(yaxis_title="Taxa de Promoção (%)")
+        if intervalos is not None:
+            intervalos = intervalos.reindex(metric_data.index) * 100
+            fig.update_traces(error_y=dict(
+                type='data',
+                symmetric=False,
+                array=(intervalos['taxa_sup'] - metric_data).to_numpy(),
+                arrayminus=(metric_data - intervalos['taxa_inf']).to_numpy(),
+                color='#999999'
+            ))
     elif column == 'KPIs_met >80%':
         fig.update_layout(yaxis_title="KPIs Atingidos (%)")
         fig.update_traces(marker_color='#666666')
     
     return fig
 
-def create_education_distribution_plot(df: pd.DataFrame) -> go.Figure:
+@perfilado()
+def create_education_distribution_plot(cubo: AggregateCube) -> go.Figure:
     """Cria gráfico de barras empilhadas da distribuição educacional"""
-    educ_dept = pd.crosstab(df['department'], df['education'], normalize='index') * 100
+    educ_dept = cubo.rollup(['department', 'education'])['count'].unstack(fill_value=0)
+    educ_dept = educ_dept.div(educ_dept.sum(axis=1), axis=0) * 100
+    educ_dept.columns = educ_dept.columns.astype(str)
     
     fig = px.bar(
         educ_dept.reset_index(),
@@ -132,80 +150,78 @@ def display_key_metrics(resultados: Dict[str, Any]) -> None:
             st.markdown(f"<div class='metric-card'><h3>{title}</h3><h2>{value}</h2></div>", 
                        unsafe_allow_html=True)
 
-def generate_department_report(resultados: Dict[str, Any]) -> str:
-    """Gera relatório textual formatado com insights"""
-    top_dept = max(resultados['contagem'], key=resultados['contagem'].get)
-    top_promo = max(resultados['promocao'], key=resultados['promocao'].get)
-    top_score = max(resultados['scores'], key=resultados['scores'].get)
-    
-    report = f"""
-    📌 **Principais Insights**
-
-    **Distribuição Departamental:**
-    - Departamento mais numeroso: {top_dept} ({resultados['contagem'][top_dept]} funcionários)
-    - Representa {(resultados['contagem'][top_dept]/resultados['total']*100):.1f}% do total
-
-    **Performance:**
-    - 🚀 Melhor taxa de promoção: {top_promo} ({resultados['promocao'][top_promo]:.1f}%)
-    - 🎯 Melhor score de treinamento: {top_score} ({resultados['scores'][top_score]:.1f} pontos)
-
-    **Recomendações:**
-    - Desenvolver programa de desenvolvimento gerencial para {top_dept}
-    - Implementar plano de capacitação técnica para departamentos com baixos scores
-    - Criar programa de retenção para departamentos com maior tempo de serviço
-    """
-    
-    return report.strip()
 def main():
     """Função principal do dashboard"""
     st.markdown('<h1 class="header-text">🏢 Análise de Desempenho Departamental</h1>', unsafe_allow_html=True)
     
-    # Carregar dados
-    df = load_data('../data/processed/train_atualizado.csv')
+    # Carregar cubo de agregados
+    data_path = '../data/processed/train_atualizado.csv'
+    # CSV ausente ou ilegível: mesma mensagem do carregamento dos dados
+    try:
+        versao = data_version(data_path)
+    except Exception:
+        st.error("Erro ao carregar dados.")
+        return
+    acompanhar_versao(data_path, versao)
+    cubo = get_cube(data_path, versao)
     
-    if not df.empty:
-        # Processar dados
-        resultados = {
-            'contagem': df['department'].value_counts().to_dict(),
-            'promocao': df.groupby('department')['is_promoted'].mean().mul(100).round(1).to_dict(),
-            'scores': df.groupby('department')['avg_training_score'].mean().round(1).to_dict(),
-            'kpis': df.groupby('department')['KPIs_met >80%'].mean().mul(100).round(1).to_dict(),
-            'tempo_servico': df.groupby('department')['length_of_service'].mean().round(1).to_dict(),
-            'total': len(df)
-        }
+    if cubo is not None and cubo.total > 0:
+        # Intervalos e testes por reamostragem dos agregados por departamento
+        intervalos = calcular_intervalos(cubo, versao)
+
+        # Processar dados (roll-up do cubo por departamento)
+        with medir('metricas', linhas=cubo.total):
+            contagem = cubo.counts('department')
+            medias = cubo.mean('department')
+            resultados = metricas_departamento(contagem, medias, intervalos)
         
         # Seção de métricas
         display_key_metrics(resultados)
         
-        # Layout principal
+        # Layout principal (figuras servidas do cache por versão dos dados)
+        cache = cache_padrao()
         col1, col2 = st.columns([3, 1])
         
         with col1:
             # Gráficos principais
-            st.plotly_chart(
-                create_department_bar_plot(df, 'is_promoted', 'Taxa de Promoção por Departamento'),
+            plotly_chart(
+                cache.figure(
+                    versao, 'department_bar', {'column': 'is_promoted'},
+                    lambda: create_department_bar_plot(medias, 'is_promoted',
+                                                       f'Taxa de Promoção por Departamento (IC {NIVEL:.0%})',
+                                                       intervalos)
+                ),
                 use_container_width=True
             )
             
-            st.plotly_chart(
-                create_department_bar_plot(df, 'avg_training_score', 'Score Médio de Treinamento por Departamento'),
+            plotly_chart(
+                cache.figure(
+                    versao, 'department_bar', {'column': 'avg_training_score'},
+                    lambda: create_department_bar_plot(medias, 'avg_training_score', 'Score Médio de Treinamento por Departamento')
+                ),
                 use_container_width=True
             )
             
-            st.plotly_chart(
-                create_education_distribution_plot(df),
+            plotly_chart(
+                cache.figure(versao, 'department_education', None, lambda: create_education_distribution_plot(cubo)),
                 use_container_width=True
             )
         
         with col2:
             # Gráficos secundários
-            st.plotly_chart(
-                create_department_bar_plot(df, 'KPIs_met >80%', 'KPIs Atingidos por Departamento'),
+            plotly_chart(
+                cache.figure(
+                    versao, 'department_bar', {'column': 'KPIs_met >80%'},
+                    lambda: create_department_bar_plot(medias, 'KPIs_met >80%', 'KPIs Atingidos por Departamento')
+                ),
                 use_container_width=True
             )
             
-            st.plotly_chart(
-                create_department_bar_plot(df, 'length_of_service', 'Tempo Médio de Serviço por Departamento'),
+            plotly_chart(
+                cache.figure(
+                    versao, 'department_bar', {'column': 'length_of_service'},
+                    lambda: create_department_bar_plot(medias, 'length_of_service', 'Tempo Médio de Serviço por Departamento')
+                ),
                 use_container_width=True
             )
         
@@ -217,5 +233,16 @@ def main():
                     unsafe_allow_html=True
                 )
 
+        stats = cache.stats()
+        st.sidebar.caption(f"Cache de figuras: {stats['hits']} acertos · {stats['misses']} falhas · "
+                           f"{stats['size']}/{stats['maxsize']} itens")
+
+def pagina():
+    """Página do dashboard (registrada no app multipágina)"""
+    aplicar_estilo()
+    with painel_desempenho('departamentos'):
+        main()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    st.set_page_config(**PAGE_CONFIG)
+    pagina()
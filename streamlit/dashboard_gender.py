@@ -1,20 +1,33 @@
 import streamlit as st
 import pandas as pd
 # Removed unused numpy import
-import plotly.express as px
 import plotly.graph_objects as go
 from typing import Dict, Any
+from debug_panel import painel_desempenho, plotly_chart
+from figure_cache import cache_padrao
+from filter_engine import FilterEngine, quantil_histograma
+from lazy_import import lazy_module
+from page_metrics import generate_gender_report, intervalos_genero, metricas_genero
+from partitioned_store import processos_configurados
+from profiling import medir, perfilado
+from promotion_stats import NIVEL
+from shared_data import acompanhar_versao, data_version, dataset_columns, get_ingestor
+from sketches import ResumoAproximado, construir_resumo_paralelo
 
-# Configuração inicial da página
-st.set_page_config(
-    page_title="Análise de Gênero Corporativa",
-    page_icon="👥",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Carregado na primeira figura construída (ver lazy_import)
+px = lazy_module('plotly.express')
 
-# Estilos CSS personalizados
-st.markdown("""
+# Configuração da página (aplicada pelo app multipágina ou na execução isolada)
+PAGE_CONFIG = {
+    'page_title': "Análise de Gênero Corporativa",
+    'page_icon': "👥",
+    'layout': "wide",
+    'initial_sidebar_state': "expanded"
+}
+
+def aplicar_estilo() -> None:
+    """Estilos CSS personalizados"""
+    st.markdown("""
     <style>
     .main { background-color: #FFFFFF; }
     .header-text { 
@@ -47,40 +60,81 @@ st.markdown("""
         margin: 15px 0;
     }
     </style>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
-@st.cache_data(show_spinner="Carregando dados...")
-def load_data(file_path: str) -> pd.DataFrame:
+@perfilado()
+def load_data(file_path: str, versao: str) -> pd.DataFrame:
     """
-    Carrega e otimiza os dados do arquivo CSV
+    Carrega as colunas necessárias a partir da base compartilhada entre as páginas
     
     Parâmetros:
         file_path (str): Caminho do arquivo CSV
+        versao (str): Versão dos dados
         
     Retorna:
         pd.DataFrame: DataFrame otimizado
     """
     try:
-        df = pd.read_csv(
-            file_path,
-            usecols=['gender', 'is_promoted', 'department', 'age', 'avg_training_score', 'KPIs_met >80%'],
-            dtype={
-                'gender': 'category',
-                'department': 'category',
-                'is_promoted': 'int8',
-                'age': 'int8',
-                'avg_training_score': 'int16',
-                'KPIs_met >80%': 'int8'
-            }
+        df = dataset_columns(
+            ['gender', 'is_promoted', 'department', 'age', 'avg_training_score', 'KPIs_met >80%'],
+            file_path, versao
         )
         return df.dropna(subset=['gender'])
     except Exception as e:
         st.error(f"Erro ao carregar dados: {str(e)}")
         return pd.DataFrame()
 
-def create_gender_distribution_plot(df: pd.DataFrame) -> go.Figure:
+@st.cache_resource(max_entries=2, show_spinner="Indexando dados...")
+def get_engine(file_path: str, versao: str) -> FilterEngine:
+    """Constrói o motor de filtros (bitmaps) uma vez por versão dos dados"""
+    df = load_data(file_path, versao)
+    if df.empty:
+        return None
+    with medir('FilterEngine', linhas=len(df)):
+        return FilterEngine(df)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+@perfilado()
+def calcular_metricas(_engine: FilterEngine, versao: str, age_range: tuple, selected_dept: str) -> Dict[str, Any]:
+    """Avalia os filtros no motor de bitmaps; combinações repetidas vêm do cache"""
+    filtros = {} if selected_dept == 'Todos' else {'department': selected_dept}
+    return _engine.avaliar(age_range, filtros)
+
+@st.cache_resource(max_entries=2, show_spinner="Construindo agregados...")
+def get_resumo_aproximado(file_path: str, versao: str) -> ResumoAproximado:
+    """
+    Constrói o agregado por chave e os t-digests do modo agregado uma vez por versão dos dados.
+    Com HR_PROCESSOS definido e sem deltas aplicados, o arquivo colunar é a própria versão
+    e o resumo é montado por faixas de linhas em um pool de processos.
+    """
+    processos = processos_configurados()
+    if processos and get_ingestor(file_path).versao_base == versao:
+        with medir('ResumoAproximado (paralelo)') as medida:
+            resumo = construir_resumo_paralelo(file_path, processos)
+            medida.linhas = resumo.n
+        return resumo
+    df = load_data(file_path, versao)
+    if df.empty:
+        return None
+    with medir('ResumoAproximado', linhas=len(df)):
+        return ResumoAproximado.build(df)
+
+@perfilado()
+def calcular_aproximado(resumo: ResumoAproximado, age_range: tuple, selected_dept: str) -> Dict[str, Any]:
+    """Métricas de um estado de filtro a partir do agregado (custo independente do tamanho da base)"""
+    filtros = {} if selected_dept == 'Todos' else {'department': selected_dept}
+    return resumo.avaliar(age_range, filtros)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+@perfilado()
+def calcular_intervalos(_engine: FilterEngine, versao: str, age_range: tuple, selected_dept: str) -> pd.DataFrame:
+    """Intervalos bootstrap e p-valores da taxa de promoção por gênero para um estado de filtro"""
+    return intervalos_genero(calcular_metricas(_engine, versao, age_range, selected_dept))
+
+@perfilado()
+def create_gender_distribution_plot(contagem: pd.Series) -> go.Figure:
     """Cria gráfico de pizza interativo da distribuição de gênero"""
-    gender_dist = df['gender'].value_counts().reset_index()
+    gender_dist = contagem.rename_axis('gender').reset_index()
     fig = px.pie(
         gender_dist,
         names='gender',
@@ -91,23 +145,34 @@ def create_gender_distribution_plot(df: pd.DataFrame) -> go.Figure:
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
-def create_promotion_analysis_plot(df: pd.DataFrame) -> go.Figure:
-    """Cria gráfico de barras interativo da taxa de promoção"""
-    promotion = df.groupby('gender')['is_promoted'].mean() * 100
+@perfilado()
+def create_promotion_analysis_plot(promotion: pd.Series, intervalos: pd.DataFrame = None) -> go.Figure:
+    """Cria gráfico de barras interativo da taxa de promoção, com o intervalo de confiança como barra de erro"""
     fig = px.bar(
         promotion,
         x=promotion.index,
         y=promotion.values,
-        title='Taxa de Promoção por Gênero',
+        title=f'Taxa de Promoção por Gênero (IC {NIVEL:.0%})' if intervalos is not None else 'Taxa de Promoção por Gênero',
         labels={'y': 'Taxa (%)', 'x': 'Gênero'},
         color_discrete_sequence=['#333333']
     )
+    if intervalos is not None:
+        intervalos = intervalos.reindex(promotion.index) * 100
+        fig.update_traces(error_y=dict(
+            type='data',
+            symmetric=False,
+            array=(intervalos['taxa_sup'] - promotion).to_numpy(),
+            arrayminus=(promotion - intervalos['taxa_inf']).to_numpy(),
+            color='#999999'
+        ))
     fig.update_layout(yaxis_range=[0, 100])
     return fig
 
-def create_department_distribution_plot(df: pd.DataFrame) -> go.Figure:
+@perfilado()
+def create_department_distribution_plot(dept_counts: pd.DataFrame) -> go.Figure:
     """Cria gráfico de barras horizontais da distribuição por departamento"""
-    dept_gender = pd.crosstab(df['department'], df['gender'], normalize='columns') * 100
+    dept_gender = dept_counts.div(dept_counts.sum(axis=0), axis=1) * 100
+    dept_gender.columns = dept_gender.columns.astype(str)
     fig = px.bar(
         dept_gender.reset_index(),
         x='department',
@@ -121,17 +186,29 @@ def create_department_distribution_plot(df: pd.DataFrame) -> go.Figure:
     fig.update_layout(xaxis_title="Departamento", yaxis_title="Percentual (%)")
     return fig
 
-def create_age_distribution_plot(df: pd.DataFrame) -> go.Figure:
-    """Cria boxplot interativo da distribuição de idade"""
-    fig = px.box(
-        df,
-        x='gender',
-        y='age',
+@perfilado()
+def create_age_distribution_plot(idade_por_genero: pd.DataFrame) -> go.Figure:
+    """Cria boxplot interativo da distribuição de idade a partir do histograma por gênero"""
+    idades = idade_por_genero.index.to_numpy()
+    fig = go.Figure()
+    for gender in idade_por_genero.columns:
+        contagens = idade_por_genero[gender].to_numpy()
+        q1, mediana, q3 = (quantil_histograma(idades, contagens, q) for q in (0.25, 0.5, 0.75))
+        presentes = idades[contagens > 0]
+        iqr = q3 - q1
+        fig.add_trace(go.Box(
+            name=str(gender),
+            q1=[q1], median=[mediana], q3=[q3],
+            lowerfence=[presentes[presentes >= q1 - 1.5 * iqr].min()],
+            upperfence=[presentes[presentes <= q3 + 1.5 * iqr].max()],
+            marker_color='#000000'
+        ))
+    fig.update_layout(
         title='Distribuição de Idade por Gênero',
-        color='gender',
-        color_discrete_sequence=['#000000']
+        xaxis_title='gender',
+        yaxis_title='age',
+        showlegend=False
     )
-    fig.update_layout(showlegend=False)
     return fig
 
 def display_key_metrics(resultados: Dict[str, Any]) -> None:
@@ -148,86 +225,133 @@ def display_key_metrics(resultados: Dict[str, Any]) -> None:
         with col:
             st.markdown(f"<div class='metric-card'><h3>{title}</h3>", unsafe_allow_html=True)
             for gender, value in resultados[key].items():
+                ajuda = resultados['ajuda'].get(key, {}).get(gender)
                 if key == 'taxa_promocao':
-                    st.metric(gender, f"{value:.1f}%")
+                    inferior, superior = resultados['ic_promocao'][gender]
+                    st.metric(gender, f"{value:.1f}%", help=f"IC {NIVEL:.0%}: {inferior:.1f}% a {superior:.1f}%")
                 elif key == 'media_kpi':
-                    st.metric(gender, f"{value*100:.1f}%")
+                    st.metric(gender, f"{value*100:.1f}%", help=ajuda)
                 else:
-                    st.metric(gender, f"{value:.1f}")
+                    st.metric(gender, f"{value:.1f}", help=ajuda)
             st.markdown("</div>", unsafe_allow_html=True)
 
-def generate_gender_report(resultados: Dict[str, Any]) -> str:
-    """Gera relatório textual formatado"""
-    report = f"""
-    📌 Principais Insights
+def exibir_analise(avaliacao: Dict[str, Any], intervalos: pd.DataFrame, versao: str, selected_dept: str,
+                   age_range: tuple) -> None:
+    """
+    Métricas, gráficos e relatório de um estado de filtro.
+
+    Parâmetros:
+        avaliacao (dict): Resultado de FilterEngine.avaliar ou de ResumoAproximado.avaliar
+        intervalos (pd.DataFrame): Intervalos bootstrap e p-valores
+        versao (str): Versão dos dados
+        selected_dept (str): Departamento selecionado
+        age_range (tuple): Faixa etária selecionada
+    """
+    medias = avaliacao['medias']
+    ajuda = {}
+    if 'quantis_score' in avaliacao:
+        st.caption("⚡ Contagens, médias e intervalos saem do agregado por (departamento, gênero, idade) e são "
+                   "iguais aos da base completa; só os quartis do score são aproximados (t-digest).")
+        ajuda = {
+            'media_score': {
+                g: f"Quartis (t-digest): {linha.q1:.0f} / {linha.mediana:.0f} / {linha.q3:.0f}"
+                for g, linha in avaliacao['quantis_score'].iterrows()
+            }
+        }
+
+    with medir('metricas', linhas=avaliacao['total']):
+        resultados = metricas_genero(avaliacao['contagem'], medias, intervalos)
+        resultados['ajuda'] = ajuda
 
-    **Distribuição de Gênero:**
-    {''.join([f'\n- {k}: {v} funcionários ({(v/resultados["total"]*100):.1f}%)' for k, v in resultados['distribuicao_genero'].items()])}
+    # Seção de métricas
+    display_key_metrics(resultados)
 
-    **Performance por Gênero:**
-    - 🏆 KPIs Atingidos: {max(resultados['media_kpi'], key=resultados['media_kpi'].get).title()} lidera com {max(resultados['media_kpi'].values())*100:.1f}%
-    - 🎯 Score de Treinamento: {max(resultados['media_score'], key=resultados['media_score'].get).title()} com média de {max(resultados['media_score'].values()):.1f} pontos
+    # Layout dos gráficos (servidos do cache de figuras por estado de filtro)
+    cache = cache_padrao()
+    # Os dois modos dão os mesmos números: as figuras são compartilhadas
+    params = {'selected_dept': selected_dept, 'age_range': age_range}
+    col1, col2 = st.columns(2)
+    with col1:
+        plotly_chart(cache.figure(
+            versao, 'gender_distribution', params,
+            lambda: create_gender_distribution_plot(avaliacao['contagem'])
+        ), use_container_width=True)
+        plotly_chart(cache.figure(
+            versao, 'gender_department_distribution', params,
+            lambda: create_department_distribution_plot(avaliacao['categoria_por_grupo']['department'])
+        ), use_container_width=True)
+    
+    with col2:
+        plotly_chart(cache.figure(
+            versao, 'gender_promotion', params,
+            lambda: create_promotion_analysis_plot(medias['is_promoted'] * 100, intervalos)
+        ), use_container_width=True)
+        plotly_chart(cache.figure(
+            versao, 'gender_age_distribution', params,
+            lambda: create_age_distribution_plot(avaliacao['idade_por_grupo'])
+        ), use_container_width=True)
 
-    **Recomendações Estratégicas:**
-    - Implementar programas de mentoria cruzada
-    - Revisar processos de promoção
-    - Desenvolver treinamentos específicos por gênero
-    """
-    return report
+    # Relatório textual
+    with st.expander("📄 Ver Relatório Completo", expanded=True):
+        st.markdown(f'<div class="report-box">{generate_gender_report(resultados)}</div>', unsafe_allow_html=True)
 
 def main():
     """Função principal do dashboard"""
     st.markdown('<h1 class="header-text">👥 Análise de Diversidade de Gênero</h1>', unsafe_allow_html=True)
     
-    # Carregar dados
-    df = load_data('../data/processed/train_atualizado.csv')
+    # Carregar dados indexados
+    data_path = '../data/processed/train_atualizado.csv'
+    # CSV ausente ou ilegível: mesma mensagem do carregamento dos dados
+    try:
+        versao = data_version(data_path)
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {str(e)}")
+        return
+    acompanhar_versao(data_path, versao)
+
+    # Modo agregado: o agregado por chave responde a cada movimento dos filtros em tempo constante
+    agregado = st.sidebar.toggle(
+        "⚡ Modo agregado",
+        help="Responde aos filtros a partir de contagens e somas por (departamento, gênero, idade), sem "
+             "varrer as linhas nem indexar a base; os números são os mesmos e os quartis do score vêm de t-digests."
+    )
+    fonte = get_resumo_aproximado(data_path, versao) if agregado else get_engine(data_path, versao)
     
-    if not df.empty:
+    if fonte is not None and fonte.n > 0:
         # Filtros interativos
         with st.container():
             col1, col2 = st.columns(2)
             with col1:
-                departments = ['Todos'] + df['department'].unique().tolist()
+                departments = ['Todos'] + fonte.categorias['department']
                 selected_dept = st.selectbox("🏢 Departamento", options=departments)
             with col2:
                 age_range = st.slider(
                     "📅 Faixa Etária",
-                    min_value=int(df['age'].min()),
-                    max_value=int(df['age'].max()),
+                    min_value=fonte.idade_min,
+                    max_value=fonte.idade_max,
                     value=(25, 55)
                 )
 
-        # Aplicar filtros
-        filtered_df = df[df['age'].between(*age_range)]
-        if selected_dept != 'Todos':
-            filtered_df = filtered_df[filtered_df['department'] == selected_dept]
-
-        # Calcular métricas
-        resultados = {
-            'distribuicao_genero': filtered_df['gender'].value_counts().to_dict(),
-            'taxa_promocao': filtered_df.groupby('gender')['is_promoted'].mean().mul(100).round(1).to_dict(),
-            'media_idade': filtered_df.groupby('gender')['age'].mean().round(1).to_dict(),
-            'media_score': filtered_df.groupby('gender')['avg_training_score'].mean().round(1).to_dict(),
-            'media_kpi': filtered_df.groupby('gender')['KPIs_met >80%'].mean().round(3).to_dict(),
-            'total': len(filtered_df)
-        }
-
-        # Seção de métricas
-        display_key_metrics(resultados)
+        cache = cache_padrao()
+        if agregado:
+            # Sem motor de bitmaps: contagens e promovidos do agregado alimentam também o bootstrap
+            avaliacao = calcular_aproximado(fonte, tuple(age_range), selected_dept)
+            intervalos = intervalos_genero(avaliacao)
+        else:
+            avaliacao = calcular_metricas(fonte, versao, tuple(age_range), selected_dept)
+            intervalos = calcular_intervalos(fonte, versao, tuple(age_range), selected_dept)
+        exibir_analise(avaliacao, intervalos, versao, selected_dept, age_range)
 
-        # Layout dos gráficos
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(create_gender_distribution_plot(filtered_df), use_container_width=True)
-            st.plotly_chart(create_department_distribution_plot(filtered_df), use_container_width=True)
-        
-        with col2:
-            st.plotly_chart(create_promotion_analysis_plot(filtered_df), use_container_width=True)
-            st.plotly_chart(create_age_distribution_plot(filtered_df), use_container_width=True)
+        stats = cache.stats()
+        st.sidebar.caption(f"Cache de figuras: {stats['hits']} acertos · {stats['misses']} falhas · "
+                           f"{stats['size']}/{stats['maxsize']} itens")
 
-        # Relatório textual
-        with st.expander("📄 Ver Relatório Completo", expanded=True):
-            st.markdown(f'<div class="report-box">{generate_gender_report(resultados)}</div>', unsafe_allow_html=True)
+def pagina():
+    """Página do dashboard (registrada no app multipágina)"""
+    aplicar_estilo()
+    with painel_desempenho('genero'):
+        main()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    st.set_page_config(**PAGE_CONFIG)
+    pagina()
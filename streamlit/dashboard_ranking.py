@@ -0,0 +1,242 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from dataclasses import asdict
+from typing import Dict, Any
+from debug_panel import painel_desempenho, plotly_chart
+from figure_cache import cache_padrao
+from lazy_import import lazy_module
+from profiling import medir, perfilado
+from scoring import PesosScore, ScoringEngine
+from shared_data import acompanhar_versao, data_version, dataset_columns
+
+# Carregado na primeira figura construída (ver lazy_import)
+px = lazy_module('plotly.express')
+
+# Configuração da página (aplicada pelo app multipágina ou na execução isolada)
+PAGE_CONFIG = {
+    'page_title': "Ranking de Promoção",
+    'page_icon': "🏅",
+    'layout': "wide",
+    'initial_sidebar_state': "expanded"
+}
+
+def aplicar_estilo() -> None:
+    """Estilos CSS personalizados"""
+    st.markdown("""
+    <style>
+    .main { background-color: #FFFFFF; }
+    .header-text {
+        color: #000000;
+        font-family: 'Arial';
+        border-bottom: 2px solid #000000;
+        padding-bottom: 10px;
+        margin-bottom: 1.5rem;
+    }
+    .metric-card {
+        background-color: #F8F9FA;
+        border: 1px solid #E0E0E0;
+        border-radius: 8px;
+        padding: 20px;
+        margin: 10px 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+    }
+    .report-box {
+        border: 1px solid #E0E0E0;
+        border-radius: 8px;
+        padding: 25px;
+        margin: 15px 0;
+        background-color: #FFFFFF;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+COLUNAS_SCORE = ['employee_id', 'avg_training_score', 'previous_year_rating',
+                 'length_of_service', 'recruitment_channel', 'KPIs_met >80%']
+
+@perfilado()
+def load_data(file_path: str, versao: str) -> pd.DataFrame:
+    """
+    Carrega as colunas usadas pelo score a partir da base compartilhada entre as páginas
+
+    Parâmetros:
+        file_path (str): Caminho do arquivo CSV
+        versao (str): Versão dos dados
+
+    Retorna:
+        pd.DataFrame: DataFrame otimizado
+    """
+    try:
+        return dataset_columns(COLUNAS_SCORE, file_path, versao)
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {str(e)}")
+        return pd.DataFrame()
+
+@st.cache_resource(max_entries=2, show_spinner="Calculando scores...")
+def get_engine(file_path: str, versao: str) -> ScoringEngine:
+    """Constrói o motor de score uma vez por versão dos dados (os pesos entram só no ranking)"""
+    df = load_data(file_path, versao)
+    if df.empty:
+        return None
+    with medir('ScoringEngine', linhas=len(df)):
+        return ScoringEngine().adicionar(df)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+@perfilado()
+def calcular_ranking(_engine: ScoringEngine, file_path: str, versao: str, pesos: PesosScore,
+                     metodo: str) -> pd.DataFrame:
+    """
+    Ranking percentil dos elegíveis, com o departamento de cada funcionário.
+    O DataFrame é compartilhado entre as sessões sem cópia (cache_resource, sem
+    pickle a cada rerun) e deve ser tratado como somente leitura.
+    """
+    ranking = _engine.ranking(metodo, pesos=pesos)
+    departamentos = dataset_columns(['employee_id', 'department'], file_path, versao).set_index('employee_id')['department']
+    ranking['department'] = departamentos.reindex(ranking['employee_id']).to_numpy()
+    return ranking
+
+@perfilado()
+def create_score_histogram(ranking: pd.DataFrame, bins: int = 60) -> go.Figure:
+    """
+    Cria histograma da distribuição dos scores.
+
+    As contagens por faixa são calculadas no servidor com NumPy e a figura
+    recebe apenas as barras: o JSON enviado ao navegador tem tamanho fixo,
+    independente do número de funcionários.
+    """
+    scores = ranking['promotion_probability'].to_numpy(dtype=np.float64)
+    scores = scores[~np.isnan(scores)]
+    contagens, bordas = np.histogram(scores, bins=bins)
+    fig = go.Figure(go.Bar(
+        x=(bordas[:-1] + bordas[1:]) / 2,
+        y=contagens,
+        customdata=np.column_stack([bordas[:-1], bordas[1:]]),
+        hovertemplate='Score %{customdata[0]:.3f} – %{customdata[1]:.3f}<br>Funcionários: %{y}<extra></extra>',
+        marker_color='#333333'
+    ))
+    fig.update_layout(
+        title='Distribuição do Score de Promoção',
+        xaxis_title="Score",
+        yaxis_title="Funcionários",
+        bargap=0.05
+    )
+    return fig
+
+@perfilado()
+def create_department_percentile_plot(ranking: pd.DataFrame) -> go.Figure:
+    """Cria gráfico de barras do percentil médio por departamento"""
+    media = ranking.groupby('department', observed=True)['percentile_rank'].mean().sort_values()
+    fig = px.bar(
+        x=media.values,
+        y=media.index.astype(str),
+        orientation='h',
+        title='Percentil Médio por Departamento',
+        labels={'x': 'Percentil médio', 'y': 'Departamento'},
+        color_discrete_sequence=['#666666']
+    )
+    fig.update_layout(xaxis_range=[0, 100])
+    return fig
+
+def display_key_metrics(resultados: Dict[str, Any]) -> None:
+    """Exibe métricas principais em cards estilizados"""
+    cols = st.columns(4)
+    metrics = [
+        ('👥 Elegíveis', f"{resultados['elegiveis']:,}"),
+        ('📊 Score Médio', f"{resultados['score_medio']:.3f}"),
+        ('🏅 Top 10%', f"{resultados['top10']:,}"),
+        ('🏢 Depto. Destaque', resultados['dept_destaque'])
+    ]
+
+    for col, (title, value) in zip(cols, metrics):
+        with col:
+            st.markdown(f"<div class='metric-card'><h3>{title}</h3><h2>{value}</h2></div>",
+                       unsafe_allow_html=True)
+
+def sidebar_pesos() -> PesosScore:
+    """Controles de pesos da fórmula na barra lateral"""
+    padrao = PesosScore()
+    st.sidebar.header("⚖️ Pesos do Score")
+    return PesosScore(
+        treinamento=st.sidebar.slider("Score de treinamento", 0.0, 1.0, padrao.treinamento, 0.05),
+        avaliacao=st.sidebar.slider("Avaliação anterior", 0.0, 1.0, padrao.avaliacao, 0.05),
+        tempo_servico=st.sidebar.slider("Tempo de serviço", 0.0, 1.0, padrao.tempo_servico, 0.05),
+        canal=st.sidebar.slider("Canal de recrutamento", 0.0, 1.0, padrao.canal, 0.05)
+    )
+
+def main():
+    """Função principal do dashboard"""
+    st.markdown('<h1 class="header-text">🏅 Ranking Preditivo de Promoção</h1>', unsafe_allow_html=True)
+
+    pesos = sidebar_pesos()
+    metodo = st.sidebar.radio("Percentil", options=['exato', 'aproximado'], horizontal=True)
+
+    # Carregar dados e motor de score
+    data_path = '../data/processed/train_atualizado.csv'
+    # CSV ausente ou ilegível: mesma mensagem do carregamento dos dados
+    try:
+        versao = data_version(data_path)
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {str(e)}")
+        return
+    acompanhar_versao(data_path, versao)
+    engine = get_engine(data_path, versao)
+
+    if engine is not None:
+        ranking = calcular_ranking(engine, data_path, versao, pesos, metodo)
+
+        if ranking.empty:
+            st.warning("Nenhum funcionário elegível (KPIs atingidos) na base.")
+            return
+
+        with medir('metricas', linhas=len(ranking)):
+            resultados = {
+                'elegiveis': len(ranking),
+                'score_medio': float(np.nanmean(ranking['promotion_probability'])),
+                'top10': int((ranking['percentile_rank'] > 90).sum()),
+                'dept_destaque': str(ranking.groupby('department', observed=True)['percentile_rank'].mean().idxmax())
+            }
+        display_key_metrics(resultados)
+
+        # Gráficos servidos do cache de figuras por pesos e método
+        cache = cache_padrao()
+        params = {'pesos': asdict(pesos), 'metodo': metodo}
+        col1, col2 = st.columns(2)
+        with col1:
+            plotly_chart(cache.figure(versao, 'ranking_histogram', params,
+                                         lambda: create_score_histogram(ranking)),
+                            use_container_width=True)
+        with col2:
+            plotly_chart(cache.figure(versao, 'ranking_department', params,
+                                         lambda: create_department_percentile_plot(ranking)),
+                            use_container_width=True)
+
+        # Tabela dos melhores colocados
+        departamentos = ['Todos'] + sorted(ranking['department'].dropna().astype(str).unique())
+        departamento = st.selectbox("🏢 Departamento", options=departamentos)
+        top_n = st.slider("Quantidade exibida", 10, 200, 50, 10)
+        tabela = ranking if departamento == 'Todos' else ranking[ranking['department'] == departamento]
+        st.dataframe(
+            tabela.head(top_n).rename(columns={
+                'employee_id': 'Funcionário',
+                'promotion_probability': 'Score',
+                'percentile_rank': 'Percentil',
+                'department': 'Departamento'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        stats = cache.stats()
+        st.sidebar.caption(f"Cache de figuras: {stats['hits']} acertos · {stats['misses']} falhas · "
+                           f"{stats['size']}/{stats['maxsize']} itens")
+
+def pagina():
+    """Página do dashboard (registrada no app multipágina)"""
+    aplicar_estilo()
+    with painel_desempenho('ranking'):
+        main()
+
+if __name__ == "__main__":
+    st.set_page_config(**PAGE_CONFIG)
+    pagina()
@@ -2,22 +2,32 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-import seaborn as sns
+from typing import Callable, Dict
+from aggregate_cube import AggregateCube
+from debug_panel import painel_desempenho, plotly_chart
+from figure_cache import cache_padrao
+from lazy_import import lazy_module
+from page_metrics import gerar_relatorio_regional, metricas_regiao
+from profiling import medir, perfilado
+from region_kernel import resumir_cubo
+from shared_data import acompanhar_versao, data_version, get_cube as get_shared_cube
+
+# Carregado na primeira figura construída (ver lazy_import)
+px = lazy_module('plotly.express')
 
 # ---------------------------
 # 1. CONFIGURAÇÃO INICIAL DA PÁGINA
 # ---------------------------
-st.set_page_config(
-    page_title="📊 Análise Regional - Funcionários",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-
-# CSS customizado para aprimorar a estética (preto e branco, espaçamento adequado e fontes profissionais)
-st.markdown("""
+PAGE_CONFIG = {
+    'page_title': "📊 Análise Regional - Funcionários",
+    'layout': "wide",
+    'initial_sidebar_state': "collapsed"
+}
+
+def aplicar_estilo() -> None:
+    # CSS customizado para aprimorar a estética (preto e branco, espaçamento adequado e fontes profissionais)
+    st.markdown("""
     <style>
         body {
             color: #000;
@@ -41,190 +51,210 @@ st.markdown("""
 # ---------------------------
 # 2. FUNÇÃO DE CARREGAMENTO DOS DADOS COM CACHE
 # ---------------------------
-@st.cache_data(show_spinner=True)
-def load_data(path: str) -> pd.DataFrame:
+@perfilado()
+def get_cube(path: str, versao: str) -> AggregateCube:
     """
-    Carrega os dados do CSV com a tipagem otimizada e faz cache para performance.
+    Carrega o cubo de agregados compartilhado pelas páginas (um por versão dos dados).
     Parâmetros:
       path (str): Caminho do arquivo CSV.
+      versao (str): Versão dos dados (invalida o cache quando o CSV muda).
     Retorna:
-      DataFrame com os dados carregados.
+      AggregateCube com count, soma e soma dos quadrados por célula.
     """
     try:
-        df = pd.read_csv(path)
-        return df
+        return get_shared_cube(path, versao)
     except Exception as e:
         st.error(f"Erro ao carregar os dados: {e}")
-        return pd.DataFrame()
+        return None
 
 # ---------------------------
-# 3. FUNÇÃO DE ANÁLISE REGIONAL
+# 3. FUNÇÕES DE CRIAÇÃO DOS GRÁFICOS
 # ---------------------------
-def analisar_region(df: pd.DataFrame):
+@perfilado()
+def create_top_regions_plot(serie: pd.Series, top_n: int, coluna: str, titulo: str, rotulo: str) -> go.Figure:
     """
-    Realiza análise completa das regiões e suas relações com outras variáveis.
-    Utiliza cálculos e agrupamentos para extrair métricas de interesse.
+    Cria gráfico de barras com as Top N regiões de uma métrica.
     Parâmetros:
-      df (pandas.DataFrame): DataFrame com os dados.
-    Retorna:
-      dict com os resultados das análises.
+      serie (pd.Series): Métrica indexada por região.
+      top_n (int): Número de regiões exibidas.
+      coluna (str): Nome da coluna da métrica no gráfico.
+      titulo (str): Título do gráfico.
+      rotulo (str): Rótulo do eixo da métrica.
     """
+    df_top = serie.sort_values(ascending=False, kind='stable').head(top_n).reset_index()
+    df_top.columns = ['region', coluna]
+    fig = px.bar(df_top, x='region', y=coluna,
+                 title=titulo,
+                 labels={'region': 'Região', coluna: rotulo},
+                 color_discrete_sequence=["black"])
+    fig.update_layout(template="simple_white")
+    return fig
 
-    try:
-        # Cálculo das métricas agregadas por região
-        region_counts = df['region'].value_counts()
-        region_promotion = df.groupby('region')['is_promoted'].mean() * 100
-        region_scores = df.groupby('region')['avg_training_score'].mean()
-        region_kpis = df.groupby('region')['KPIs_met >80%'].mean() * 100
-
-        resultados = {
-            'contagem': region_counts.to_dict(),
-            'promocao': region_promotion.to_dict(),
-            'scores': region_scores.to_dict(),
-            'kpis': region_kpis.to_dict()
-        }
-    except Exception as e:
-        st.error(f"Erro durante os cálculos agregados: {e}")
-        return {}
+@perfilado()
+def create_correlation_heatmap(region_metrics: pd.DataFrame) -> go.Figure:
+    """Cria o mapa de calor das correlações entre as métricas médias por região."""
+    corr_matrix = region_metrics[['is_promoted', 'avg_training_score', 'KPIs_met >80%',
+                                  'age', 'length_of_service', 'awards_won?']].corr()
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_matrix.values,
+        x=corr_matrix.columns,
+        y=corr_matrix.index,
+        colorscale='RdYlBu',
+        zmid=0,
+        text=corr_matrix.round(2).values.astype(str),
+        hoverinfo="text"
+    ))
+    fig.update_layout(title="Correlação entre Métricas por Região", template="simple_white", height=500)
+    return fig
 
-    # ---------------------------
-    # Criação dos gráficos interativos com Plotly
-    # ---------------------------
+@perfilado()
+def create_department_region_plot(dept_region: pd.DataFrame) -> go.Figure:
+    """Cria o gráfico empilhado da proporção de departamentos em cada região."""
+    dept_region = dept_region.reset_index().melt(id_vars='region', var_name='department', value_name='percentage')
+    fig = px.bar(dept_region, x='region', y='percentage', color='department',
+                 title="Distribuição de Departamentos por Região",
+                 labels={'percentage': 'Proporção (%)', 'region': 'Região'},
+                 text_auto=".1f",
+                 barmode='stack')
+    fig.update_layout(template="simple_white")
+    return fig
 
+# ---------------------------
+# 4. SEÇÕES DE GRÁFICOS (FRAGMENTOS INDEPENDENTES)
+# ---------------------------
+@st.fragment
+def secao_top_regioes(versao: str, metricas: Dict[str, pd.Series]):
+    """
+    Gráficos Top N (contagem, promoção, score e KPIs), desenhados primeiro.
+    Como fragmento, mudar o Top N reexecuta apenas esta seção.
+    Parâmetros:
+      versao (str): Versão dos dados (chave do cache de figuras).
+      metricas (dict): Séries por região de cada gráfico.
+    """
     # Widget: Slider para definir o número "Top N" de regiões a serem exibidas
     top_n = st.slider("Selecione o número de regiões a exibir (Top N):", min_value=3, max_value=20, value=10, step=1)
 
-    # Gráfico 1: Top N Regiões por Número de Funcionários
-    df_counts = region_counts.head(top_n).reset_index()
-    df_counts.columns = ['region', 'count']
-    fig_counts = px.bar(df_counts, x='region', y='count', 
-                        title="Top Regiões por Número de Funcionários",
-                        labels={'region': 'Região', 'count': 'Número de Funcionários'},
-                        color_discrete_sequence=["black"])
-    fig_counts.update_layout(template="simple_white")
-
-    # Gráfico 2: Top N Regiões por Taxa de Promoção
-    df_promo = region_promotion.sort_values(ascending=False).head(top_n).reset_index()
-    df_promo.columns = ['region', 'promotion_rate']
-    fig_promo = px.bar(df_promo, x='region', y='promotion_rate',
-                       title="Top Regiões por Taxa de Promoção (%)",
-                       labels={'region': 'Região', 'promotion_rate': 'Taxa de Promoção (%)'},
-                       color_discrete_sequence=["black"])
-    fig_promo.update_layout(template="simple_white")
-
-    # Gráfico 3: Top N Regiões por Score Médio de Treinamento
-    df_scores = region_scores.sort_values(ascending=False).head(top_n).reset_index()
-    df_scores.columns = ['region', 'avg_training_score']
-    fig_scores = px.bar(df_scores, x='region', y='avg_training_score',
-                        title="Top Regiões por Score Médio de Treinamento",
-                        labels={'region': 'Região', 'avg_training_score': 'Score Médio'},
-                        color_discrete_sequence=["black"])
-    fig_scores.update_layout(template="simple_white")
-
-    # Gráfico 4: Top N Regiões por Taxa de KPIs Atingidos
-    df_kpis = region_kpis.sort_values(ascending=False).head(top_n).reset_index()
-    df_kpis.columns = ['region', 'kpi_rate']
-    fig_kpis = px.bar(df_kpis, x='region', y='kpi_rate',
-                      title="Top Regiões por Taxa de KPIs Atingidos (%)",
-                      labels={'region': 'Região', 'kpi_rate': 'KPIs Atingidos (%)'},
-                      color_discrete_sequence=["black"])
-    fig_kpis.update_layout(template="simple_white")
-
-    # Gráfico 5: Mapa de calor das correlações das métricas por região
+    # Gráficos servidos do cache de figuras (chave: versão dos dados, gráfico e Top N)
+    cache = cache_padrao()
+    params = {'top_n': top_n}
+    graficos = [
+        ('region_counts', 'contagem', 'count', "Top Regiões por Número de Funcionários", 'Número de Funcionários'),
+        ('region_scores', 'scores', 'avg_training_score', "Top Regiões por Score Médio de Treinamento", 'Score Médio'),
+        ('region_promotion', 'promocao', 'promotion_rate', "Top Regiões por Taxa de Promoção (%)", 'Taxa de Promoção (%)'),
+        ('region_kpis', 'kpis', 'kpi_rate', "Top Regiões por Taxa de KPIs Atingidos (%)", 'KPIs Atingidos (%)'),
+    ]
+
+    st.markdown("## 📈 Visualizações Interativas")
+    col1, col2 = st.columns(2)
+    # Cada gráfico é enviado assim que fica pronto (grade preenchida linha a linha)
+    for col, (chart_id, chave, coluna, titulo, rotulo) in zip([col1, col2, col1, col2], graficos):
+        with col:
+            plotly_chart(cache.figure(versao, chart_id, params, lambda: create_top_regions_plot(
+                metricas[chave], top_n, coluna, titulo, rotulo)), use_container_width=True)
+
+@st.fragment
+def secao_sob_demanda(titulo: str, descricao: str, chave: str, versao: str, chart_id: str,
+                      construir: Callable[[], go.Figure], erro: str):
+    """
+    Seção de gráfico pesado calculada somente quando o usuário a pede.
+    O título e a descrição ficam sempre visíveis; o botão reexecuta apenas o
+    fragmento e, uma vez gerado, o gráfico continua na tela nos próximos reruns.
+    Parâmetros:
+      titulo (str): Título da seção.
+      descricao (str): O que o gráfico mostra (exibido antes de gerá-lo).
+      chave (str): Chave do estado "gerado" no session_state.
+      versao (str): Versão dos dados (chave do cache de figuras).
+      chart_id (str): Identificador do gráfico no cache.
+      construir: Função que monta a figura (chamada apenas em falhas do cache).
+      erro (str): Mensagem exibida se a figura não puder ser gerada.
+    """
+    st.markdown(f"### {titulo}")
+    if not st.session_state.get(chave):
+        st.caption(descricao)
+        # O callback marca a seção antes do rerun do fragmento, que já desenha o gráfico sem o botão
+        st.button("📊 Gerar gráfico", key=f"{chave}_botao", on_click=st.session_state.update, args=({chave: True},))
+        return
     try:
-        region_metrics = df.groupby('region').agg({
-            'is_promoted': 'mean',
-            'avg_training_score': 'mean',
-            'KPIs_met >80%': 'mean',
-            'age': 'mean',
-            'length_of_service': 'mean',
-            'awards_won?': 'mean'
-        })
-        corr_matrix = region_metrics.corr()
-        fig_heatmap = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
-            x=corr_matrix.columns,
-            y=corr_matrix.index,
-            colorscale='RdYlBu',
-            zmid=0,
-            text=corr_matrix.round(2).values.astype(str),
-            hoverinfo="text"
-        ))
-        fig_heatmap.update_layout(title="Correlação entre Métricas por Região", template="simple_white", height=500)
+        fig = cache_padrao().figure(versao, chart_id, None, construir)
     except Exception as e:
-        st.error(f"Erro ao gerar o mapa de calor: {e}")
-        fig_heatmap = go.Figure()
+        st.error(f"{erro}: {e}")
+        return
+    plotly_chart(fig, use_container_width=True)
+
+# ---------------------------
+# 5. FUNÇÃO DE ANÁLISE REGIONAL
+# ---------------------------
+@perfilado()
+def analisar_region(cubo: AggregateCube, versao: str):
+    """
+    Realiza análise completa das regiões e suas relações com outras variáveis.
+    Todas as métricas saem de uma única passada do kernel regional sobre o cubo de agregados.
+    Os gráficos Top N são desenhados primeiro; o mapa de calor e a distribuição
+    de departamentos só são calculados quando o usuário os gera em suas seções.
+    Parâmetros:
+      cubo (AggregateCube): Cubo de agregados dos dados.
+      versao (str): Versão dos dados (chave do cache de figuras).
+    Retorna:
+      dict com os resultados das análises.
+    """
 
-    # Gráfico 6: Distribuição de Departamentos por Região (Gráfico empilhado)
     try:
-        dept_region = pd.crosstab(df['region'], df['department'], normalize='index') * 100
-        dept_region = dept_region.reset_index().melt(id_vars='region', var_name='department', value_name='percentage')
-        fig_dept = px.bar(dept_region, x='region', y='percentage', color='department',
-                          title="Distribuição de Departamentos por Região",
-                          labels={'percentage': 'Proporção (%)', 'region': 'Região'},
-                          text_auto=".1f",
-                          barmode='stack')
-        fig_dept.update_layout(template="simple_white")
+        # Cálculo das métricas agregadas por região (kernel de passada única)
+        with medir('metricas', linhas=cubo.total):
+            resumo = resumir_cubo(cubo)
+            metricas = metricas_regiao(resumo)
+            region_counts = metricas['contagem']
+            region_metrics = resumo.medias()
+            resultados = {chave: serie.to_dict() for chave, serie in metricas.items()}
     except Exception as e:
-        st.error(f"Erro ao gerar gráfico de departamentos: {e}")
-        fig_dept = go.Figure()
+        st.error(f"Erro durante os cálculos agregados: {e}")
+        return {}
 
     # ---------------------------
-    # Exibição dos gráficos na página (layout em grid responsivo)
+    # Gráficos interativos com Plotly, em seções independentes
     # ---------------------------
-    st.markdown("## 📈 Visualizações Interativas")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.plotly_chart(fig_counts, use_container_width=True)
-        st.plotly_chart(fig_promo, use_container_width=True)
-    with col2:
-        st.plotly_chart(fig_scores, use_container_width=True)
-        st.plotly_chart(fig_kpis, use_container_width=True)
+    secao_top_regioes(versao, metricas)
 
     st.markdown("---")
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    secao_sob_demanda("🌡️ Mapa de calor das correlações entre métricas",
+                      "Correlação, entre as regiões, das médias de promoção, score, KPIs, idade, tempo de casa e prêmios.",
+                      'region_heatmap_visivel', versao, 'region_heatmap',
+                      lambda: create_correlation_heatmap(region_metrics), "Erro ao gerar o mapa de calor")
     st.markdown("---")
-    st.plotly_chart(fig_dept, use_container_width=True)
+    secao_sob_demanda("🏢 Distribuição de departamentos por região",
+                      "Funcionários de cada departamento nas regiões, em barras empilhadas.",
+                      'region_departments_visivel', versao, 'region_departments',
+                      lambda: create_department_region_plot(resumo.crosstab()), "Erro ao gerar gráfico de departamentos")
 
     # ---------------------------
     # Relatório textual com insights (caixa estilizada)
     # ---------------------------
     st.markdown("## 📝 Relatório Executivo")
-    total_regioes = len(region_counts)
-    media_funcionarios = region_counts.mean()
-    mediana_funcionarios = region_counts.median()
-    top_region = region_counts.idxmax()
-    top_region_percent = (region_counts[top_region] / df.shape[0] * 100)
-
-    relatorio = f"""
-    <div class='report-box'>
-    <h3>Resumo da Análise Regional</h3>
-    <b>Estatísticas Gerais:</b><br>
-    - Total de regiões analisadas: <b>{total_regioes}</b><br>
-    - Média de funcionários por região: <b>{media_funcionarios:.1f}</b><br>
-    - Mediana de funcionários por região: <b>{mediana_funcionarios:.1f}</b><br><br>
-    <b>Destaques:</b><br>
-    - A região <b>{top_region}</b> concentra aproximadamente <b>{top_region_percent:.1f}%</b> do total de funcionários.<br>
-    - As regiões com melhores taxas de promoção, scores e KPIs foram identificadas nos gráficos acima.<br><br>
-    <b>Insights Adicionais:</b><br>
-    - Recomenda-se aprofundar a análise segmentada por departamento e cargo para ações estratégicas.
-    </div>
-    """
-    st.markdown(relatorio, unsafe_allow_html=True)
+    st.markdown(gerar_relatorio_regional(region_counts, cubo.total), unsafe_allow_html=True)
+
+    stats = cache_padrao().stats()
+    st.caption(f"Cache de figuras: {stats['hits']} acertos · {stats['misses']} falhas · "
+               f"{stats['size']}/{stats['maxsize']} itens")
 
     return resultados
 
 # ---------------------------
-# 4. EXECUÇÃO DO DASHBOARD
+# 6. EXECUÇÃO DO DASHBOARD
 # ---------------------------
 def main():
     # Definir o caminho do CSV (certifique-se de que o arquivo está no local correto)
     data_path = '../data/processed/train_atualizado.csv'
-    df = load_data(data_path)
+    # CSV ausente ou ilegível: mesma mensagem do carregamento dos dados
+    try:
+        versao = data_version(data_path)
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados: {e}")
+        st.stop()
+    acompanhar_versao(data_path, versao)
+    cubo = get_cube(data_path, versao)
     
-    # Se o DataFrame estiver vazio, interromper a execução
-    if df.empty:
+    # Se não houver dados, interromper a execução
+    if cubo is None or cubo.total == 0:
         st.stop()
     
     # Cabeçalho principal
@@ -233,10 +263,17 @@ def main():
     st.markdown("---")
     
     # Executar a análise regional e exibir os gráficos e relatório
-    resultados_region = analisar_region(df)
+    resultados_region = analisar_region(cubo, versao)
     
-if __name__ == "__main__":
+def pagina():
+    """Página do dashboard (registrada no app multipágina)"""
+    aplicar_estilo()
     try:
-        main()
+        with painel_desempenho('regioes'):
+            main()
     except Exception as e:
         st.error(f"Ocorreu um erro inesperado: {e}")
+
+if __name__ == "__main__":
+    st.set_page_config(**PAGE_CONFIG)
+    pagina()
@@ -0,0 +1,192 @@
+"""
+Armazenamento colunar compartilhado pelos dashboards.
+
+O CSV processado é convertido uma única vez para Arrow IPC (Feather v2, sem
+compressão) já com a tipagem otimizada. As leituras seguintes usam memory-map
+e carregam apenas as colunas solicitadas. O arquivo colunar é reconstruído
+automaticamente quando o CSV de origem muda (mtime/tamanho e hash SHA-256).
+
+As colunas categóricas usam o dicionário canônico gravado pela limpeza ao
+lado do CSV (`<arquivo>_dicionarios.json`, ver notebook/pipeline_limpeza.py):
+os códigos int8/int16 e a ordem das categorias são os mesmos em todos os
+dashboards e versões dos dados. Mudanças no dicionário também invalidam o
+armazenamento e a versão dos dados.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / 'processed' / 'train_atualizado.csv'
+
+# Tipagem canônica da base processada (mesma usada pelos dashboards)
+SCHEMA: Dict[str, str] = {
+    'employee_id': 'int32',
+    'department': 'category',
+    'region': 'category',
+    'education': 'category',
+    'gender': 'category',
+    'recruitment_channel': 'category',
+    'no_of_trainings': 'int8',
+    'age': 'int8',
+    'previous_year_rating': 'float32',
+    'length_of_service': 'int8',
+    'KPIs_met >80%': 'int8',
+    'awards_won?': 'int8',
+    'avg_training_score': 'int16',
+    'is_promoted': 'int8'
+}
+
+PathLike = Union[str, Path]
+
+
+def _caminhos(source: Path) -> tuple:
+    """Retorna os caminhos do arquivo Arrow e dos metadados de um CSV"""
+    store_dir = source.parent / '.store'
+    return store_dir / f'{source.stem}.arrow', store_dir / f'{source.stem}.json'
+
+
+def _hash_arquivo(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Calcula o SHA-256 do arquivo lendo em blocos"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(chunk_size), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def _ler_meta(meta_path: Path) -> dict:
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def caminho_dicionarios(source: PathLike = DATA_PATH) -> Path:
+    """Dicionário canônico das categorias gravado pela limpeza ao lado do CSV"""
+    source = Path(source)
+    return source.with_name(f'{source.stem}_dicionarios.json')
+
+
+def carregar_dicionarios(source: PathLike = DATA_PATH) -> Dict[str, List[str]]:
+    """{coluna: rótulos na ordem dos códigos}; vazio quando a limpeza não gravou o dicionário"""
+    return _ler_meta(caminho_dicionarios(source))
+
+
+def _hash_dicionarios(source: Path) -> Optional[str]:
+    path = caminho_dicionarios(source)
+    return _hash_arquivo(path) if path.exists() else None
+
+
+def _aplicar_dicionario(serie: pd.Series, rotulos: List[str]) -> pd.Series:
+    """Reordena as categorias segundo o dicionário; rótulos fora dele vão para o final"""
+    conhecidos = set(rotulos)
+    extras = [rotulo for rotulo in serie.cat.categories if rotulo not in conhecidos]
+    return serie.cat.set_categories(list(rotulos) + extras)
+
+
+def _gravar_atomico(path: Path, escrever) -> None:
+    """Grava em arquivo temporário e substitui o destino de forma atômica"""
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        escrever(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _converter(source: Path, arrow_path: Path) -> None:
+    """Lê o CSV completo com a tipagem canônica e grava em Arrow IPC"""
+    colunas = pd.read_csv(source, nrows=0).columns
+    dtypes = {col: tipo for col, tipo in SCHEMA.items() if col in colunas}
+    df = pd.read_csv(source, dtype=dtypes)
+    for col, rotulos in carregar_dicionarios(source).items():
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = _aplicar_dicionario(df[col], rotulos)
+    _gravar_atomico(arrow_path, lambda tmp: feather.write_feather(df, tmp, compression='uncompressed'))
+
+
+def ensure_store(source: PathLike = DATA_PATH) -> Path:
+    """
+    Garante que o arquivo colunar esteja sincronizado com o CSV de origem.
+
+    Parâmetros:
+        source: Caminho do CSV processado
+
+    Retorna:
+        Path: Caminho do arquivo Arrow IPC atualizado
+    """
+    source = Path(source)
+    arrow_path, meta_path = _caminhos(source)
+    stat = source.stat()
+    meta = _ler_meta(meta_path)
+    dicionarios = _hash_dicionarios(source)
+
+    # Caminho rápido: mtime e tamanho inalterados dispensam o hash do CSV
+    if (arrow_path.exists() and meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+            and meta.get('dicionarios') == dicionarios):
+        return arrow_path
+
+    digest = _hash_arquivo(source)
+    arrow_path.parent.mkdir(parents=True, exist_ok=True)
+    if not (arrow_path.exists() and meta.get('sha256') == digest and meta.get('dicionarios') == dicionarios):
+        _converter(source, arrow_path)
+
+    # A versão dos dados combina o CSV e o dicionário das categorias
+    versao = digest if dicionarios is None else hashlib.sha256(f'{digest}:{dicionarios}'.encode()).hexdigest()
+    novo_meta = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest,
+                 'dicionarios': dicionarios, 'versao': versao}
+    _gravar_atomico(meta_path, lambda tmp: tmp.write_text(json.dumps(novo_meta), encoding='utf-8'))
+    return arrow_path
+
+
+def data_version(source: PathLike = DATA_PATH) -> str:
+    """Identificador curto da versão dos dados (prefixo do hash do CSV)"""
+    source = Path(source)
+    ensure_store(source)
+    meta = _ler_meta(_caminhos(source)[1])
+    return meta.get('versao', meta['sha256'])[:16]
+
+
+def load_table(columns: Optional[Iterable[str]] = None, source: PathLike = DATA_PATH) -> pa.Table:
+    """
+    Abre o arquivo colunar via memory-map, sem copiar os dados.
+
+    Parâmetros:
+        columns: Colunas desejadas (None carrega todas)
+        source: Caminho do CSV processado
+
+    Retorna:
+        pa.Table: Tabela imutável apoiada no memory-map (páginas compartilhadas
+        pelo sistema operacional entre todos os leitores do processo)
+    """
+    return feather.read_table(
+        ensure_store(source),
+        columns=list(columns) if columns is not None else None,
+        memory_map=True
+    )
+
+
+def load_columns(columns: Optional[Iterable[str]] = None, source: PathLike = DATA_PATH) -> pd.DataFrame:
+    """
+    Carrega apenas as colunas solicitadas a partir do arquivo colunar.
+
+    Parâmetros:
+        columns: Colunas desejadas (None carrega todas)
+        source: Caminho do CSV processado
+
+    Retorna:
+        pd.DataFrame: DataFrame com a tipagem canônica. As colunas numéricas sem
+        nulos são visões somente leitura do memory-map (um bloco por coluna, sem
+        consolidação); use .copy() antes de alterá-las no lugar. As categóricas
+        têm os códigos copiados (1 byte por linha).
+    """
+    return load_table(columns, source).to_pandas(split_blocks=True, self_destruct=False)
@@ -0,0 +1,71 @@
+"""
+Painel de desempenho por rerun, compartilhado pelas páginas.
+
+Um toggle na barra lateral liga o perfilador (ver profiling) durante a
+execução da página e, ao final, mostra as etapas medidas em um expander
+recolhível. Os tempos são medidos sem o tracemalloc; o pico de memória por
+etapa é opcional e, quando ligado, o painel avisa que os tempos incluem o
+custo do rastreamento. Opcionalmente as medições são gravadas em JSON lines
+para análise offline. Com o toggle desligado nada é coletado.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from profiling import Perfilador, medir
+
+PERFIL_PATH = '../data/processed/.store/perfil.jsonl'
+
+
+@contextmanager
+def painel_desempenho(pagina: str) -> Iterator[Optional[Perfilador]]:
+    """
+    Perfila a execução da página quando o toggle da barra lateral está ligado.
+
+    Parâmetros:
+        pagina (str): Rótulo da página nas medições
+
+    Retorna:
+        Perfilador ativo, ou None com o painel desligado
+    """
+    if not st.sidebar.toggle("⏱️ Painel de desempenho", key='perfil_ativo'):
+        yield None
+        return
+    memoria = st.sidebar.checkbox(
+        "Medir memória (tracemalloc)", key='perfil_memoria',
+        help="Pico de memória por etapa. O rastreamento vale para todo o processo: desacelera as demais "
+             "sessões e infla os tempos medidos."
+    )
+    gravar = st.sidebar.checkbox("Gravar medições (JSONL)", key='perfil_jsonl')
+
+    perfilador = Perfilador(pagina, memoria=memoria)
+    with perfilador.sessao(pagina):
+        yield perfilador
+
+    total = perfilador.medicoes[0]
+    titulo = f"⏱️ Desempenho do rerun: {total.segundos * 1000:.0f} ms"
+    if memoria:
+        titulo += f" · pico {total.pico_mb:.1f} MB"
+    with st.expander(titulo, expanded=False):
+        if memoria:
+            st.caption("Tempos medidos com o tracemalloc ligado: incluem o custo do rastreamento de memória. "
+                       "Para tempos de referência, desligue \"Medir memória\".")
+        tabela = perfilador.tabela().drop(columns=['nivel'] if memoria else ['nivel', 'pico_mb'])
+        st.dataframe(
+            tabela.rename(columns={
+                'etapa': 'Etapa', 'segundos': 'Tempo (s)', 'pico_mb': 'Pico (MB)', 'linhas': 'Linhas'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        if gravar:
+            st.caption(f"Medições gravadas em {perfilador.gravar_jsonl(PERFIL_PATH)}")
+
+
+def plotly_chart(fig: go.Figure, **kwargs) -> None:
+    """st.plotly_chart medido como etapa de serialização (rótulo: título da figura)"""
+    with medir(f"plotly_chart: {fig.layout.title.text or 'figura'}"):
+        st.plotly_chart(fig, **kwargs)
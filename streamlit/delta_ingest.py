@@ -0,0 +1,282 @@
+"""
+Ingestão incremental de novas extrações da base processada.
+
+Arquivos `<base>_delta*.csv` deixados em data/processed/ (mesmas colunas da
+base processada) são aplicados como upsert por employee_id sobre a tabela
+Arrow em memória. A tabela é mantida em blocos de BLOCO linhas (fatias sem
+cópia do memory-map) e um índice employee_id → posição localiza as linhas do
+delta: linhas novas são anexadas como um bloco a mais e cada linha alterada é
+substituída no lugar, copiando apenas os blocos que a contêm. O custo de um
+delta depende do tamanho do delta, não da base. O cubo de agregados é
+atualizado pela diferença — sai o cubo das linhas substituídas, entra o das
+linhas do delta (count, sum e sumsq são aditivos) —, sem nova leitura do CSV
+base nem reconstrução do cubo. Cada delta aplicado gera uma nova versão dos dados
+(hash encadeado), consultada pelas páginas a cada rerun.
+
+Uma thread de observação varre o diretório periodicamente e compara mtime e
+tamanho dos deltas; um arquivo reescrito é reaplicado (o upsert é
+idempotente). Para não ler um arquivo pela metade, grave o delta com outro
+nome e renomeie-o ao final.
+
+Os últimos estados publicados ficam disponíveis por versão (estado_de): quem
+leu uma versão obtém a tabela e o cubo dessa mesma versão, ainda que um delta
+tenha chegado no meio do caminho. Se o próprio CSV base mudar, o estado é
+recarregado do armazenamento colunar e os deltas presentes são reaplicados
+em ordem de nome — o mesmo acontece ao reiniciar o app.
+
+Uso (aplica os deltas e continua observando o diretório):
+    python streamlit/delta_ingest.py ../data/processed/train_atualizado.csv
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from aggregate_cube import DIMENSOES, AggregateCube, load_cube
+from data_store import (DATA_PATH, SCHEMA, PathLike, _aplicar_dicionario, _hash_arquivo, carregar_dicionarios,
+                        data_version, load_table)
+from partitioned_store import processos_configurados
+
+ID = 'employee_id'
+# Intervalo (s) entre as varreduras do diretório
+INTERVALO = 2.0
+# Linhas por bloco da tabela em memória: um delta copia só os blocos em que altera linhas
+BLOCO = 1 << 16
+# Estados recentes mantidos por versão (os blocos não alterados são compartilhados entre eles)
+HISTORICO = 4
+
+
+class Estado(NamedTuple):
+    """Versão dos dados com a tabela e o cubo correspondentes (substituído por inteiro a cada delta)"""
+    versao: str
+    tabela: pa.Table
+    cubo: AggregateCube
+
+
+class DeltaIngestor:
+    """Mantém a base em memória e o cubo em dia com os deltas do diretório processado"""
+
+    def __init__(self, source: PathLike = DATA_PATH, intervalo: float = INTERVALO,
+                 processos: Optional[int] = None):
+        self.source = Path(source)
+        self.intervalo = intervalo
+        # Processos da construção do cubo quando ele ainda não está persistido (None = em série)
+        self.processos = processos
+        self.erros: Dict[str, str] = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._historico: 'OrderedDict[str, Estado]' = OrderedDict()
+        with self._trava:
+            self._carregar_base()
+
+    @property
+    def versao(self) -> str:
+        """Versão atual dos dados (base + deltas aplicados)"""
+        return self.estado.versao
+
+    @property
+    def versao_base(self) -> str:
+        """Versão do CSV base, sem os deltas (igual a versao enquanto nenhum delta foi aplicado)"""
+        return self._versao_base
+
+    def _publicar(self, estado: Estado) -> None:
+        """Torna o estado o atual e o guarda no histórico, descartando os mais antigos"""
+        self._historico[estado.versao] = estado
+        self._historico.move_to_end(estado.versao)
+        while len(self._historico) > HISTORICO:
+            self._historico.popitem(last=False)
+        self.estado = estado
+
+    def estado_de(self, versao: str) -> Estado:
+        """
+        Estado (tabela e cubo) de uma versão dos dados.
+
+        Parâmetros:
+            versao (str): Versão obtida de `versao` ou de um estado anterior
+
+        Retorna:
+            Estado: Tabela e cubo exatamente dessa versão (KeyError se a versão
+            já saiu do histórico, HISTORICO estados para trás)
+        """
+        estado = self.estado
+        if estado.versao == versao:
+            return estado
+        # Sem a trava: uma leitura do dicionário é atômica e não espera a aplicação de um delta
+        return self._historico[versao]
+
+    def _carregar_base(self) -> None:
+        """Estado inicial a partir do armazenamento colunar e do cubo persistido"""
+        self._versao_base = data_version(self.source)
+        self._aplicados: Dict[str, Tuple[int, int]] = {}
+        tabela = load_table(source=self.source)
+        self._blocos: List[pa.Table] = [tabela.slice(inicio, BLOCO)
+                                         for inicio in range(0, tabela.num_rows, BLOCO)] or [tabela]
+        self._inicios = np.arange(0, max(tabela.num_rows, 1), BLOCO)
+        # Posições da base (a tabela de hash é montada pelo pandas no primeiro delta) e dos ids anexados
+        self._indice_base = pd.Index(tabela.column(ID).to_numpy())
+        self._indice_novos: Dict[int, int] = {}
+        self._publicar(Estado(self._versao_base, tabela, load_cube(self.source, self.processos)))
+
+    def deltas(self) -> List[Path]:
+        """Arquivos de delta da base, em ordem de aplicação"""
+        return sorted(self.source.parent.glob(f'{self.source.stem}_delta*.csv'))
+
+    def _ler_delta(self, path: Path) -> pd.DataFrame:
+        """Lê o delta com a tipagem e as categorias canônicas"""
+        colunas = self.estado.tabela.column_names
+        ausentes = set(colunas) - set(pd.read_csv(path, nrows=0).columns)
+        if ausentes:
+            raise ValueError(f'{path.name}: colunas ausentes {sorted(ausentes)}')
+
+        df = pd.read_csv(path, usecols=colunas, dtype={col: tipo for col, tipo in SCHEMA.items() if col in colunas})
+        df = df[colunas]
+        for col, rotulos in carregar_dicionarios(self.source).items():
+            if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = _aplicar_dicionario(df[col], rotulos)
+        return df
+
+    def _posicoes(self, ids: np.ndarray) -> np.ndarray:
+        """Posição atual de cada id na tabela (-1 para ids ainda ausentes)"""
+        if not self._indice_base.is_unique:
+            raise ValueError(f'{self.source.name}: {ID} duplicado na base')
+        posicoes = self._indice_base.get_indexer(ids)
+        ausentes = np.flatnonzero(posicoes < 0)
+        if len(ausentes) and self._indice_novos:
+            posicoes[ausentes] = [self._indice_novos.get(i, -1) for i in ids[ausentes].tolist()]
+        return posicoes
+
+    def _aplicar(self, path: Path) -> Dict[str, Any]:
+        """Upsert de um delta nos blocos da tabela e atualização do cubo pela diferença"""
+        atual = self.estado
+        # Um id repetido no delta seria anexado (e contado no cubo) duas vezes: vale a última linha
+        df = self._ler_delta(path).drop_duplicates(ID, keep='last').reset_index(drop=True)
+        novas = pa.Table.from_pandas(df, schema=atual.tabela.schema, preserve_index=False)
+        ids = df[ID].to_numpy()
+        posicoes = self._posicoes(ids)
+
+        colunas_cubo = list(dict.fromkeys([col for col in DIMENSOES if col != 'age_bucket'] + atual.cubo.measures))
+        cubos = [atual.cubo, AggregateCube.build(df, atual.cubo.measures)]
+        blocos, inicios = list(self._blocos), self._inicios
+
+        alteradas = np.flatnonzero(posicoes >= 0)
+        if len(alteradas):
+            # Agrupa as linhas alteradas por bloco; cada bloco tocado é recomposto uma vez
+            bloco_de = np.searchsorted(inicios, posicoes[alteradas], side='right') - 1
+            ordem = np.argsort(bloco_de, kind='stable')
+            bloco_de, alteradas = bloco_de[ordem], alteradas[ordem]
+            cortes = np.flatnonzero(np.diff(bloco_de)) + 1
+            antigas = []
+            for i, linhas in zip(bloco_de[np.r_[0, cortes]], np.split(alteradas, cortes)):
+                bloco = blocos[i]
+                locais = posicoes[linhas] - inicios[i]
+                antigas.append(bloco.select(colunas_cubo).take(locais))
+                # As linhas do delta entram no fim do bloco e o take as leva às posições substituídas
+                indices = np.arange(bloco.num_rows)
+                indices[locais] = bloco.num_rows + np.arange(len(linhas))
+                blocos[i] = pa.concat_tables([bloco, novas.take(linhas)]).take(indices)
+            cubos.append(AggregateCube.build(pa.concat_tables(antigas).to_pandas(), atual.cubo.measures).negado())
+
+        incluidas = np.flatnonzero(posicoes < 0)
+        novos_ids = {}
+        if len(incluidas):
+            inicio = atual.tabela.num_rows
+            novos_ids = dict(zip(ids[incluidas].tolist(), range(inicio, inicio + len(incluidas))))
+            blocos.append(novas.take(incluidas))
+            inicios = np.append(inicios, inicio)
+
+        versao = hashlib.sha256(f'{atual.versao}:{_hash_arquivo(path)}'.encode()).hexdigest()[:16]
+        # Blocos, índice e estado só mudam depois que o delta inteiro foi processado
+        self._blocos, self._inicios = blocos, inicios
+        self._indice_novos.update(novos_ids)
+        self._publicar(Estado(versao, pa.concat_tables(blocos), AggregateCube.merge(cubos)))
+        return {'arquivo': path.name, 'incluidos': len(incluidas), 'alterados': len(alteradas), 'versao': versao}
+
+    def verificar(self) -> List[Dict[str, Any]]:
+        """
+        Aplica os deltas novos ou alterados desde a última varredura.
+
+        Retorna:
+            list: Um relatório por delta aplicado (arquivo, incluídos, alterados e versão)
+        """
+        with self._trava:
+            if data_version(self.source) != self._versao_base:
+                self._carregar_base()
+
+            relatorios = []
+            for path in self.deltas():
+                stat = path.stat()
+                assinatura = (stat.st_mtime_ns, stat.st_size)
+                if self._aplicados.get(path.name) == assinatura:
+                    continue
+                try:
+                    relatorios.append(self._aplicar(path))
+                    self.erros.pop(path.name, None)
+                except (OSError, ValueError, KeyError, pa.ArrowException) as e:
+                    # Delta inválido: registrado e ignorado até ser reescrito
+                    self.erros[path.name] = str(e)
+                self._aplicados[path.name] = assinatura
+            return relatorios
+
+    def _observar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                # Falha ao recarregar a base (ex.: CSV sendo substituído): tenta na próxima varredura
+                self.erros[self.source.name] = str(e)
+
+    def iniciar(self) -> 'DeltaIngestor':
+        """Aplica os deltas já presentes e inicia a thread de observação do diretório (daemon)"""
+        if self._thread is None:
+            self.verificar()
+            self._thread = threading.Thread(target=self._observar, name='delta-ingest', daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        """Interrompe a thread de observação"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Aplica os deltas da base processada e observa o diretório')
+    parser.add_argument('source', nargs='?', default=str(DATA_PATH), help='CSV processado')
+    parser.add_argument('--intervalo', type=float, default=INTERVALO, help='Segundos entre as varreduras')
+    parser.add_argument('--processos', type=int, default=processos_configurados(),
+                        help='Processos da construção do cubo (padrão: HR_PROCESSOS ou em série)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    ingestor = DeltaIngestor(args.source, args.intervalo, args.processos)
+    print(f'{ingestor.estado.tabela.num_rows:,} linhas · versão {ingestor.versao} '
+          f'({time.perf_counter() - inicio:.2f}s)')
+    avisados = {}
+    try:
+        while True:
+            inicio = time.perf_counter()
+            for relatorio in ingestor.verificar():
+                print(f"{relatorio['arquivo']}: {relatorio['incluidos']} incluídos, {relatorio['alterados']} alterados "
+                      f"· versão {relatorio['versao']} ({time.perf_counter() - inicio:.3f}s)")
+            for arquivo, erro in ingestor.erros.items():
+                if avisados.get(arquivo) != erro:
+                    print(f'⚠️ {arquivo}: {erro}')
+            avisados = dict(ingestor.erros)
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Cache LRU de figuras Plotly prontas.
+
+As figuras (objetos go.Figure) são indexadas por (versão dos dados,
+identificador do gráfico, parâmetros de filtro). Combinações de filtros
+repetidas são servidas sem recalcular agregados nem reconstruir a figura, e
+sem desserializá-la: um acerto devolve o próprio objeto, que st.plotly_chart
+serializa uma única vez para o navegador. O cache é limitado em tamanho,
+seguro para uso entre sessões e contabiliza acertos e falhas.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import plotly.graph_objects as go
+
+from profiling import medir
+
+
+def _normalizar_parametros(params: Optional[Dict[str, Any]]) -> str:
+    """Representação estável e hashável dos parâmetros de filtro"""
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+class FigureCache:
+    """Cache LRU limitado de figuras Plotly"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._itens: 'OrderedDict[Tuple[Hashable, ...], go.Figure]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def figure(self, versao: str, chart_id: str, params: Optional[Dict[str, Any]],
+               builder: Callable[[], go.Figure]) -> go.Figure:
+        """
+        Retorna a figura pronta para st.plotly_chart, construindo-a apenas em caso de falha.
+
+        Parâmetros:
+            versao: Versão dos dados
+            chart_id: Identificador do gráfico
+            params: Parâmetros de filtro que influenciam o gráfico
+            builder: Função que constrói a figura (chamada somente em falhas)
+
+        Retorna:
+            go.Figure: Figura compartilhada entre as sessões; não deve ser alterada
+        """
+        chave = (versao, chart_id, _normalizar_parametros(params))
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return self._itens[chave]
+            self.misses += 1
+
+        with medir(f'figura: {chart_id}'):
+            fig = builder()
+
+        with self._lock:
+            self._itens[chave] = fig
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maxsize:
+                self._itens.popitem(last=False)
+        return fig
+
+    def clear(self) -> None:
+        """Esvazia o cache e zera os contadores"""
+        with self._lock:
+            self._itens.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Acertos, falhas e ocupação atual do cache"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._itens), 'maxsize': self.maxsize}
+
+
+_cache_padrao = FigureCache()
+
+
+def cache_padrao() -> FigureCache:
+    """Instância compartilhada por todas as sessões do processo"""
+    return _cache_padrao
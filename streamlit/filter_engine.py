@@ -0,0 +1,177 @@
+"""
+Motor de filtros com índices bitmap para o dashboard de gênero.
+
+Na construção são pré-calculados bitmaps compactados (np.packbits) por valor
+de cada coluna categórica filtrável e bitmaps cumulativos "idade <= a" por
+idade. Uma faixa etária vira `ate[hi] & ~ate[lo - 1]` e cada filtro adicional
+é um AND sobre bytes, sem copiar o DataFrame. As métricas por grupo saem de
+reduções bincount sobre as linhas selecionadas.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+MEDIDAS = ('is_promoted', 'age', 'avg_training_score', 'KPIs_met >80%')
+# Faixas etárias memorizadas por motor (as menos recentes saem primeiro)
+MAX_FAIXAS = 64
+
+
+class FilterEngine:
+    """Avalia filtros por AND de bitmaps e agrega as métricas por grupo"""
+
+    def __init__(self, df: pd.DataFrame, grupo: str = 'gender', categoricas: Sequence[str] = ('department',),
+                 idade: str = 'age', medidas: Sequence[str] = MEDIDAS):
+        self.n = len(df)
+        self.grupo = grupo
+        self.medidas = list(medidas)
+
+        grupo_cat = df[grupo].astype('category').cat
+        self.grupos = list(grupo_cat.categories)
+        self._grupo_codes = grupo_cat.codes.to_numpy()
+
+        # Bitmaps por valor das colunas categóricas
+        self.categorias: Dict[str, list] = {}
+        self._codes: Dict[str, np.ndarray] = {}
+        self._bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+        for col in categoricas:
+            cat = df[col].astype('category').cat
+            codes = cat.codes.to_numpy()
+            self.categorias[col] = list(cat.categories)
+            self._codes[col] = codes
+            self._bitmaps[col] = {
+                valor: np.packbits(codes == i) for i, valor in enumerate(cat.categories)
+            }
+
+        # Bitmaps cumulativos por idade: ate[a] marca as linhas com idade <= a
+        self._idade = df[idade].to_numpy()
+        self.idade_min = int(self._idade.min()) if self.n else 0
+        self.idade_max = int(self._idade.max()) if self.n else 0
+        ordem = np.argsort(self._idade, kind='stable')
+        idades_ordenadas = self._idade[ordem]
+        marcado = np.zeros(self.n, dtype=bool)
+        self._ate_idade: Dict[int, np.ndarray] = {}
+        inicio = 0
+        for a in range(self.idade_min, self.idade_max + 1):
+            fim = int(np.searchsorted(idades_ordenadas, a, side='right'))
+            marcado[ordem[inicio:fim]] = True
+            self._ate_idade[a] = np.packbits(marcado)
+            inicio = fim
+
+        # Linhas com grupo nulo nunca entram nas métricas
+        self._base = np.packbits(self._grupo_codes >= 0)
+        self._valores = {m: df[m].to_numpy() for m in self.medidas}
+        # Faixas etárias recentes (LRU); o motor é compartilhado entre as sessões do cache_resource
+        self._memo_idade: 'OrderedDict[Tuple[int, int], np.ndarray]' = OrderedDict()
+        self._trava_memo = threading.Lock()
+
+    def _bitmap_idade(self, faixa: Tuple[int, int]) -> np.ndarray:
+        """Bitmap da faixa etária [lo, hi], memorizado entre reruns (as últimas MAX_FAIXAS faixas)"""
+        lo, hi = max(int(faixa[0]), self.idade_min), min(int(faixa[1]), self.idade_max)
+        with self._trava_memo:
+            bitmap = self._memo_idade.get((lo, hi))
+            if bitmap is not None:
+                self._memo_idade.move_to_end((lo, hi))
+                return bitmap
+
+        # Calculado fora da trava: sessões concorrentes no máximo repetem o cálculo
+        if lo > hi:
+            bitmap = np.zeros_like(self._base)
+        elif lo == self.idade_min:
+            bitmap = self._ate_idade[hi]
+        else:
+            bitmap = self._ate_idade[hi] & ~self._ate_idade[lo - 1]
+        with self._trava_memo:
+            self._memo_idade[(lo, hi)] = bitmap
+            while len(self._memo_idade) > MAX_FAIXAS:
+                self._memo_idade.popitem(last=False)
+        return bitmap
+
+    def bitmap(self, faixa_idade: Optional[Tuple[int, int]] = None,
+               filtros: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Combina os filtros em um único bitmap compactado.
+
+        Parâmetros:
+            faixa_idade: Faixa etária inclusiva (lo, hi)
+            filtros: {coluna: valor}; valores ausentes do índice não selecionam linhas
+
+        Retorna:
+            np.ndarray: Bitmap compactado (uint8) das linhas selecionadas
+        """
+        bitmap = self._base
+        if faixa_idade is not None:
+            bitmap = bitmap & self._bitmap_idade(faixa_idade)
+        for col, valor in (filtros or {}).items():
+            bitmap = bitmap & self._bitmaps[col].get(valor, np.zeros_like(self._base))
+        return bitmap
+
+    def indices(self, bitmap: np.ndarray) -> np.ndarray:
+        """Posições das linhas marcadas no bitmap"""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n))
+
+    def avaliar(self, faixa_idade: Optional[Tuple[int, int]] = None,
+                filtros: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Calcula todas as métricas por grupo para as linhas selecionadas.
+
+        Parâmetros:
+            faixa_idade: Faixa etária inclusiva (lo, hi)
+            filtros: {coluna: valor}
+
+        Retorna:
+            dict: 'contagem' (Series por grupo), 'medias' (DataFrame por grupo),
+            'idade_por_grupo' (contagens idade x grupo), 'categoria_por_grupo'
+            (contagens por coluna categórica x grupo) e 'total'
+        """
+        idx = self.indices(self.bitmap(faixa_idade, filtros))
+        g = self._grupo_codes[idx].astype(np.intp)
+        k = len(self.grupos)
+
+        contagem = np.bincount(g, minlength=k)
+        somas = {m: np.bincount(g, weights=self._valores[m][idx], minlength=k) for m in self.medidas}
+        presentes = contagem > 0
+        grupos = pd.Index(self.grupos, name=self.grupo)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            medias = pd.DataFrame({m: somas[m] / contagem for m in self.medidas}, index=grupos)[presentes]
+
+        n_idades = self.idade_max - self.idade_min + 1
+        idade = self._idade[idx].astype(np.intp) - self.idade_min
+        idade_por_grupo = np.bincount(g * n_idades + idade, minlength=k * n_idades).reshape(k, n_idades)
+
+        categoria_por_grupo = {}
+        for col, codes in self._codes.items():
+            c = codes[idx].astype(np.intp)
+            validos = c >= 0
+            n_cat = len(self.categorias[col])
+            tabela = np.bincount(c[validos] * k + g[validos], minlength=n_cat * k).reshape(n_cat, k)
+            categoria_por_grupo[col] = pd.DataFrame(
+                tabela, index=pd.Index(self.categorias[col], name=col), columns=grupos
+            ).loc[:, presentes]
+
+        return {
+            'contagem': pd.Series(contagem, index=grupos, name='count')[presentes].sort_values(ascending=False),
+            'medias': medias,
+            'idade_por_grupo': pd.DataFrame(
+                idade_por_grupo.T, index=pd.RangeIndex(self.idade_min, self.idade_max + 1, name='age'), columns=grupos
+            ).loc[:, presentes],
+            'categoria_por_grupo': categoria_por_grupo,
+            'total': int(contagem.sum())
+        }
+
+
+def quantil_histograma(valores: np.ndarray, contagens: np.ndarray, q: float) -> float:
+    """Quantil com interpolação linear a partir de um histograma de valores inteiros"""
+    n = contagens.sum()
+    if n == 0:
+        return float('nan')
+    pos = q * (n - 1)
+    acumulado = np.cumsum(contagens)
+    i = int(np.searchsorted(acumulado, np.floor(pos), side='right'))
+    j = int(np.searchsorted(acumulado, np.ceil(pos), side='right'))
+    frac = pos - np.floor(pos)
+    return float(valores[i] + (valores[j] - valores[i]) * frac)
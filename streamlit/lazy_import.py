@@ -0,0 +1,36 @@
+"""
+Importação sob demanda de módulos pesados.
+
+Os dashboards só precisam do plotly.express ao construir a primeira figura
+(que, com o cache de figuras, nem sempre acontece no rerun). Com
+lazy_module o módulo é registrado em sys.modules no import, mas seu código
+só é executado no primeiro acesso a um atributo — o custo sai do caminho de
+inicialização do app e da importação das páginas que não chegam a usá-lo.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_module(nome: str) -> ModuleType:
+    """
+    Retorna o módulo `nome`, carregado apenas no primeiro acesso a um atributo.
+
+    Parâmetros:
+        nome (str): Nome completo do módulo (ex.: 'plotly.express')
+
+    Retorna:
+        ModuleType: O próprio módulo, se já importado; senão, um módulo preguiçoso
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    spec = importlib.util.find_spec(nome)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{nome}'", name=nome)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = modulo
+    loader.exec_module(modulo)
+    return modulo
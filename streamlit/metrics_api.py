@@ -0,0 +1,292 @@
+"""
+API HTTP/JSON de métricas, sem Streamlit.
+
+Expõe os mesmos dicionários de métricas dos dashboards (page_metrics.py),
+com os mesmos filtros, para ferramentas de BI que consultam os números em
+alta frequência. É uma aplicação ASGI pura, servida pelo uvicorn (já
+instalado com o Streamlit):
+
+- os dados são carregados uma vez por processo: o ingestor de deltas mantém
+  a tabela Arrow (memory-map) e o cubo em dia, e todas as requisições
+  concorrentes do event loop leem o mesmo estado imutável de cada versão;
+- as respostas ficam em um cache LRU de JSON serializado, indexado por
+  (versão dos dados, rota, parâmetros normalizados). Falhas concorrentes da
+  mesma chave aguardam um único cálculo, executado em thread para não
+  bloquear o event loop;
+- o ETag depende só da versão dos dados e dos parâmetros: um `If-None-Match`
+  igual é respondido com 304 sem consultar o cache nem calcular nada.
+
+Rotas (GET ou HEAD):
+    /metricas/genero?departamento=Todos&idade_min=25&idade_max=55
+    /metricas/departamento
+    /metricas/regiao
+    /versao        versão dos dados, departamentos e estatísticas do cache
+
+Uso:
+    python streamlit/metrics_api.py ../data/processed/train_atualizado.csv --porta 8502
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+
+from data_store import DATA_PATH, PathLike
+from delta_ingest import DeltaIngestor, Estado
+from filter_engine import FilterEngine
+from page_metrics import (intervalos_departamento, intervalos_genero, metricas_departamento, metricas_genero,
+                          metricas_regiao)
+from partitioned_store import processos_configurados
+from region_kernel import resumir_cubo
+
+TODOS = 'Todos'
+# Faixa etária padrão do filtro do painel de gênero
+IDADE_PADRAO = (25, 55)
+COLUNAS_GENERO = ['gender', 'is_promoted', 'department', 'age', 'avg_training_score', 'KPIs_met >80%']
+PORTA = 8502
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ErroRequisicao(ValueError):
+    """Parâmetro inválido (respondido com 400)"""
+
+
+def _para_json(valor: Any) -> Any:
+    """Converte dicionários de métricas (chaves categóricas, tuplas, escalares NumPy, NaN) em JSON puro"""
+    if isinstance(valor, pd.Series):
+        valor = valor.to_dict()
+    if isinstance(valor, dict):
+        return {str(chave): _para_json(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_para_json(v) for v in valor]
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+class ResponseCache:
+    """Cache LRU limitado de respostas JSON serializadas, com cálculo único por chave"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._itens: 'OrderedDict[Tuple[Hashable, ...], bytes]' = OrderedDict()
+        self._pendentes: Dict[Tuple[Hashable, ...], asyncio.Future] = {}
+
+    async def get(self, chave: Tuple[Hashable, ...], calcular: Callable[[], bytes]) -> bytes:
+        """
+        Retorna o corpo da resposta, calculando-o em thread apenas em caso de falha.
+
+        Executado no event loop (sem concorrência entre as chamadas): requisições
+        da mesma chave que chegam durante um cálculo aguardam o mesmo resultado.
+        """
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return self._itens[chave]
+        if chave in self._pendentes:
+            self.hits += 1
+        else:
+            self.misses += 1
+            futuro = asyncio.get_running_loop().run_in_executor(None, calcular)
+            futuro.add_done_callback(lambda f: self._concluir(chave, f))
+            self._pendentes[chave] = futuro
+        # shield: uma requisição cancelada (cliente desconectado) não cancela o cálculo das demais
+        return await asyncio.shield(self._pendentes[chave])
+
+    def _concluir(self, chave: Tuple[Hashable, ...], futuro: asyncio.Future) -> None:
+        del self._pendentes[chave]
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        self._itens[chave] = futuro.result()
+        while len(self._itens) > self.maxsize:
+            self._itens.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Acertos, falhas e ocupação atual do cache"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._itens), 'maxsize': self.maxsize}
+
+
+class MetricsAPI:
+    """Aplicação ASGI das métricas dos dashboards"""
+
+    def __init__(self, source: PathLike = DATA_PATH, maxsize: int = 1024):
+        self.ingestor = DeltaIngestor(source, processos=processos_configurados())
+        self.cache = ResponseCache(maxsize)
+        self.rotas: Dict[str, Callable[[Estado, Dict[str, Any]], Dict[str, Any]]] = {
+            '/metricas/genero': self.genero,
+            '/metricas/departamento': self.departamento,
+            '/metricas/regiao': self.regiao
+        }
+        self._motor: Tuple[Optional[str], Optional[FilterEngine]] = (None, None)
+        self._trava = threading.Lock()
+
+    def motor(self, estado: Estado) -> FilterEngine:
+        """Motor de filtros do painel de gênero, reconstruído a cada nova versão dos dados"""
+        with self._trava:
+            versao, engine = self._motor
+            if versao != estado.versao:
+                df = estado.tabela.select(COLUNAS_GENERO).to_pandas().dropna(subset=['gender'])
+                engine = FilterEngine(df)
+                self._motor = (estado.versao, engine)
+            return engine
+
+    def parametros(self, rota: str, query: Dict[str, list], estado: Estado) -> Dict[str, Any]:
+        """Valida e normaliza os filtros da rota (valores padrão iguais aos dos dashboards)"""
+        def valor(nome: str, padrao: Any) -> Any:
+            return query[nome][-1] if nome in query else padrao
+
+        if rota != '/metricas/genero':
+            if query:
+                raise ErroRequisicao(f'{rota} não aceita filtros: {sorted(query)}')
+            return {}
+
+        desconhecidos = set(query) - {'departamento', 'idade_min', 'idade_max'}
+        if desconhecidos:
+            raise ErroRequisicao(f'parâmetros desconhecidos: {sorted(desconhecidos)}')
+        departamento = valor('departamento', TODOS)
+        departamentos = estado.cubo.cells['department'].cat.categories
+        if departamento != TODOS and departamento not in departamentos:
+            raise ErroRequisicao(f'departamento desconhecido: {departamento}')
+        try:
+            faixa = (int(valor('idade_min', IDADE_PADRAO[0])), int(valor('idade_max', IDADE_PADRAO[1])))
+        except ValueError:
+            raise ErroRequisicao('idade_min e idade_max devem ser inteiros') from None
+        if faixa[0] > faixa[1]:
+            raise ErroRequisicao('idade_min maior que idade_max')
+        return {'departamento': departamento, 'idade_min': faixa[0], 'idade_max': faixa[1]}
+
+    def genero(self, estado: Estado, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Métricas do painel de gênero para um estado de filtro"""
+        filtros = {} if params['departamento'] == TODOS else {'department': params['departamento']}
+        avaliacao = self.motor(estado).avaliar((params['idade_min'], params['idade_max']), filtros)
+        return metricas_genero(avaliacao['contagem'], avaliacao['medias'], intervalos_genero(avaliacao))
+
+    def departamento(self, estado: Estado, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Métricas do painel departamental"""
+        cubo = estado.cubo
+        return metricas_departamento(cubo.counts('department'), cubo.mean('department'),
+                                     intervalos_departamento(cubo))
+
+    def regiao(self, estado: Estado, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Métricas do painel regional"""
+        metricas = metricas_regiao(resumir_cubo(estado.cubo))
+        metricas['total'] = estado.cubo.total
+        return metricas
+
+    def info(self, estado: Estado) -> Dict[str, Any]:
+        """Versão dos dados, valores aceitos nos filtros e estado do cache"""
+        return {
+            'versao': estado.versao,
+            'linhas': estado.tabela.num_rows,
+            'departamentos': list(estado.cubo.cells['department'].cat.categories),
+            'deltas_com_erro': self.ingestor.erros,
+            'cache': self.cache.stats()
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['method'] not in ('GET', 'HEAD'):
+            await self._responder(send, 405, {'erro': 'método não permitido'}, [(b'allow', b'GET, HEAD')])
+            return
+        rota = scope['path'].rstrip('/') or '/'
+        # Um único estado por requisição: versão, tabela e cubo sempre consistentes entre si
+        estado = self.ingestor.estado
+        if rota == '/versao':
+            await self._responder(send, 200, self.info(estado), [(b'cache-control', b'no-store')])
+            return
+        if rota not in self.rotas:
+            await self._responder(send, 404, {'erro': f'rota desconhecida: {rota}', 'rotas': sorted(self.rotas)})
+            return
+
+        try:
+            params = self.parametros(rota, parse_qs(scope['query_string'].decode('latin-1')), estado)
+        except ErroRequisicao as e:
+            await self._responder(send, 400, {'erro': str(e)})
+            return
+
+        normalizados = json.dumps(params, sort_keys=True)
+        etag = f'"{estado.versao}-{hashlib.sha1(f"{rota}?{normalizados}".encode()).hexdigest()[:16]}"'.encode()
+        cabecalhos = [(b'etag', etag), (b'cache-control', b'no-cache'),
+                      (b'x-data-version', estado.versao.encode())]
+        pedidos = {tag.strip().removeprefix(b'W/') for nome, valor in scope['headers']
+                   if nome == b'if-none-match' for tag in valor.split(b',')}
+        if etag in pedidos or b'*' in pedidos:
+            await send({'type': 'http.response.start', 'status': 304, 'headers': cabecalhos})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        def calcular() -> bytes:
+            metricas = self.rotas[rota](estado, params)
+            documento = {'versao': estado.versao, 'filtros': params, 'metricas': _para_json(metricas)}
+            return json.dumps(documento, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+        try:
+            corpo = await self.cache.get((estado.versao, rota, normalizados), calcular)
+        except Exception as e:
+            await self._responder(send, 500, {'erro': str(e)})
+            return
+        await self._enviar(send, 200, corpo, cabecalhos, corpo_vazio=scope['method'] == 'HEAD')
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        """Inicia a observação dos deltas com o servidor e a interrompe no desligamento"""
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await asyncio.get_running_loop().run_in_executor(None, self.ingestor.iniciar)
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                self.ingestor.parar()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _responder(self, send: Send, status: int, documento: Dict[str, Any], cabecalhos: list = ()) -> None:
+        corpo = json.dumps(_para_json(documento), ensure_ascii=False).encode('utf-8')
+        await self._enviar(send, status, corpo, list(cabecalhos))
+
+    @staticmethod
+    async def _enviar(send: Send, status: int, corpo: bytes, cabecalhos: list, corpo_vazio: bool = False) -> None:
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json; charset=utf-8'),
+                        (b'content-length', str(len(corpo)).encode())] + cabecalhos
+        })
+        await send({'type': 'http.response.body', 'body': b'' if corpo_vazio else corpo})
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='API HTTP/JSON das métricas dos dashboards')
+    parser.add_argument('source', nargs='?', default=str(DATA_PATH), help='CSV processado')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA)
+    parser.add_argument('--cache', type=int, default=1024, help='Respostas mantidas no cache LRU')
+    args = parser.parse_args()
+
+    uvicorn.run(MetricsAPI(args.source, args.cache), host=args.host, port=args.porta, lifespan='on',
+                access_log=False, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Dicionários de métricas das páginas, independentes do Streamlit.
+
+As mesmas funções alimentam os cards e relatórios dos dashboards, a
+exportação em lote dos relatórios e a API de métricas (metrics_api.py):
+os números e os textos de um estado de filtro são iguais em qualquer uma
+das saídas. Só dependem dos agregados (motor de filtros, cubo e kernel
+regional), nunca da renderização — os processos da exportação importam este
+módulo sem carregar Streamlit nem Plotly.
+"""
+
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+from profiling import perfilado
+from promotion_stats import NIVEL, comparar_grupos
+from region_kernel import RegionSummary
+
+
+def intervalos_genero(avaliacao: Dict[str, Any]) -> pd.DataFrame:
+    """Intervalos bootstrap e p-valores da taxa de promoção por gênero (resultado de FilterEngine.avaliar)"""
+    contagem = avaliacao['contagem'].reindex(avaliacao['medias'].index)
+    agregados = pd.DataFrame({
+        'n': contagem,
+        'promovidos': (avaliacao['medias']['is_promoted'] * contagem).round()
+    })
+    return comparar_grupos(agregados)
+
+
+def intervalos_departamento(cubo: AggregateCube) -> pd.DataFrame:
+    """Intervalos bootstrap e p-valores da taxa de promoção por departamento"""
+    agregados = cubo.rollup('department')[['count', 'is_promoted:sum']]
+    agregados.columns = ['n', 'promovidos']
+    return comparar_grupos(agregados)
+
+
+def metricas_genero(contagem: pd.Series, medias: pd.DataFrame,
+                    intervalos: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Métricas do painel de gênero.
+
+    Parâmetros:
+        contagem (pd.Series): Funcionários por gênero
+        medias (pd.DataFrame): Médias das medidas por gênero
+        intervalos (pd.DataFrame): Intervalos da taxa de promoção (ver intervalos_genero);
+            sem 'p_valor', as diferenças entre os gêneros ficam vazias
+
+    Retorna:
+        dict: Distribuição, taxas e médias por gênero, total, 'ic_promocao' e
+        'diferenca_promocao' (em p.p., com intervalo e p-valor)
+    """
+    resultados = {
+        'distribuicao_genero': contagem.to_dict(),
+        'taxa_promocao': medias['is_promoted'].mul(100).round(1).to_dict(),
+        'media_idade': medias['age'].round(1).to_dict(),
+        'media_score': medias['avg_training_score'].round(1).to_dict(),
+        'media_kpi': medias['KPIs_met >80%'].round(3).to_dict(),
+        'total': int(contagem.sum()),
+        'ic_promocao': {},
+        'diferenca_promocao': {}
+    }
+    if intervalos is not None:
+        resultados['ic_promocao'] = {
+            g: (linha.taxa_inf * 100, linha.taxa_sup * 100) for g, linha in intervalos.iterrows()
+        }
+        if 'p_valor' in intervalos:
+            resultados['diferenca_promocao'] = {
+                g: (linha.diferenca * 100, linha.dif_inf * 100, linha.dif_sup * 100, linha.p_valor)
+                for g, linha in intervalos.dropna(subset=['p_valor']).iterrows()
+            }
+    return resultados
+
+
+def metricas_departamento(contagem: pd.Series, medias: pd.DataFrame,
+                          intervalos: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Métricas do painel departamental.
+
+    Parâmetros:
+        contagem (pd.Series): Funcionários por departamento
+        medias (pd.DataFrame): Médias das medidas por departamento
+        intervalos (pd.DataFrame): Intervalos da taxa de promoção (ver intervalos_departamento)
+
+    Retorna:
+        dict: Contagem, promoção, scores, KPIs e tempo de serviço por departamento,
+        total, 'ic_promocao' e as 'diferencas_significativas' (p.p. frente aos demais)
+    """
+    resultados = {
+        'contagem': contagem.to_dict(),
+        'promocao': medias['is_promoted'].mul(100).round(1).to_dict(),
+        'scores': medias['avg_training_score'].round(1).to_dict(),
+        'kpis': medias['KPIs_met >80%'].mul(100).round(1).to_dict(),
+        'tempo_servico': medias['length_of_service'].round(1).to_dict(),
+        'total': int(contagem.sum()),
+        'ic_promocao': {},
+        'diferencas_significativas': {}
+    }
+    if intervalos is not None:
+        resultados['ic_promocao'] = {
+            d: (linha.taxa_inf * 100, linha.taxa_sup * 100) for d, linha in intervalos.iterrows()
+        }
+        significativas = intervalos[intervalos['p_valor'] < 1 - NIVEL].sort_values('diferenca', ascending=False)
+        resultados['diferencas_significativas'] = significativas['diferenca'].mul(100).to_dict()
+    return resultados
+
+
+def metricas_regiao(resumo: RegionSummary) -> Dict[str, pd.Series]:
+    """
+    Métricas do painel regional (séries por região, usadas também nos gráficos Top N).
+
+    Retorna:
+        dict: 'contagem', 'promocao' (%), 'scores' e 'kpis' (%)
+    """
+    medias = resumo.medias()
+    return {
+        'contagem': resumo.contagens(),
+        'promocao': medias['is_promoted'] * 100,
+        'scores': medias['avg_training_score'],
+        'kpis': medias['KPIs_met >80%'] * 100
+    }
+
+
+def generate_gender_report(resultados: Dict[str, Any]) -> str:
+    """Relatório textual (markdown) do painel de gênero, a partir de metricas_genero"""
+    # Listas montadas fora do f-string: barra invertida em expressão de f-string exige Python 3.12
+    distribuicao = ''.join([f'\n- {k}: {v} funcionários ({(v/resultados["total"]*100):.1f}%)'
+                            for k, v in resultados['distribuicao_genero'].items()])
+    diferencas = ''.join([f'\n- {g}: {d:+.1f} p.p. (IC {inf:+.1f} a {sup:+.1f}; p = {p:.3f})'
+                          f'{" — significativa" if p < 1 - NIVEL else ""}'
+                          for g, (d, inf, sup, p) in resultados['diferenca_promocao'].items()])
+    report = f"""
+    📌 Principais Insights
+
+    **Distribuição de Gênero:**
+    {distribuicao}
+
+    **Performance por Gênero:**
+    - 🏆 KPIs Atingidos: {max(resultados['media_kpi'], key=resultados['media_kpi'].get).title()} lidera com {max(resultados['media_kpi'].values())*100:.1f}%
+    - 🎯 Score de Treinamento: {max(resultados['media_score'], key=resultados['media_score'].get).title()} com média de {max(resultados['media_score'].values()):.1f} pontos
+
+    **Diferença na Taxa de Promoção (frente aos demais, IC {NIVEL:.0%} e teste de permutação):**
+    {diferencas}
+
+    **Recomendações Estratégicas:**
+    - Implementar programas de mentoria cruzada
+    - Revisar processos de promoção
+    - Desenvolver treinamentos específicos por gênero
+    """
+    return report
+
+
+def generate_department_report(resultados: Dict[str, Any]) -> str:
+    """Relatório textual (markdown) do painel departamental, a partir de metricas_departamento"""
+    top_dept = max(resultados['contagem'], key=resultados['contagem'].get)
+    top_promo = max(resultados['promocao'], key=resultados['promocao'].get)
+    top_score = max(resultados['scores'], key=resultados['scores'].get)
+
+    report = f"""
+    📌 **Principais Insights**
+
+    **Distribuição Departamental:**
+    - Departamento mais numeroso: {top_dept} ({resultados['contagem'][top_dept]} funcionários)
+    - Representa {(resultados['contagem'][top_dept]/resultados['total']*100):.1f}% do total
+
+    **Performance:**
+    - 🚀 Melhor taxa de promoção: {top_promo} ({resultados['promocao'][top_promo]:.1f}%)
+    - 🎯 Melhor score de treinamento: {top_score} ({resultados['scores'][top_score]:.1f} pontos)
+
+    **Taxa de Promoção (IC {NIVEL:.0%} por bootstrap):**
+    - {top_promo}: {resultados['ic_promocao'][top_promo][0]:.1f}% a {resultados['ic_promocao'][top_promo][1]:.1f}%
+    - Diferenças significativas frente aos demais departamentos (permutação, p < {1 - NIVEL:.2f}): {', '.join(f'{d} ({dif:+.1f} p.p.)' for d, dif in resultados['diferencas_significativas'].items()) or 'nenhuma'}
+
+    **Recomendações:**
+    - Desenvolver programa de desenvolvimento gerencial para {top_dept}
+    - Implementar plano de capacitação técnica para departamentos com baixos scores
+    - Criar programa de retenção para departamentos com maior tempo de serviço
+    """
+
+    return report.strip()
+
+
+@perfilado()
+def gerar_relatorio_regional(region_counts: pd.Series, total: int) -> str:
+    """
+    Relatório executivo regional em HTML.
+
+    Parâmetros:
+        region_counts (pd.Series): Funcionários por região
+        total (int): Total de funcionários
+
+    Retorna:
+        str: Caixa HTML do relatório
+    """
+    total_regioes = len(region_counts)
+    media_funcionarios = region_counts.mean()
+    mediana_funcionarios = region_counts.median()
+    top_region = region_counts.idxmax()
+    top_region_percent = (region_counts[top_region] / total * 100)
+
+    relatorio = f"""
+    <div class='report-box'>
+    <h3>Resumo da Análise Regional</h3>
+    <b>Estatísticas Gerais:</b><br>
+    - Total de regiões analisadas: <b>{total_regioes}</b><br>
+    - Média de funcionários por região: <b>{media_funcionarios:.1f}</b><br>
+    - Mediana de funcionários por região: <b>{mediana_funcionarios:.1f}</b><br><br>
+    <b>Destaques:</b><br>
+    - A região <b>{top_region}</b> concentra aproximadamente <b>{top_region_percent:.1f}%</b> do total de funcionários.<br>
+    - As regiões com melhores taxas de promoção, scores e KPIs foram identificadas nos gráficos acima.<br><br>
+    <b>Insights Adicionais:</b><br>
+    - Recomenda-se aprofundar a análise segmentada por departamento e cargo para ações estratégicas.
+    </div>
+    """
+    return relatorio
@@ -0,0 +1,115 @@
+"""
+Execução paralela por faixas de linhas para bases grandes.
+
+O arquivo colunar da versão atual é dividido em faixas contíguas de linhas,
+uma por processo do pool, sem regravar os dados. Cada processo abre o mesmo
+arquivo via memory-map — as páginas vêm do cache do sistema operacional,
+compartilhado entre os processos, sem cópia pelo pickle —, fatia a sua faixa
+(zero-copy) e devolve apenas as células do cubo parcial, que são pequenas. O
+processo principal combina os cubos parciais (count, sum e sumsq são
+aditivos).
+
+As faixas têm o mesmo número de linhas, então a carga é equilibrada qualquer
+que seja a distribuição das categorias. O pool só compensa com vários núcleos
+e bases grandes; o ponto de virada depende da máquina e é medido por
+benchmarks/bench_particoes.py. Por isso load_cube constrói em série, a menos
+que receba o número de processos. No app, na API e na exportação, esse número
+vem da variável de ambiente HR_PROCESSOS (processos_configurados), repassada
+ao DeltaIngestor e usada também pelo resumo do modo agregado do painel de
+gênero.
+
+Uso:
+    python streamlit/partitioned_store.py ../data/processed/train_atualizado.csv --processos 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from aggregate_cube import AGE_EDGES, DIMENSOES, MEDIDAS, AggregateCube
+from data_store import DATA_PATH, PathLike, ensure_store
+
+# Variável de ambiente com o número de processos das construções paralelas
+PROCESSOS_ENV = 'HR_PROCESSOS'
+
+
+def processos_configurados() -> Optional[int]:
+    """Processos definidos em HR_PROCESSOS (None = em série, se ausente ou inválida)"""
+    try:
+        processos = int(os.environ.get(PROCESSOS_ENV, ''))
+    except ValueError:
+        return None
+    return processos if processos > 1 else None
+
+
+def faixas(n_linhas: int, partes: int) -> List[Tuple[int, int]]:
+    """Divide [0, n_linhas) em até `partes` faixas contíguas (inicio, fim) de tamanhos iguais"""
+    partes = max(1, min(partes, n_linhas))
+    limites = [n_linhas * i // partes for i in range(partes + 1)]
+    return list(zip(limites[:-1], limites[1:]))
+
+
+def ler_faixa(arrow_path: PathLike, colunas: Sequence[str], inicio: int, fim: int) -> pd.DataFrame:
+    """Linhas [inicio, fim) das colunas pedidas, fatiadas do memory-map sem cópia"""
+    tabela = feather.read_table(arrow_path, columns=list(colunas), memory_map=True)
+    return tabela.slice(inicio, fim - inicio).to_pandas(split_blocks=True, self_destruct=False)
+
+
+def _cubo_faixa(arrow_path: Path, inicio: int, fim: int, measures: Sequence[str],
+                age_edges: Sequence[int]) -> AggregateCube:
+    """Cubo parcial de uma faixa de linhas (executado nos processos do pool)"""
+    # 'age' é lida sempre: define a dimensão age_bucket
+    colunas = [col for col in DIMENSOES if col != 'age_bucket'] + list(dict.fromkeys([*measures, 'age']))
+    return AggregateCube.build(ler_faixa(arrow_path, colunas, inicio, fim), measures, age_edges)
+
+
+def construir_cubo_paralelo(source: PathLike = DATA_PATH, processos: Optional[int] = None,
+                            measures: Sequence[str] = MEDIDAS,
+                            age_edges: Sequence[int] = AGE_EDGES) -> AggregateCube:
+    """
+    Constrói o cubo de agregados com um pool de processos, uma faixa de linhas por processo.
+
+    Parâmetros:
+        source: Caminho do CSV processado
+        processos: Número de processos (None = núcleos disponíveis)
+        measures: Medidas numéricas a agregar
+        age_edges: Limites das faixas etárias
+
+    Retorna:
+        AggregateCube: Mesmo cubo de AggregateCube.build sobre a base inteira
+    """
+    arrow_path = ensure_store(source)
+    n_linhas = feather.read_table(arrow_path, columns=['employee_id'], memory_map=True).num_rows
+    partes = faixas(n_linhas, processos or os.cpu_count() or 1)
+    if len(partes) <= 1:
+        return AggregateCube.merge([_cubo_faixa(arrow_path, inicio, fim, measures, age_edges)
+                                    for inicio, fim in partes])
+
+    # 'spawn' evita herdar por fork as threads do servidor Streamlit
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=len(partes), mp_context=contexto) as pool:
+        parciais = list(pool.map(_cubo_faixa, [arrow_path] * len(partes), *zip(*partes),
+                                 [measures] * len(partes), [age_edges] * len(partes)))
+    return AggregateCube.merge(parciais)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Constrói o cubo em paralelo, uma faixa de linhas por processo')
+    parser.add_argument('source', nargs='?', default=str(DATA_PATH), help='CSV processado')
+    parser.add_argument('--processos', type=int, default=None, help='Número de processos (padrão: núcleos)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    cubo = construir_cubo_paralelo(args.source, args.processos)
+    print(f'cubo com {len(cubo.cells):,} células ({cubo.total:,} linhas) em {time.perf_counter() - inicio:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Instrumentação leve dos pontos críticos dos dashboards.
+
+`medir(etapa)` (context manager) e `@perfilado` (decorador) registram tempo
+de parede e número de linhas de cada etapa de uma execução: carregamento,
+métricas, construção das figuras e serialização no st.plotly_chart. As
+medições só são coletadas dentro de uma `Perfilador.sessao()`; fora dela,
+cada ponto instrumentado custa apenas a leitura de uma ContextVar, de modo
+que o painel desligado não pesa no rerun.
+
+O pico de memória alocada (tracemalloc) só é medido com `memoria=True`. O
+tracemalloc é global ao processo: enquanto ligado, desacelera todas as
+alocações — inclusive as das outras sessões do servidor — e infla os tempos
+medidos, e com várias sessões perfilando ao mesmo tempo os picos se
+misturam. Por isso os tempos de referência vêm de sessões sem memória.
+
+As medições aninhadas guardam o nível de profundidade e o pico de memória
+de cada etapa inclui o das etapas internas.
+"""
+
+import json
+import time
+import tracemalloc
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+import pandas as pd
+
+_ATUAL: ContextVar[Optional['Perfilador']] = ContextVar('perfilador_atual', default=None)
+
+
+def contar_linhas(obj: Any) -> Optional[int]:
+    """Número de linhas de um resultado (DataFrame, Series, tabela Arrow, cubo, motor de filtros)"""
+    if obj is None:
+        return None
+    if hasattr(obj, 'num_rows'):
+        return int(obj.num_rows)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(obj, dict) and isinstance(obj.get('total'), int):
+        return obj['total']
+    for atributo in ('total', 'n'):
+        valor = getattr(obj, atributo, None)
+        if isinstance(valor, int):
+            return valor
+    return None
+
+
+@dataclass
+class Medicao:
+    """Uma etapa medida"""
+    etapa: str
+    nivel: int
+    segundos: float = 0.0
+    pico_mb: Optional[float] = None
+    linhas: Optional[int] = None
+
+
+class _Medidor:
+    """Context manager de uma etapa dentro de uma sessão ativa"""
+
+    __slots__ = ('perfilador', 'medicao', '_inicio', '_base', '_pico_filhos')
+
+    def __init__(self, perfilador: 'Perfilador', etapa: str, linhas: Optional[int]):
+        self.perfilador = perfilador
+        self.medicao = Medicao(etapa, len(perfilador._pilha), linhas=linhas)
+
+    @property
+    def linhas(self) -> Optional[int]:
+        return self.medicao.linhas
+
+    @linhas.setter
+    def linhas(self, valor: Optional[int]) -> None:
+        self.medicao.linhas = valor
+
+    def __enter__(self) -> '_Medidor':
+        pilha = self.perfilador._pilha
+        if self.perfilador.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            if pilha:
+                # O pico acumulado até aqui pertence à etapa externa, antes de zerá-lo
+                externo = pilha[-1]
+                externo._pico_filhos = max(externo._pico_filhos, pico - externo._base)
+            tracemalloc.reset_peak()
+            self._base = atual
+            self._pico_filhos = 0
+        self.perfilador.medicoes.append(self.medicao)
+        pilha.append(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.medicao.segundos = time.perf_counter() - self._inicio
+        pilha = self.perfilador._pilha
+        pilha.pop()
+        if self.perfilador.memoria:
+            pico = max(self._pico_filhos, tracemalloc.get_traced_memory()[1] - self._base)
+            self.medicao.pico_mb = max(pico, 0) / 2 ** 20
+            if pilha:
+                externo = pilha[-1]
+                externo._pico_filhos = max(externo._pico_filhos, pico + self._base - externo._base)
+        return False
+
+
+class _MedidorNulo:
+    """Context manager sem efeito, usado quando não há sessão ativa"""
+
+    __slots__ = ()
+    linhas = None
+
+    def __enter__(self) -> '_MedidorNulo':
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        pass
+
+
+_NULO = _MedidorNulo()
+
+
+class Perfilador:
+    """Coleta as medições de uma execução (um rerun de página)"""
+
+    def __init__(self, rotulo: str = '', memoria: bool = False):
+        self.rotulo = rotulo
+        # Liga o tracemalloc na sessão: pico de memória por etapa, ao custo de tempos inflados
+        self.memoria = memoria
+        self.medicoes: List[Medicao] = []
+        self.inicio = datetime.now(timezone.utc)
+        self._pilha: List[_Medidor] = []
+
+    def sessao(self, etapa: str = 'total') -> '_Sessao':
+        """Ativa o perfilador no contexto atual; a sessão inteira é medida como `etapa`"""
+        return _Sessao(self, etapa)
+
+    def tabela(self) -> pd.DataFrame:
+        """Medições em ordem de início, com a etapa indentada pelo nível"""
+        df = pd.DataFrame([asdict(m) for m in self.medicoes],
+                          columns=['etapa', 'nivel', 'segundos', 'pico_mb', 'linhas'])
+        df['etapa'] = ['  ' * n + e for n, e in zip(df['nivel'], df['etapa'])]
+        df['linhas'] = df['linhas'].astype('Int64')
+        return df
+
+    def gravar_jsonl(self, destino: Union[str, Path]) -> Path:
+        """Acrescenta uma linha JSON por medição ao arquivo de destino"""
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        execucao = self.inicio.isoformat(timespec='milliseconds')
+        with open(destino, 'a', encoding='utf-8') as f:
+            for m in self.medicoes:
+                linha = {'execucao': execucao, 'rotulo': self.rotulo, **asdict(m)}
+                f.write(json.dumps(linha, ensure_ascii=False) + '\n')
+        return destino
+
+
+class _Sessao:
+    """Mantém o perfilador ativo (e o tracemalloc ligado, se medir memória) durante a execução"""
+
+    def __init__(self, perfilador: Perfilador, etapa: str):
+        self.perfilador = perfilador
+        self.etapa = etapa
+
+    def __enter__(self) -> Perfilador:
+        self._iniciou_tracemalloc = self.perfilador.memoria and not tracemalloc.is_tracing()
+        if self._iniciou_tracemalloc:
+            tracemalloc.start()
+        self._token = _ATUAL.set(self.perfilador)
+        self._total = _Medidor(self.perfilador, self.etapa, None).__enter__()
+        return self.perfilador
+
+    def __exit__(self, *exc) -> bool:
+        try:
+            self._total.__exit__(*exc)
+        finally:
+            _ATUAL.reset(self._token)
+            if self._iniciou_tracemalloc:
+                tracemalloc.stop()
+        return False
+
+
+def ativo() -> bool:
+    """Indica se há uma sessão de perfil ativa no contexto atual"""
+    return _ATUAL.get() is not None
+
+
+def medir(etapa: str, linhas: Optional[int] = None) -> Union[_Medidor, _MedidorNulo]:
+    """
+    Mede o bloco como uma etapa da sessão ativa.
+
+    Parâmetros:
+        etapa (str): Nome exibido no painel
+        linhas (int): Linhas processadas (pode ser definido depois em `.linhas`)
+
+    Retorna:
+        Context manager; sem sessão ativa, um objeto nulo sem custo
+    """
+    perfilador = _ATUAL.get()
+    if perfilador is None:
+        return _NULO
+    return _Medidor(perfilador, etapa, linhas)
+
+
+def perfilado(etapa: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorador que mede cada chamada da função como uma etapa.
+
+    As linhas são inferidas do resultado ou, se ele não as informar (uma
+    figura, por exemplo), do primeiro argumento. Quando aplicado sob
+    st.cache_data/st.cache_resource, mede apenas as execuções reais (falhas
+    do cache).
+    """
+    def decorar(func: Callable) -> Callable:
+        nome = etapa or func.__qualname__
+
+        @wraps(func)
+        def envolvida(*args, **kwargs):
+            perfilador = _ATUAL.get()
+            if perfilador is None:
+                return func(*args, **kwargs)
+            with _Medidor(perfilador, nome, None) as medidor:
+                resultado = func(*args, **kwargs)
+                linhas = contar_linhas(resultado)
+                medidor.linhas = linhas if linhas is not None or not args else contar_linhas(args[0])
+            return resultado
+        return envolvida
+    return decorar
@@ -0,0 +1,92 @@
+"""
+Detecção de viés em promoções (equivalente vetorizado de promo_vies.sql).
+
+Cada grupo (gênero, escolaridade, departamento) tem sua taxa de promoção
+comparada com a taxa do próprio departamento; a diferença é significativa
+quando passa de `limiar` desvios padrão (amostrais) do departamento. Grupos
+e departamentos são resolvidos com chaves inteiras e np.bincount, numa
+única passada sobre as linhas, como o plano pré-agregado da consulta SQL.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+GRUPOS = ('gender', 'education', 'department')
+
+
+def _codificar(serie: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Códigos inteiros deslocados em +1 (0 = nulo) e rótulos correspondentes"""
+    categorias = serie.cat if isinstance(serie.dtype, pd.CategoricalDtype) else pd.Categorical(serie)
+    codigos = np.asarray(categorias.codes, dtype=np.int64) + 1
+    rotulos = np.concatenate([[np.nan], np.asarray(categorias.categories, dtype=object)])
+    return codigos, rotulos
+
+
+def detectar_vies_promocao(df: pd.DataFrame, limiar: float = 2.0, grupos: Sequence[str] = GRUPOS,
+                           referencia: str = 'department', alvo: str = 'is_promoted') -> pd.DataFrame:
+    """
+    Compara a taxa de promoção de cada grupo com a do seu departamento.
+
+    Parâmetros:
+        df (pd.DataFrame): Base de dados
+        limiar (float): Número de desvios padrão que torna a diferença significativa
+        grupos: Colunas que definem os grupos analisados (devem incluir a referência)
+        referencia (str): Coluna que define a taxa esperada
+        alvo (str): Coluna binária de promoção
+
+    Retorna:
+        pd.DataFrame: Mesmas colunas e ordem de promo_vies.sql
+    """
+    grupos = list(grupos)
+    codificados = [_codificar(df[coluna]) for coluna in grupos]
+    formato = tuple(len(rotulos) for _, rotulos in codificados)
+    chave = np.ravel_multi_index([codigos for codigos, _ in codificados], formato)
+    tamanho = int(np.prod(formato))
+
+    # Como no AVG do SQL, valores nulos do alvo não entram nas médias
+    y = df[alvo].to_numpy(dtype=np.float64)
+    validos = ~np.isnan(y)
+    y = np.where(validos, y, 0.0)
+    if tamanho <= max(len(chave), 1 << 20):
+        # Espaço de chaves pequeno: contagem direta, sem ordenação
+        n = np.bincount(chave, weights=validos, minlength=tamanho)
+        promovidos = np.bincount(chave, weights=y, minlength=tamanho)
+        chaves = np.flatnonzero(n)
+        n, promovidos = n[chaves], promovidos[chaves]
+    else:
+        chaves, inverso = np.unique(chave, return_inverse=True)
+        n = np.bincount(inverso, weights=validos)
+        promovidos = np.bincount(inverso, weights=y)
+
+    # Estatísticas da referência: média e desvio padrão amostral de uma variável 0/1
+    pos = grupos.index(referencia)
+    codigos_ref = codificados[pos][0]
+    n_ref = np.bincount(codigos_ref, weights=validos, minlength=formato[pos])
+    s_ref = np.bincount(codigos_ref, weights=y, minlength=formato[pos])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        esperado_ref = s_ref / n_ref * 100
+        desvio_ref = np.sqrt((s_ref - s_ref ** 2 / n_ref) / (n_ref - 1)) * 100
+        observado = promovidos / n * 100
+    desvio_ref[n_ref < 2] = np.nan
+    # Referência nula não casa com nenhum departamento (LEFT JOIN do SQL)
+    esperado_ref[0] = desvio_ref[0] = np.nan
+
+    indices = np.unravel_index(chaves, formato)
+    esperado = esperado_ref[indices[pos]]
+    desvio = desvio_ref[indices[pos]]
+    diferenca = observado - esperado
+
+    resultado = pd.DataFrame({coluna: rotulos[idx] for coluna, (_, rotulos), idx
+                              in zip(grupos, codificados, indices)})
+    resultado['observed_promotion_rate'] = observado
+    resultado['expected_promotion_rate'] = esperado
+    resultado['promotion_gap'] = diferenca
+    resultado['gap_status'] = np.where(np.abs(diferenca) > limiar * desvio, 'Significativo', 'Dentro do Esperado')
+
+    resultado = resultado[n > 0]
+    # Ordem do ORDER BY da consulta: nulos por último em cada coluna
+    ordem: List[np.ndarray] = [np.where(idx == 0, formato[i], idx)[n > 0] for i, idx in enumerate(indices)]
+    resultado = resultado.iloc[np.lexsort(ordem[::-1])].reset_index(drop=True)
+    return resultado
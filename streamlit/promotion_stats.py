@@ -0,0 +1,144 @@
+"""
+Intervalos de confiança e testes de permutação para taxas de promoção.
+
+A promoção é binária, então (funcionários, promovidos) por grupo são
+estatísticas suficientes: as reamostragens trabalham sobre esses agregados,
+nunca sobre as linhas, e o custo independe do tamanho da base.
+
+- Bootstrap: reamostrar N linhas com reposição equivale a sortear contagens
+  multinomiais sobre as células grupo x promovido, com probabilidades iguais
+  às frequências observadas. Os intervalos são percentis das taxas (e das
+  diferenças) reamostradas.
+- Permutação: embaralhar os rótulos de grupo mantém o tamanho de cada grupo e
+  o total de promovidos; o número de promovidos por grupo segue então uma
+  hipergeométrica multivariada. O p-valor bilateral compara a diferença
+  observada de cada grupo contra o restante com a distribuição permutada.
+
+As reamostragens são divididas em blocos com geradores independentes
+(SeedSequence.spawn) e executadas em um pool de threads — os sorteios do
+NumPy liberam o GIL —, de forma determinística para uma mesma semente.
+"""
+
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+REAMOSTRAGENS = 2000
+NIVEL = 0.95
+SEED = 42
+COLUNAS = ['n', 'taxa', 'taxa_inf', 'taxa_sup', 'diferenca', 'dif_inf', 'dif_sup', 'p_valor']
+# Reamostragens por bloco (cada bloco tem o seu gerador)
+BLOCO = 500
+
+
+def agregados_por_grupo(df: pd.DataFrame, grupo: str, alvo: str = 'is_promoted') -> pd.DataFrame:
+    """
+    Funcionários e promovidos por grupo, em uma passada (np.bincount).
+
+    Parâmetros:
+        df (pd.DataFrame): Base de dados
+        grupo (str): Coluna que define os grupos (linhas com grupo nulo são ignoradas)
+        alvo (str): Coluna binária de promoção
+
+    Retorna:
+        pd.DataFrame: Colunas 'n' e 'promovidos', indexadas pelos grupos presentes
+    """
+    cat = df[grupo].astype('category').cat
+    codigos = cat.codes.to_numpy().astype(np.intp)
+    validos = codigos >= 0
+    k = len(cat.categories)
+    n = np.bincount(codigos[validos], minlength=k)
+    promovidos = np.bincount(codigos[validos], weights=df[alvo].to_numpy()[validos], minlength=k)
+    presentes = n > 0
+    return pd.DataFrame({'n': n[presentes], 'promovidos': np.rint(promovidos[presentes]).astype(np.int64)},
+                        index=pd.Index(np.asarray(cat.categories, dtype=object)[presentes], name=grupo))
+
+
+def _em_blocos(sortear: Callable[[np.random.Generator, int], np.ndarray], reamostragens: int,
+               seed: Optional[int], processos: Optional[int]) -> np.ndarray:
+    """
+    Executa `sortear(gerador, tamanho)` em blocos paralelos e concatena as reamostragens.
+
+    A divisão em blocos depende só do número de reamostragens: o resultado é o
+    mesmo com qualquer número de threads.
+    """
+    n_blocos = max(1, -(-reamostragens // BLOCO))
+    tamanhos = np.diff(np.linspace(0, reamostragens, n_blocos + 1).astype(int)).tolist()
+    geradores = [np.random.default_rng(filho) for filho in np.random.SeedSequence(seed).spawn(n_blocos)]
+    threads = min(processos or os.cpu_count() or 1, n_blocos)
+    if threads == 1:
+        return np.concatenate(list(map(sortear, geradores, tamanhos)))
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return np.concatenate(list(pool.map(sortear, geradores, tamanhos)))
+
+
+def _diferenca_restante(n: np.ndarray, k: np.ndarray, total_n, total_k) -> np.ndarray:
+    """Taxa de cada grupo menos a taxa do restante da base (NaN sem restante)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return k / n - (total_k - k) / (total_n - n)
+
+
+def comparar_grupos(agregados: pd.DataFrame, reamostragens: int = REAMOSTRAGENS, nivel: float = NIVEL,
+                    seed: Optional[int] = SEED, processos: Optional[int] = None) -> pd.DataFrame:
+    """
+    Taxa de promoção de cada grupo com intervalo bootstrap e teste de permutação contra o restante.
+
+    Parâmetros:
+        agregados (pd.DataFrame): Colunas 'n' e 'promovidos' por grupo (ver agregados_por_grupo)
+        reamostragens (int): Número de reamostragens do bootstrap e da permutação
+        nivel (float): Nível de confiança dos intervalos
+        seed (int): Semente (resultados reprodutíveis)
+        processos (int): Threads usadas (None = núcleos disponíveis)
+
+    Retorna:
+        pd.DataFrame: Por grupo, 'n', 'taxa' e intervalo ('taxa_inf', 'taxa_sup'); a
+        diferença para o restante ('diferenca', 'dif_inf', 'dif_sup') e o 'p_valor'
+        da permutação. Taxas e diferenças em fração (0-1).
+    """
+    n = agregados['n'].to_numpy(dtype=np.int64)
+    k = agregados['promovidos'].to_numpy(dtype=np.int64)
+    total_n, total_k = int(n.sum()), int(k.sum())
+    alfa = (1 - nivel) / 2 * 100
+    if total_n == 0:
+        return pd.DataFrame(np.nan, index=agregados.index, columns=COLUNAS).assign(n=n)
+
+    # Bootstrap: contagens multinomiais sobre as células (grupo, não promovido) e (grupo, promovido)
+    probabilidades = np.column_stack([n - k, k]).ravel() / total_n
+    celulas = _em_blocos(lambda rng, b: rng.multinomial(total_n, probabilidades, size=b),
+                         reamostragens, seed, processos).reshape(reamostragens, len(n), 2)
+    n_boot = celulas.sum(axis=2)
+    k_boot = celulas[:, :, 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        taxas = k_boot / n_boot
+    diferencas = _diferenca_restante(n_boot, k_boot, total_n, total_k=k_boot.sum(axis=1, keepdims=True))
+
+    # Permutação: promovidos por grupo ~ hipergeométrica multivariada (tamanhos fixos, total fixo)
+    k_perm = _em_blocos(lambda rng, b: rng.multivariate_hypergeometric(n, total_k, size=b),
+                        reamostragens, None if seed is None else seed + 1, processos)
+    observada = _diferenca_restante(n, k, total_n, total_k)
+    permutadas = _diferenca_restante(n, k_perm, total_n, total_k)
+    # Tolerância relativa: empates numéricos contam como tão extremos quanto o observado
+    extremos = (np.abs(permutadas) >= np.abs(observada) * (1 - 1e-9)).sum(axis=0)
+    p_valor = np.where(np.isnan(observada), np.nan, (extremos + 1) / (reamostragens + 1))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        taxa = k / n
+    with warnings.catch_warnings():
+        # Grupos sem restante (ou ausentes em todas as reamostragens) ficam com NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        limites_taxa = np.nanpercentile(taxas, [alfa, 100 - alfa], axis=0)
+        limites_dif = np.nanpercentile(diferencas, [alfa, 100 - alfa], axis=0)
+    return pd.DataFrame({
+        'n': n,
+        'taxa': taxa,
+        'taxa_inf': limites_taxa[0],
+        'taxa_sup': limites_taxa[1],
+        'diferenca': observada,
+        'dif_inf': limites_dif[0],
+        'dif_sup': limites_dif[1],
+        'p_valor': p_valor
+    }, index=agregados.index)
@@ -0,0 +1,200 @@
+"""
+Tabelas-resumo materializadas com atualização incremental.
+
+As tabelas de sql/table_creation_scripts (department_benchmarks,
+training_impact e promotion_eligibility) ficam num banco DuckDB persistente.
+A cada carga, um hash por linha (chave employee_id) é comparado com o
+retrato da execução anterior; somente os grupos afetados por inclusões,
+alterações ou remoções (departamentos, quantidades de treinamentos ou
+funcionários) são apagados e recalculados, usando o próprio SELECT de cada
+script sobre as linhas desses grupos. Sem retrato anterior, as tabelas são
+construídas do zero.
+
+O retrato só é substituído ao final da atualização: uma execução
+interrompida é refeita por completo na próxima carga, pois apagar e
+recalcular um grupo é idempotente.
+
+Uso:
+    python streamlit/refresh_manager.py --dados data/processed/train_atualizado.csv
+"""
+
+import argparse
+import re
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+import pandas as pd
+
+from data_store import DATA_PATH, PathLike
+from sql_engine import SQL_DIR, SQLEngine, dividir_instrucoes
+
+
+class Resumo(NamedTuple):
+    """Tabela-resumo, script que a cria e coluna que define seus grupos"""
+    tabela: str
+    script: str
+    chave: str
+
+
+RESUMOS = (
+    Resumo('department_benchmarks', 'table_creation_scripts/benchmark.sql', 'department'),
+    Resumo('training_impact', 'table_creation_scripts/eficacia.sql', 'no_of_trainings'),
+    Resumo('promotion_eligibility', 'table_creation_scripts/elegibilidade.sql', 'employee_id'),
+)
+
+ID = 'employee_id'
+SNAPSHOT = 'refresh_snapshot'
+
+
+def caminho_banco(source: PathLike = DATA_PATH) -> Path:
+    """Banco DuckDB das tabelas-resumo, ao lado do armazenamento colunar"""
+    return Path(source).parent / '.store' / 'resumos.duckdb'
+
+
+def _select_do_script(path: Path) -> str:
+    """SELECT que alimenta a tabela (última instrução do script)"""
+    instrucao = dividir_instrucoes(path.read_text(encoding='utf-8'))[-1]
+    inicio = re.search(r'\bSELECT\b', instrucao, re.IGNORECASE)
+    if inicio is None:
+        raise ValueError(f'{path.name}: a última instrução não contém um SELECT')
+    return instrucao[inicio.start():]
+
+
+def _q(coluna: str) -> str:
+    """Identificador entre aspas duplas"""
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+class RefreshManager:
+    """Mantém as tabelas-resumo em dia com a base processada"""
+
+    def __init__(self, source: PathLike = DATA_PATH, database: Optional[PathLike] = None,
+                 resumos=RESUMOS):
+        self.source = source
+        self.database = Path(database) if database else caminho_banco(source)
+        self.database.parent.mkdir(parents=True, exist_ok=True)
+        self.resumos = tuple(resumos)
+        self.chaves = sorted({resumo.chave for resumo in self.resumos} - {ID})
+        self.engine = SQLEngine(source, str(self.database))
+
+    def _existe(self, tabela: str) -> bool:
+        return bool(self.engine.query(
+            'SELECT COUNT(*) AS n FROM information_schema.tables WHERE table_name = ?', [tabela]
+        )['n'].iloc[0])
+
+    def _retrato_atual(self) -> None:
+        """Hash de cada linha da base, com as chaves de grupo dos resumos"""
+        colunas = self.engine.query('SELECT * FROM base_processada LIMIT 0').columns
+        hash_linha = ', '.join(_q(coluna) for coluna in colunas)
+        chaves = ''.join(f', {_q(chave)}' for chave in self.chaves)
+        self.engine.executar(f"""
+            CREATE OR REPLACE TABLE refresh_atual AS
+            SELECT {_q(ID)}, hash({hash_linha}) AS row_hash{chaves}
+            FROM base_processada
+        """)
+
+    def _reconstruir(self) -> Dict[str, int]:
+        """Recria todas as tabelas a partir dos scripts originais"""
+        for resumo in self.resumos:
+            self.engine.executar_arquivo(SQL_DIR / resumo.script)
+        return {resumo.tabela: -1 for resumo in self.resumos}
+
+    def _atualizar_grupos(self) -> Dict[str, int]:
+        """Apaga e recalcula apenas os grupos tocados pelas linhas alteradas"""
+        antes = ''.join(f', s.{_q(chave)} AS {_q(chave + "__antes")}' for chave in self.chaves)
+        depois = ''.join(f', a.{_q(chave)} AS {_q(chave + "__depois")}' for chave in self.chaves)
+        self.engine.executar(f"""
+            CREATE OR REPLACE TABLE refresh_alteracoes AS
+            SELECT
+                COALESCE(a.{_q(ID)}, s.{_q(ID)}) AS {_q(ID)},
+                s.{_q(ID)} IS NOT NULL AS existia,
+                a.{_q(ID)} IS NOT NULL AS existe{antes}{depois}
+            FROM refresh_atual a
+            FULL OUTER JOIN {SNAPSHOT} s ON a.{_q(ID)} = s.{_q(ID)}
+            WHERE a.row_hash IS DISTINCT FROM s.row_hash
+        """)
+
+        grupos = {}
+        for resumo in self.resumos:
+            chave = _q(resumo.chave)
+            if resumo.chave == ID:
+                afetadas = f'SELECT {chave} FROM refresh_alteracoes'
+            else:
+                # Grupo de origem (linhas alteradas ou removidas) e de destino (incluídas ou alteradas)
+                afetadas = (f'SELECT {_q(resumo.chave + "__antes")} AS {chave} FROM refresh_alteracoes WHERE existia '
+                            f'UNION SELECT {_q(resumo.chave + "__depois")} FROM refresh_alteracoes WHERE existe')
+            self.engine.executar(f'CREATE OR REPLACE TABLE refresh_chaves AS {afetadas}')
+            grupos[resumo.tabela] = int(self.engine.query('SELECT COUNT(*) AS n FROM refresh_chaves')['n'].iloc[0])
+            if not grupos[resumo.tabela]:
+                continue
+
+            pertence = f'EXISTS (SELECT 1 FROM refresh_chaves c WHERE c.{chave} IS NOT DISTINCT FROM t.{chave})'
+            select = re.sub(r'\bmain_table\b', 'refresh_main_table', _select_do_script(SQL_DIR / resumo.script))
+            self.engine.executar(f"""
+                DELETE FROM {resumo.tabela} t WHERE {pertence};
+                CREATE OR REPLACE VIEW refresh_main_table AS SELECT * FROM main_table t WHERE {pertence};
+                INSERT INTO {resumo.tabela} {select};
+            """)
+        return grupos
+
+    def refresh(self, completo: bool = False) -> Dict[str, Any]:
+        """
+        Atualiza as tabelas-resumo com a versão atual da base.
+
+        Parâmetros:
+            completo (bool): Ignora o retrato anterior e reconstrói tudo
+
+        Retorna:
+            dict: Linhas incluídas/alteradas/removidas e grupos recalculados por tabela
+                  (-1 = tabela reconstruída do zero)
+        """
+        self.engine.recarregar(self.source)
+        self._retrato_atual()
+
+        incremental = not completo and all(self._existe(nome) for nome in
+                                           [SNAPSHOT] + [resumo.tabela for resumo in self.resumos])
+        if incremental:
+            grupos = self._atualizar_grupos()
+            movimento = self.engine.query("""
+                SELECT
+                    COUNT(*) FILTER (WHERE existe AND NOT existia) AS incluidos,
+                    COUNT(*) FILTER (WHERE existe AND existia) AS alterados,
+                    COUNT(*) FILTER (WHERE existia AND NOT existe) AS removidos
+                FROM refresh_alteracoes
+            """).iloc[0].astype(int).to_dict()
+        else:
+            grupos = self._reconstruir()
+            total = int(self.engine.query('SELECT COUNT(*) AS n FROM refresh_atual')['n'].iloc[0])
+            movimento = {'incluidos': total, 'alterados': 0, 'removidos': 0}
+
+        self.engine.executar(f"""
+            DROP TABLE IF EXISTS {SNAPSHOT};
+            ALTER TABLE refresh_atual RENAME TO {SNAPSHOT};
+            DROP TABLE IF EXISTS refresh_alteracoes;
+            DROP TABLE IF EXISTS refresh_chaves;
+            DROP VIEW IF EXISTS refresh_main_table;
+        """)
+        return {'incremental': incremental, **movimento, 'grupos': grupos}
+
+    def tabela(self, nome: str) -> pd.DataFrame:
+        """Conteúdo atual de uma tabela-resumo"""
+        return self.engine.query(f'SELECT * FROM {nome}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Atualiza as tabelas-resumo de sql/table_creation_scripts')
+    parser.add_argument('--dados', default=str(DATA_PATH), help='CSV processado')
+    parser.add_argument('--banco', default=None, help='Banco DuckDB das tabelas-resumo')
+    parser.add_argument('--completo', action='store_true', help='Reconstrói as tabelas do zero')
+    args = parser.parse_args()
+
+    relatorio = RefreshManager(args.dados, args.banco).refresh(args.completo)
+    modo = 'incremental' if relatorio['incremental'] else 'completa'
+    print(f"Atualização {modo}: {relatorio['incluidos']} incluídos, {relatorio['alterados']} alterados, "
+          f"{relatorio['removidos']} removidos")
+    for tabela, grupos in relatorio['grupos'].items():
+        print(f"  {tabela}: {'reconstruída' if grupos < 0 else f'{grupos} grupos recalculados'}")
+
+
+if __name__ == '__main__':
+    main()
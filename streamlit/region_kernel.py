@@ -0,0 +1,121 @@
+"""
+Kernel vetorizado de agregação regional.
+
+Uma única varredura com reduções np.bincount sobre os códigos inteiros de
+região produz contagens, somas das medidas (base das médias e da matriz de
+correlação) e a tabela departamento x região. O mesmo kernel aceita linhas
+brutas ou células pré-agregadas do cubo (pesos = contagens, valores = somas).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+
+MEDIDAS = ['is_promoted', 'avg_training_score', 'KPIs_met >80%', 'age', 'length_of_service', 'awards_won?']
+
+
+@dataclass(frozen=True)
+class RegionSummary:
+    """Resultado compacto do kernel, base de todos os gráficos regionais"""
+    regioes: List[str]
+    departamentos: List[str]
+    contagem: np.ndarray
+    somas: Dict[str, np.ndarray]
+    dept_regiao: np.ndarray
+
+    @property
+    def total(self) -> int:
+        """Total de linhas com região definida"""
+        return int(self.contagem.sum())
+
+    def contagens(self) -> pd.Series:
+        """Funcionários por região em ordem decrescente (como value_counts)"""
+        serie = pd.Series(self.contagem.astype(np.int64), index=pd.Index(self.regioes, name='region'), name='count')
+        return serie[serie > 0].sort_values(ascending=False)
+
+    def medias(self) -> pd.DataFrame:
+        """Média de cada medida por região"""
+        presentes = self.contagem > 0
+        return pd.DataFrame(
+            {m: s[presentes] / self.contagem[presentes] for m, s in self.somas.items()},
+            index=pd.Index(np.asarray(self.regioes, dtype=object)[presentes], name='region')
+        )
+
+    def crosstab(self) -> pd.DataFrame:
+        """Proporção (%) de cada departamento dentro de cada região"""
+        linhas = self.dept_regiao.sum(axis=1)
+        presentes = linhas > 0
+        colunas = self.dept_regiao.sum(axis=0) > 0
+        tabela = self.dept_regiao[presentes][:, colunas] / linhas[presentes, None] * 100
+        return pd.DataFrame(
+            tabela,
+            index=pd.Index(np.asarray(self.regioes, dtype=object)[presentes], name='region'),
+            columns=pd.Index(np.asarray(self.departamentos, dtype=object)[colunas], name='department')
+        )
+
+
+def resumir_regioes(region_codes: np.ndarray, department_codes: np.ndarray, valores: Dict[str, np.ndarray],
+                    regioes: Sequence[str], departamentos: Sequence[str],
+                    pesos: Optional[np.ndarray] = None) -> RegionSummary:
+    """
+    Agrega todas as métricas regionais em uma única passada.
+
+    Parâmetros:
+        region_codes: Códigos inteiros da região (-1 = nulo)
+        department_codes: Códigos inteiros do departamento (-1 = nulo)
+        valores: {medida: valores por linha} (ou somas por célula quando há pesos)
+        regioes: Rótulos das regiões na ordem dos códigos
+        departamentos: Rótulos dos departamentos na ordem dos códigos
+        pesos: Contagem de linhas representada por cada entrada (None = 1 por linha)
+
+    Retorna:
+        RegionSummary: Contagens, somas e tabela departamento x região
+    """
+    n_reg, n_dep = len(regioes), len(departamentos)
+    r = np.asarray(region_codes, dtype=np.intp)
+    d = np.asarray(department_codes, dtype=np.intp)
+
+    validos = r >= 0
+    if not validos.all():
+        r, d = r[validos], d[validos]
+        valores = {m: np.asarray(v)[validos] for m, v in valores.items()}
+        pesos = None if pesos is None else np.asarray(pesos)[validos]
+
+    contagem = np.bincount(r, weights=pesos, minlength=n_reg)
+    somas = {m: np.bincount(r, weights=np.asarray(v, dtype=np.float64), minlength=n_reg) for m, v in valores.items()}
+
+    com_dep = d >= 0
+    celula = r[com_dep] * n_dep + d[com_dep]
+    dept_regiao = np.bincount(
+        celula, weights=None if pesos is None else pesos[com_dep], minlength=n_reg * n_dep
+    ).reshape(n_reg, n_dep)
+
+    return RegionSummary(list(regioes), list(departamentos), contagem, somas, dept_regiao)
+
+
+def resumir_dataframe(df: pd.DataFrame, medidas: Sequence[str] = MEDIDAS) -> RegionSummary:
+    """Executa o kernel sobre as linhas brutas de um DataFrame"""
+    region = df['region'].astype('category').cat
+    department = df['department'].astype('category').cat
+    return resumir_regioes(
+        region.codes.to_numpy(), department.codes.to_numpy(),
+        {m: df[m].to_numpy() for m in medidas},
+        list(region.categories), list(department.categories)
+    )
+
+
+def resumir_cubo(cubo: AggregateCube, medidas: Sequence[str] = MEDIDAS) -> RegionSummary:
+    """Executa o kernel sobre as células do cubo de agregados"""
+    cells = cubo.cells
+    region = cells['region'].cat
+    department = cells['department'].cat
+    return resumir_regioes(
+        region.codes.to_numpy(), department.codes.to_numpy(),
+        {m: cells[f'{m}:sum'].to_numpy() for m in medidas},
+        list(region.categories), list(department.categories),
+        pesos=cells['count'].to_numpy(dtype=np.float64)
+    )
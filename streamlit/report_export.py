@@ -0,0 +1,414 @@
+"""
+Exportação em lote dos relatórios executivos para todas as combinações de filtros.
+
+Cada combinação departamento x faixa etária x região (com "Todos" em
+qualquer posição) gera uma pasta com um index.html — relatório de gênero,
+de departamentos (quando o departamento é "Todos") e de regiões (quando a
+região é "Todos"), os mesmos textos dos dashboards — e os gráficos
+estáticos em PNG ou SVG (matplotlib).
+
+As métricas saem do cubo de agregados da versão atual dos dados (base +
+deltas): um roll-up por padrão de filtros fixados serve todas as
+combinações daquele padrão, sem nova varredura da base. A renderização
+(intervalos bootstrap, HTML e gráficos) roda em um pool de processos, e
+cada combinação é gravada assim que fica pronta. O manifesto guarda o hash
+dos agregados de entrada de cada combinação: na exportação seguinte, só
+são refeitas as combinações cujos números mudaram (ou cujos arquivos
+sumiram), e uma execução interrompida continua de onde parou.
+
+Uso:
+    python streamlit/report_export.py ../data/processed/train_atualizado.csv --saida ../relatorios --formato svg
+"""
+
+import argparse
+import hashlib
+import html
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+from data_store import DATA_PATH, PathLike, _gravar_atomico
+# Os textos dos relatórios são os mesmos dos dashboards
+from page_metrics import (gerar_relatorio_regional, generate_department_report, generate_gender_report,
+                          metricas_departamento, metricas_genero)
+from promotion_stats import NIVEL, comparar_grupos
+
+SAIDA = Path(__file__).resolve().parent.parent / 'relatorios'
+TODOS = 'Todos'
+FORMATOS = ('png', 'svg')
+# Filtros combinados e a dimensão de cada quebra do relatório
+FILTROS = ['department', 'age_bucket', 'region']
+QUEBRAS = {'genero': 'gender', 'departamento': 'department', 'regiao': 'region'}
+MEDIDAS = ['is_promoted', 'avg_training_score', 'KPIs_met >80%', 'length_of_service', 'age']
+COLUNAS = ['count'] + [f'{m}:sum' for m in MEDIDAS]
+# Incrementar quando o modelo dos relatórios ou dos gráficos mudar (refaz todas as combinações)
+VERSAO_MODELO = 1
+# Combinações concluídas entre gravações do manifesto
+INTERVALO_MANIFESTO = 25
+
+MODELO_HTML = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<style>
+body {{ font-family: Arial, sans-serif; color: #000000; max-width: 1100px; margin: 2rem auto; }}
+h1 {{ border-bottom: 2px solid #000000; padding-bottom: 10px; }}
+.report-box {{ border: 1px solid #E0E0E0; border-radius: 8px; padding: 25px; margin: 15px 0; white-space: pre-line; }}
+.graficos img {{ max-width: 49%; }}
+</style>
+</head>
+<body>
+<h1>{titulo}</h1>
+<p>{subtitulo}</p>
+{secoes}
+</body>
+</html>
+"""
+
+
+class Agregados(NamedTuple):
+    """Agregados de uma quebra: rótulos do grupo e uma linha de COLUNAS por rótulo"""
+    rotulos: np.ndarray
+    valores: np.ndarray
+
+    def quadro(self) -> pd.DataFrame:
+        return pd.DataFrame(self.valores, index=pd.Index(self.rotulos), columns=COLUNAS)
+
+
+class Tarefa(NamedTuple):
+    """Uma combinação de filtros com os agregados de entrada de cada quebra"""
+    slug: str
+    combinacao: Dict[str, str]
+    agregados: Dict[str, Agregados]
+    hash: str
+
+
+def _slug(combinacao: Dict[str, str]) -> str:
+    """Nome da pasta da combinação (ex.: Finance__25-29__region_2)"""
+    partes = ['todos' if combinacao[f] == TODOS else str(combinacao[f]) for f in FILTROS]
+    return '__'.join(re.sub(r'[^\w.+-]+', '_', parte) for parte in partes)
+
+
+def agregados_por_padrao(cubo: AggregateCube) -> Dict[Tuple[str, Tuple[str, ...]], Dict[tuple, Agregados]]:
+    """
+    Roll-ups do cubo para todos os padrões de filtros fixados.
+
+    Para cada quebra e cada subconjunto de filtros fixados, um único groupby
+    sobre as células do cubo dá os agregados de todas as combinações desse
+    padrão (fatias contíguas do resultado ordenado).
+
+    Retorna:
+        dict: {(quebra, filtros fixados): {valores dos filtros: Agregados}}
+    """
+    tabelas = {}
+    for quebra, dimensao in QUEBRAS.items():
+        livres = [f for f in FILTROS if f != dimensao]
+        for fixas in itertools.chain.from_iterable(itertools.combinations(livres, r) for r in range(len(livres) + 1)):
+            agg = cubo.cells.groupby([*fixas, dimensao], observed=True)[COLUNAS].sum()
+            agg = agg[agg['count'] > 0]
+            indice = agg.index if isinstance(agg.index, pd.MultiIndex) else pd.MultiIndex.from_arrays([agg.index])
+            rotulos = indice.get_level_values(dimensao).astype(str).to_numpy()
+            valores = agg.to_numpy(dtype=np.float64)
+            if not fixas:
+                tabelas[(quebra, fixas)] = {(): Agregados(rotulos, valores)}
+                continue
+            codigos = np.column_stack([indice.codes[i] for i in range(len(fixas))])
+            inicios = np.flatnonzero(np.r_[True, (np.diff(codigos, axis=0) != 0).any(axis=1)])
+            fins = np.r_[inicios[1:], len(codigos)]
+            tabelas[(quebra, fixas)] = {
+                tuple(str(indice.levels[i][codigos[a, i]]) for i in range(len(fixas))):
+                    Agregados(rotulos[a:b], valores[a:b])
+                for a, b in zip(inicios, fins)
+            }
+    return tabelas
+
+
+def _hash(agregados: Dict[str, Agregados], formato: str) -> str:
+    """Hash dos agregados de entrada, do formato e da versão do modelo"""
+    h = hashlib.sha256(f'{VERSAO_MODELO}:{formato}'.encode())
+    for quebra, (rotulos, valores) in sorted(agregados.items()):
+        h.update('\x1f'.join([quebra, *rotulos]).encode())
+        h.update(np.ascontiguousarray(valores).tobytes())
+    return h.hexdigest()[:16]
+
+
+def tarefas(cubo: AggregateCube, formato: str) -> List[Tarefa]:
+    """
+    Enumera as combinações com dados e monta os agregados de cada uma.
+
+    Parâmetros:
+        cubo (AggregateCube): Cubo da versão atual dos dados
+        formato (str): Formato dos gráficos (entra no hash)
+
+    Retorna:
+        list: Uma Tarefa por combinação departamento x faixa etária x região
+    """
+    tabelas = agregados_por_padrao(cubo)
+    lista = []
+    for fixas in itertools.chain.from_iterable(itertools.combinations(FILTROS, r) for r in range(len(FILTROS) + 1)):
+        for chave, genero in tabelas[('genero', fixas)].items():
+            combinacao = {f: TODOS for f in FILTROS}
+            combinacao.update(zip(fixas, chave))
+            agregados = {'genero': genero}
+            for quebra, dimensao in QUEBRAS.items():
+                if quebra != 'genero' and combinacao[dimensao] == TODOS:
+                    fixas_quebra = tuple(f for f in fixas if f != dimensao)
+                    agregados[quebra] = tabelas[(quebra, fixas_quebra)][tuple(combinacao[f] for f in fixas_quebra)]
+            lista.append(Tarefa(_slug(combinacao), combinacao, agregados, _hash(agregados, formato)))
+    return lista
+
+
+def _intervalos(agregados: pd.DataFrame) -> pd.DataFrame:
+    return comparar_grupos(agregados[['count', 'is_promoted:sum']].set_axis(['n', 'promovidos'], axis=1))
+
+
+def _medias(agregados: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({m: agregados[f'{m}:sum'] / agregados['count'] for m in MEDIDAS})
+
+
+def _markdown_para_html(texto: str) -> str:
+    """Converte os relatórios em markdown dos dashboards (negrito e listas) em uma caixa HTML"""
+    linhas = [linha.strip() for linha in html.escape(texto).splitlines()]
+    corpo = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', '\n'.join(linhas).strip())
+    return f"<div class='report-box'>{corpo}</div>"
+
+
+def _salvar_figura(fig, path: Path, formato: str) -> None:
+    import matplotlib.pyplot as plt
+    _gravar_atomico(path, lambda tmp: fig.savefig(tmp, format=formato, bbox_inches='tight', dpi=120))
+    plt.close(fig)
+
+
+def _grafico_distribuicao(contagem: pd.Series, titulo: str):
+    """Gráfico de pizza da distribuição (cores em tons de cinza, como nos dashboards)"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(5, 4))
+    cores = plt.get_cmap('Greys_r')(np.linspace(0.1, 0.7, len(contagem)))
+    ax.pie(contagem.to_numpy(), labels=contagem.index.astype(str), autopct='%1.1f%%', colors=cores,
+           textprops={'color': '#000000'})
+    ax.set_title(titulo)
+    return fig
+
+
+def _grafico_taxas(intervalos: pd.DataFrame, titulo: str, rotulo: str):
+    """Barras da taxa de promoção com o intervalo de confiança como barra de erro"""
+    import matplotlib.pyplot as plt
+    taxa = intervalos['taxa'] * 100
+    erro = np.vstack([taxa - intervalos['taxa_inf'] * 100, intervalos['taxa_sup'] * 100 - taxa])
+    fig, ax = plt.subplots(figsize=(max(5, 0.6 * len(taxa)), 4))
+    ax.bar(taxa.index.astype(str), taxa.to_numpy(), yerr=np.nan_to_num(erro), color='#333333', ecolor='#999999',
+           capsize=3)
+    ax.set_title(titulo)
+    ax.set_xlabel(rotulo)
+    ax.set_ylabel('Taxa de Promoção (%)')
+    ax.tick_params(axis='x', rotation=45 if len(taxa) > 4 else 0)
+    ax.spines[['top', 'right']].set_visible(False)
+    return fig
+
+
+def _grafico_top(serie: pd.Series, titulo: str, rotulo: str, top_n: int = 10):
+    """Barras das Top N regiões de uma métrica"""
+    import matplotlib.pyplot as plt
+    top = serie.sort_values(ascending=False, kind='stable').head(top_n)
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.bar(top.index.astype(str), top.to_numpy(), color='#000000')
+    ax.set_title(titulo)
+    ax.set_ylabel(rotulo)
+    ax.tick_params(axis='x', rotation=45)
+    ax.spines[['top', 'right']].set_visible(False)
+    return fig
+
+
+def exportar_combinacao(tarefa: Tarefa, saida: Path, formato: str) -> List[str]:
+    """
+    Gera o relatório e os gráficos de uma combinação (executado nos processos do pool).
+
+    Retorna:
+        list: Arquivos gravados, relativos à pasta de saída
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    pasta = saida / tarefa.slug
+    pasta.mkdir(parents=True, exist_ok=True)
+    secoes, arquivos = [], []
+
+    def secao(titulo: str, relatorio: str, figuras: Dict[str, Any]) -> None:
+        imagens = []
+        for nome, fig in figuras.items():
+            arquivo = f'{nome}.{formato}'
+            _salvar_figura(fig, pasta / arquivo, formato)
+            arquivos.append(f'{tarefa.slug}/{arquivo}')
+            imagens.append(f"<img src='{arquivo}' alt='{html.escape(nome)}'>")
+        secoes.append(f"<h2>{titulo}</h2>\n{relatorio}\n<div class='graficos'>{''.join(imagens)}</div>")
+
+    genero = tarefa.agregados['genero'].quadro()
+    medias = _medias(genero)
+    intervalos = _intervalos(genero)
+    resultados = metricas_genero(genero['count'].sort_values(ascending=False), medias, intervalos)
+    secao('👥 Diversidade de Gênero', _markdown_para_html(generate_gender_report(resultados)), {
+        'genero_distribuicao': _grafico_distribuicao(genero['count'], 'Distribuição de Gênero'),
+        'genero_promocao': _grafico_taxas(intervalos, f'Taxa de Promoção por Gênero (IC {NIVEL:.0%})', 'Gênero')
+    })
+
+    if 'departamento' in tarefa.agregados:
+        departamento = tarefa.agregados['departamento'].quadro()
+        medias = _medias(departamento)
+        intervalos = _intervalos(departamento)
+        resultados = metricas_departamento(departamento['count'], medias, intervalos)
+        secao('🏢 Departamentos', _markdown_para_html(generate_department_report(resultados)), {
+            'departamento_promocao': _grafico_taxas(
+                intervalos, f'Taxa de Promoção por Departamento (IC {NIVEL:.0%})', 'Departamento')
+        })
+
+    if 'regiao' in tarefa.agregados:
+        regiao = tarefa.agregados['regiao'].quadro()
+        secao('📊 Regiões', gerar_relatorio_regional(regiao['count'], int(regiao['count'].sum())), {
+            'regiao_contagem': _grafico_top(regiao['count'], 'Top Regiões por Número de Funcionários',
+                                            'Número de Funcionários'),
+            'regiao_promocao': _grafico_top(_medias(regiao)['is_promoted'] * 100,
+                                            'Top Regiões por Taxa de Promoção (%)', 'Taxa de Promoção (%)')
+        })
+
+    rotulos = {'department': 'Departamento', 'age_bucket': 'Faixa etária', 'region': 'Região'}
+    documento = MODELO_HTML.format(
+        titulo='Relatório Executivo de RH',
+        subtitulo=' · '.join(f'{rotulos[f]}: <b>{html.escape(str(tarefa.combinacao[f]))}</b>' for f in FILTROS),
+        secoes='\n'.join(secoes)
+    )
+    _gravar_atomico(pasta / 'index.html', lambda tmp: tmp.write_text(documento, encoding='utf-8'))
+    arquivos.append(f'{tarefa.slug}/index.html')
+    return arquivos
+
+
+def _gravar_manifesto(path: Path, manifesto: Dict[str, Any]) -> None:
+    _gravar_atomico(path, lambda tmp: tmp.write_text(json.dumps(manifesto, indent=1), encoding='utf-8'))
+
+
+def _gravar_indice(saida: Path, lista: List[Tarefa]) -> None:
+    """Página inicial do pacote com um link por combinação"""
+    linhas = [
+        f"<tr><td>{html.escape(str(t.combinacao['department']))}</td>"
+        f"<td>{html.escape(str(t.combinacao['age_bucket']))}</td>"
+        f"<td><a href='{t.slug}/index.html'>{html.escape(str(t.combinacao['region']))}</a></td></tr>"
+        for t in sorted(lista, key=lambda t: tuple(str(t.combinacao[f]) != TODOS for f in FILTROS) + (t.slug,))
+    ]
+    documento = MODELO_HTML.format(
+        titulo='Relatórios Executivos de RH',
+        subtitulo=f'{len(lista)} combinações de departamento, faixa etária e região',
+        secoes='<table><tr><th>Departamento</th><th>Faixa etária</th><th>Região</th></tr>\n'
+               + '\n'.join(linhas) + '\n</table>'
+    )
+    _gravar_atomico(saida / 'index.html', lambda tmp: tmp.write_text(documento, encoding='utf-8'))
+
+
+def exportar(cubo: AggregateCube, saida: PathLike = SAIDA, formato: str = 'png', processos: Optional[int] = None,
+             forcar: bool = False, versao: Optional[str] = None) -> Dict[str, int]:
+    """
+    Exporta os relatórios de todas as combinações, refazendo só as que mudaram.
+
+    Parâmetros:
+        cubo (AggregateCube): Cubo da versão atual dos dados
+        saida: Pasta do pacote de relatórios
+        formato (str): 'png' ou 'svg'
+        processos (int): Processos do pool (None = núcleos disponíveis)
+        forcar (bool): Ignora o manifesto e refaz todas as combinações
+        versao (str): Versão dos dados (registrada no manifesto)
+
+    Retorna:
+        dict: Combinações 'geradas', 'inalteradas', 'removidas' e 'falhas'
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'formato deve ser um de {FORMATOS}')
+    saida = Path(saida)
+    saida.mkdir(parents=True, exist_ok=True)
+    manifesto_path = saida / 'manifesto.json'
+    manifesto = json.loads(manifesto_path.read_text(encoding='utf-8')) if manifesto_path.exists() else {}
+    anteriores = manifesto.get('combinacoes', {})
+
+    lista = tarefas(cubo, formato)
+    atuais = {t.slug for t in lista}
+    removidas = [slug for slug in anteriores if slug not in atuais]
+    for slug in removidas:
+        shutil.rmtree(saida / slug, ignore_errors=True)
+        del anteriores[slug]
+
+    def atualizada(tarefa: Tarefa) -> bool:
+        registro = anteriores.get(tarefa.slug)
+        return (not forcar and registro is not None and registro['hash'] == tarefa.hash
+                and all((saida / arquivo).exists() for arquivo in registro['arquivos']))
+
+    pendentes = [t for t in lista if not atualizada(t)]
+    manifesto = {'versao': versao, 'formato': formato, 'combinacoes': anteriores}
+    contagem = {'geradas': 0, 'inalteradas': len(lista) - len(pendentes), 'removidas': len(removidas), 'falhas': 0}
+
+    def concluir(tarefa: Tarefa, executar) -> None:
+        try:
+            arquivos = executar()
+        except Exception as e:
+            # Combinação com erro: fica fora do manifesto e é tentada de novo na próxima exportação
+            contagem['falhas'] += 1
+            print(f'⚠️ {tarefa.slug}: {e}')
+            return
+        anteriores[tarefa.slug] = {'hash': tarefa.hash, 'arquivos': arquivos,
+                                   'gerado_em': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        contagem['geradas'] += 1
+        if contagem['geradas'] % INTERVALO_MANIFESTO == 0:
+            _gravar_manifesto(manifesto_path, manifesto)
+
+    processos = min(processos or os.cpu_count() or 1, max(len(pendentes), 1))
+    try:
+        if processos <= 1:
+            for tarefa in pendentes:
+                concluir(tarefa, lambda: exportar_combinacao(tarefa, saida, formato))
+        else:
+            # 'spawn' evita herdar por fork as threads do servidor Streamlit
+            contexto = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as pool:
+                futuros = {pool.submit(exportar_combinacao, t, saida, formato): t for t in pendentes}
+                for futuro in as_completed(futuros):
+                    concluir(futuros[futuro], futuro.result)
+    finally:
+        _gravar_manifesto(manifesto_path, manifesto)
+    _gravar_indice(saida, lista)
+    return contagem
+
+
+def main() -> None:
+    from delta_ingest import DeltaIngestor
+    from partitioned_store import processos_configurados
+
+    parser = argparse.ArgumentParser(description='Exporta os relatórios executivos de todas as combinações de filtros')
+    parser.add_argument('source', nargs='?', default=str(DATA_PATH), help='CSV processado')
+    parser.add_argument('--saida', type=Path, default=SAIDA, help='Pasta do pacote de relatórios')
+    parser.add_argument('--formato', choices=FORMATOS, default='png', help='Formato dos gráficos')
+    parser.add_argument('--processos', type=int, default=None, help='Processos do pool (padrão: núcleos)')
+    parser.add_argument('--forcar', action='store_true', help='Refaz todas as combinações')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    # Base + deltas já aplicados: os mesmos números exibidos pelo app
+    ingestor = DeltaIngestor(args.source, processos=processos_configurados())
+    ingestor.verificar()
+    contagem = exportar(ingestor.estado.cubo, args.saida, args.formato, args.processos, args.forcar,
+                        ingestor.versao)
+    print(f"{contagem['geradas']} geradas · {contagem['inalteradas']} inalteradas · "
+          f"{contagem['removidas']} removidas · {contagem['falhas']} falhas "
+          f"({time.perf_counter() - inicio:.1f}s) → {args.saida / 'index.html'}")
+
+
+if __name__ == '__main__':
+    main()
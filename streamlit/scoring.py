@@ -0,0 +1,232 @@
+"""
+Score preditivo de promoção (equivalente vetorizado de score_preditivo.sql).
+
+O score combina, com pesos configuráveis, o score de treinamento normalizado
+(min-max), o z-score da avaliação do ano anterior, o tempo de serviço e um
+bônus por canal de recrutamento, numa única expressão NumPy sobre as
+colunas. Como na consulta, as estatísticas usam todos os funcionários e o
+ranking (NTILE(100)) só os que atingiram os KPIs; scores nulos (avaliação
+ausente) ficam nos percentis mais altos, como no ORDER BY do SQL.
+
+As estatísticas são correntes (mínimo/máximo e média/variância pelo método
+de Welford, com a fusão de Chan entre lotes): novos lotes de funcionários
+são incorporados sem recalcular tudo desde o início. Nem as colunas nem as
+estatísticas dependem dos pesos, que entram só no cálculo do score: um único
+motor por versão dos dados serve qualquer conjunto de pesos.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class PesosScore:
+    """Pesos e parâmetros da fórmula (padrão = score_preditivo.sql)"""
+    treinamento: float = 0.4
+    avaliacao: float = 0.3
+    tempo_servico: float = 0.2
+    canal: float = 0.1
+    # A consulta compara com 'referral' (a base usa 'referred'); mantido por fidelidade
+    canal_preferencial: str = 'referral'
+    bonus_canal: float = 1.2
+    escala_tempo_servico: float = 10.0
+    kpi_minimo: float = 75.0
+
+
+class EstatisticasCorrentes:
+    """Contagem, média, variância amostral, mínimo e máximo de uma coluna, por lotes"""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def atualizar(self, valores: np.ndarray) -> None:
+        """Incorpora um lote (nulos ignorados, como em AVG/STDDEV/MIN/MAX)"""
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        n_lote = len(valores)
+        media_lote = valores.mean()
+        m2_lote = ((valores - media_lote) ** 2).sum()
+
+        # Fusão de Chan et al.: combina (n, média, M2) dos dois conjuntos
+        total = self.n + n_lote
+        delta = media_lote - self.media
+        self.media += delta * n_lote / total
+        self.m2 += m2_lote + delta ** 2 * self.n * n_lote / total
+        self.n = total
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+
+    @property
+    def desvio(self) -> float:
+        """Desvio padrão amostral (STDDEV)"""
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else np.nan
+
+
+def ntile(posicoes: np.ndarray, n: int, k: int = 100) -> np.ndarray:
+    """
+    Grupo de NTILE(k) para cada posição (0 = menor) numa ordenação de n linhas.
+
+    Os primeiros n % k grupos recebem uma linha a mais, como no SQL.
+    """
+    posicoes = np.asarray(posicoes, dtype=np.int64)
+    base, resto = divmod(n, k)
+    if base == 0:
+        return posicoes + 1
+    corte = resto * (base + 1)
+    return np.where(posicoes < corte, posicoes // (base + 1), resto + (posicoes - corte) // base) + 1
+
+
+def posicoes_exatas(scores: np.ndarray) -> np.ndarray:
+    """Posição de cada score na ordenação crescente (nulos por último), O(n log n)"""
+    ordem = np.argsort(scores, kind='stable')
+    posicoes = np.empty(len(scores), dtype=np.int64)
+    posicoes[ordem] = np.arange(len(scores))
+    return posicoes
+
+
+def posicoes_aproximadas(scores: np.ndarray, bins: int = 4096) -> np.ndarray:
+    """
+    Posição aproximada por histograma, O(n).
+
+    Cada score recebe o número de scores em faixas inferiores à sua; o erro
+    máximo é a ocupação de uma faixa.
+    """
+    validos = ~np.isnan(scores)
+    posicoes = np.empty(len(scores), dtype=np.int64)
+    n_validos = int(validos.sum())
+    if n_validos:
+        valores = scores[validos]
+        minimo, maximo = valores.min(), valores.max()
+        largura = (maximo - minimo) / bins or 1.0
+        faixas = np.minimum(((valores - minimo) / largura).astype(np.int64), bins - 1)
+        anteriores = np.concatenate([[0], np.cumsum(np.bincount(faixas, minlength=bins))[:-1]])
+        posicoes[validos] = anteriores[faixas]
+    posicoes[~validos] = n_validos + np.arange(len(scores) - n_validos)
+    return posicoes
+
+
+class ScoringEngine:
+    """Score de promoção em lote, com estatísticas correntes e ranking percentil"""
+
+    def __init__(self, pesos: PesosScore = PesosScore()):
+        # Pesos usados quando nenhum é passado a pontuar/ranking/percentil
+        self.pesos = pesos
+        self.treinamento = EstatisticasCorrentes()
+        self.avaliacao = EstatisticasCorrentes()
+        self.canais: Dict[str, int] = {}
+        self._lotes: List[Dict[str, np.ndarray]] = []
+        self._colunas: Optional[Dict[str, np.ndarray]] = None
+
+    def _codigos_canal(self, canal: pd.Series) -> np.ndarray:
+        """Códigos do canal de recrutamento, estáveis entre lotes (-1 = nulo)"""
+        cat = canal.astype('category').cat
+        for valor in cat.categories:
+            self.canais.setdefault(str(valor), len(self.canais))
+        mapa = np.array([self.canais[str(valor)] for valor in cat.categories] + [-1], dtype=np.int16)
+        return mapa[cat.codes.to_numpy()]
+
+    def _extrair(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Colunas necessárias ao score, como arrays NumPy"""
+        return {
+            'employee_id': df['employee_id'].to_numpy(),
+            'avg_training_score': df['avg_training_score'].to_numpy(dtype=np.float64),
+            'previous_year_rating': df['previous_year_rating'].to_numpy(dtype=np.float64),
+            'length_of_service': df['length_of_service'].to_numpy(dtype=np.float64),
+            'canal': self._codigos_canal(df['recruitment_channel']),
+            # KPIs na escala da consulta (KPIs_met = 0 ou 100)
+            'kpis': df['KPIs_met >80%'].to_numpy(dtype=np.float64) * 100
+        }
+
+    def adicionar(self, df: pd.DataFrame) -> 'ScoringEngine':
+        """Incorpora um lote de funcionários às estatísticas e à população ranqueada"""
+        colunas = self._extrair(df)
+        self.treinamento.atualizar(colunas['avg_training_score'])
+        self.avaliacao.atualizar(colunas['previous_year_rating'])
+        self._lotes.append(colunas)
+        self._colunas = None
+        return self
+
+    @property
+    def colunas(self) -> Dict[str, np.ndarray]:
+        """Colunas de toda a população (lotes concatenados sob demanda)"""
+        if self._colunas is None:
+            if not self._lotes:
+                raise ValueError('Nenhum lote adicionado ao motor de score')
+            self._colunas = {chave: np.concatenate([lote[chave] for lote in self._lotes])
+                             for chave in self._lotes[0]}
+            self._lotes = [self._colunas]
+        return self._colunas
+
+    def _score(self, colunas: Dict[str, np.ndarray], pesos: PesosScore) -> np.ndarray:
+        """Fórmula do score sobre arrays, com as estatísticas correntes"""
+        p = pesos
+        t, a = self.treinamento, self.avaliacao
+        preferencial = colunas['canal'] == self.canais.get(p.canal_preferencial, -2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (p.treinamento * (colunas['avg_training_score'] - t.minimo) / (t.maximo - t.minimo)
+                    + p.avaliacao * (colunas['previous_year_rating'] - a.media) / a.desvio
+                    + p.tempo_servico * colunas['length_of_service'] / p.escala_tempo_servico
+                    + p.canal * np.where(preferencial, p.bonus_canal, 1.0))
+
+    def pontuar(self, df: Optional[pd.DataFrame] = None, pesos: Optional[PesosScore] = None) -> np.ndarray:
+        """Score de cada linha de df (ou de toda a população) com as estatísticas atuais"""
+        return self._score(self.colunas if df is None else self._extrair(df), pesos or self.pesos)
+
+    def ranking(self, metodo: str = 'exato', bins: int = 4096, pesos: Optional[PesosScore] = None) -> pd.DataFrame:
+        """
+        Score e percentil (NTILE(100)) dos funcionários elegíveis.
+
+        Parâmetros:
+            metodo (str): 'exato' (ordenação, O(n log n)) ou 'aproximado' (histograma, O(n))
+            bins (int): Número de faixas do método aproximado
+            pesos (PesosScore): Pesos da fórmula (None = os do motor)
+
+        Retorna:
+            pd.DataFrame: employee_id, promotion_probability e percentile_rank,
+                          do maior para o menor score
+        """
+        pesos = pesos or self.pesos
+        colunas = self.colunas
+        elegiveis = colunas['kpis'] > pesos.kpi_minimo
+        scores = self._score(colunas, pesos)[elegiveis]
+        if metodo == 'exato':
+            posicoes = posicoes_exatas(scores)
+        elif metodo == 'aproximado':
+            posicoes = posicoes_aproximadas(scores, bins)
+        else:
+            raise ValueError(f"Método de percentil desconhecido: {metodo}")
+
+        resultado = pd.DataFrame({
+            'employee_id': colunas['employee_id'][elegiveis],
+            'promotion_probability': scores,
+            'percentile_rank': ntile(posicoes, len(scores))
+        })
+        # Exibição do maior para o menor score, com os nulos ao final
+        chave = np.where(np.isnan(scores), -1, posicoes)
+        return resultado.iloc[np.argsort(-chave, kind='stable')].reset_index(drop=True)
+
+    def percentil(self, df: pd.DataFrame, pesos: Optional[PesosScore] = None) -> pd.DataFrame:
+        """
+        Posiciona novos funcionários na distribuição atual sem incorporá-los.
+
+        Útil para pontuar contratações recentes contra a população já ranqueada.
+        """
+        pesos = pesos or self.pesos
+        colunas = self.colunas
+        referencia = np.sort(self._score(colunas, pesos)[colunas['kpis'] > pesos.kpi_minimo])
+        scores = self.pontuar(df, pesos)
+        posicoes = np.searchsorted(referencia, scores, side='left')
+        return pd.DataFrame({
+            'employee_id': df['employee_id'].to_numpy(),
+            'promotion_probability': scores,
+            'percentile_rank': ntile(np.minimum(posicoes, len(referencia) - 1), len(referencia))
+        })
@@ -0,0 +1,89 @@
+"""
+Dados compartilhados entre as páginas do app Streamlit.
+
+A base é aberta uma única vez como tabela Arrow apoiada no memory-map, e as
+páginas recebem visões pandas das colunas de que precisam sem copiar os dados
+numéricos (to_pandas com split_blocks, sem consolidar as colunas em blocos
+novos). O cubo de agregados também é um recurso único, usado pelos painéis
+departamental e regional. Tabela e cubo vêm do estado do ingestor da versão
+pedida, e os caches por versão guardam apenas a atual e a anterior (a
+anterior ainda serve às sessões que não reexecutaram). Novas páginas
+reaproveitam esses recursos, sem novas cópias da base.
+"""
+
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from aggregate_cube import AggregateCube
+from delta_ingest import INTERVALO, DeltaIngestor, Estado
+from partitioned_store import processos_configurados
+from profiling import perfilado
+
+DATA_PATH = '../data/processed/train_atualizado.csv'
+
+
+@st.cache_resource(show_spinner="Carregando dados...")
+def get_ingestor(file_path: str) -> DeltaIngestor:
+    """Ingestor de deltas da base, com a thread de observação (um por processo)"""
+    return DeltaIngestor(file_path, processos=processos_configurados()).iniciar()
+
+
+def data_version(file_path: str) -> str:
+    """Versão atual dos dados, incluindo os deltas já aplicados"""
+    return get_ingestor(file_path).versao
+
+
+@st.fragment(run_every=INTERVALO)
+def acompanhar_versao(file_path: str, versao: str) -> None:
+    """Reexecuta a página quando o ingestor publica uma versão diferente da exibida"""
+    try:
+        atual = data_version(file_path)
+    except Exception:
+        # Base indisponível no momento: a página segue com a versão exibida
+        return
+    if atual != versao:
+        st.rerun()
+
+
+def get_estado(file_path: str, versao: str) -> Estado:
+    """Tabela e cubo da versão pedida, lidos juntos do mesmo estado do ingestor"""
+    try:
+        return get_ingestor(file_path).estado_de(versao)
+    except KeyError:
+        # Versão já substituída por vários deltas: reexecuta a página com a atual
+        st.rerun()
+
+
+@st.cache_resource(max_entries=2, show_spinner="Carregando dados...")
+@perfilado('shared_data.get_dataset')
+def get_dataset(file_path: str, versao: str) -> pa.Table:
+    """
+    Tabela Arrow imutável de uma versão dos dados (uma por processo).
+
+    Sem deltas, cada coluna tem um único bloco no memory-map; depois de deltas,
+    os blocos não alterados continuam no memory-map e são compartilhados entre
+    as versões, sem cópia da tabela inteira.
+    """
+    return get_estado(file_path, versao).tabela
+
+
+def dataset_columns(columns: Iterable[str], file_path: str, versao: str) -> pd.DataFrame:
+    """
+    Visão pandas das colunas pedidas da tabela compartilhada.
+
+    Sem deltas, as colunas numéricas sem nulos são visões somente leitura da
+    tabela compartilhada (np.shares_memory com os buffers Arrow); com deltas,
+    só as colunas pedidas são combinadas em um bloco. Os códigos das
+    categóricas são copiados (1 byte por linha).
+    """
+    return get_dataset(file_path, versao).select(list(columns)).to_pandas(split_blocks=True, self_destruct=False)
+
+
+@st.cache_resource(max_entries=2, show_spinner="Carregando dados...")
+@perfilado('shared_data.get_cube')
+def get_cube(file_path: str, versao: str) -> AggregateCube:
+    """Cubo de agregados de uma versão dos dados, atualizado pelos deltas (um por processo)"""
+    return get_estado(file_path, versao).cubo
@@ -0,0 +1,307 @@
+"""
+Modo agregado para filtros interativos sobre bases muito grandes.
+
+Em vez de varrer as linhas a cada movimento de um filtro, as consultas são
+respondidas a partir de estruturas de tamanho fixo, construídas uma vez por
+versão dos dados e combináveis entre partições (merge):
+
+- Agregado por chave (departamento, gênero, idade): contagem e soma de cada
+  medida. São poucas centenas de chaves, então o agregado é exato e cabe em
+  alguns KB: contagens por gênero, tabela departamento x gênero, histograma
+  de idade e médias filtradas saem dele sem erro.
+- TDigest: distribuição do avg_training_score por chave, para quantis sob
+  qualquer combinação de filtros (a única parte aproximada).
+
+O custo de uma consulta depende só do número de chaves, não do número de
+linhas da base.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from data_store import DATA_PATH, PathLike
+from filter_engine import MEDIDAS
+
+# Parâmetro de compressão do t-digest (~ número máximo de centroides por chave)
+COMPRESSAO = 100
+SCORE = 'avg_training_score'
+# Bits reservados para a idade na chave (estrato << BITS_IDADE | idade)
+BITS_IDADE = 8
+
+
+def _comprimir(chaves: np.ndarray, medias: np.ndarray, pesos: np.ndarray,
+               compressao: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Funde centroides vizinhos de cada chave pela escala k1 do t-digest.
+
+    Os centroides são ordenados por (chave, média); cada um cai no índice
+    inteiro de k(q) = compressao/(2π)·asin(2q - 1), com q o quantil do seu
+    ponto médio dentro da chave. Centroides com o mesmo índice são fundidos:
+    poucos nas caudas (onde k varia rápido) e muitos no centro.
+    """
+    if len(chaves) == 0:
+        return chaves, medias, pesos
+    ordem = np.lexsort((medias, chaves))
+    chaves, medias, pesos = chaves[ordem], medias[ordem], pesos[ordem]
+
+    inicio = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]])
+    grupo = np.repeat(np.arange(len(inicio)), np.diff(np.r_[inicio, len(chaves)]))
+    acumulado = np.cumsum(pesos)
+    antes = (acumulado - pesos)[inicio][grupo]
+    total_chave = np.add.reduceat(pesos, inicio)[grupo]
+    q = (acumulado - antes - pesos / 2) / total_chave
+    indice = np.floor(compressao / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)) + compressao / 4)
+
+    centroide = grupo * (compressao // 2 + 2) + indice.astype(np.int64)
+    novos, inverso = np.unique(centroide, return_inverse=True)
+    peso = np.bincount(inverso, weights=pesos)
+    media = np.bincount(inverso, weights=medias * pesos) / peso
+    chave = np.zeros(len(novos), dtype=chaves.dtype)
+    chave[inverso] = chaves
+    return chave, media, peso
+
+
+class TDigest:
+    """Conjunto de t-digests, um por chave inteira, em arrays planos de centroides"""
+
+    def __init__(self, chaves: np.ndarray, medias: np.ndarray, pesos: np.ndarray, compressao: int = COMPRESSAO):
+        self.chaves = chaves
+        self.medias = medias
+        self.pesos = pesos
+        self.compressao = compressao
+
+    @classmethod
+    def build(cls, chaves: np.ndarray, valores: np.ndarray, compressao: int = COMPRESSAO) -> 'TDigest':
+        """Digests dos valores agrupados por chave (valores não finitos são ignorados)"""
+        valores = np.asarray(valores, dtype=np.float64)
+        validos = np.isfinite(valores)
+        # Pares (chave, valor) repetidos viram um centroide com peso: agrupamento por hash, sem ordenar as linhas
+        pares = pd.DataFrame({'chave': np.asarray(chaves, dtype=np.int64)[validos], 'valor': valores[validos]})
+        pesos = pares.groupby(['chave', 'valor'], sort=False).size()
+        return cls(*_comprimir(pesos.index.get_level_values('chave').to_numpy(),
+                               pesos.index.get_level_values('valor').to_numpy(),
+                               pesos.to_numpy(dtype=np.float64), compressao), compressao)
+
+    @classmethod
+    def merge(cls, digests: Sequence['TDigest']) -> 'TDigest':
+        """Combina digests (ex.: de partições diferentes) recomprimindo os centroides de cada chave"""
+        compressao = digests[0].compressao
+        return cls(*_comprimir(np.concatenate([d.chaves for d in digests]),
+                               np.concatenate([d.medias for d in digests]),
+                               np.concatenate([d.pesos for d in digests]), compressao), compressao)
+
+    def quantis(self, qs: Sequence[float], chaves: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Quantis da distribuição combinada das chaves pedidas (todas por padrão).
+
+        Parâmetros:
+            qs: Quantis desejados (0-1)
+            chaves: Chaves a combinar
+
+        Retorna:
+            np.ndarray: Um valor por quantil (NaN se as chaves não têm valores)
+        """
+        selecionados = slice(None) if chaves is None else np.isin(self.chaves, chaves)
+        _, medias, pesos = _comprimir(np.zeros(len(self.medias[selecionados]), dtype=np.int64),
+                                      self.medias[selecionados], self.pesos[selecionados], self.compressao)
+        if len(pesos) == 0:
+            return np.full(len(qs), np.nan)
+        posicoes = np.cumsum(pesos) - pesos / 2
+        return np.interp(np.asarray(qs) * pesos.sum(), posicoes, medias)
+
+
+class ResumoAproximado:
+    """Agregado exato por chave e t-digests para responder aos filtros do dashboard de gênero"""
+
+    def __init__(self, categorias: Dict[str, List[Any]], agregados: np.ndarray, scores: TDigest,
+                 idade_min: int, idade_max: int, grupo: str = 'gender', categorica: str = 'department',
+                 idade: str = 'age', medidas: Sequence[str] = MEDIDAS):
+        self.categorias = categorias
+        # estrato x idade x (contagem, soma de cada medida)
+        self.agregados = agregados
+        self.scores = scores
+        self.idade_min = idade_min
+        self.idade_max = idade_max
+        self.grupo = grupo
+        self.categorica = categorica
+        self.idade = idade
+        self.medidas = list(medidas)
+
+    @property
+    def n(self) -> int:
+        """Linhas resumidas"""
+        return int(self.agregados[:, :, 0].sum())
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, grupo: str = 'gender', categorica: str = 'department', idade: str = 'age',
+              medidas: Sequence[str] = MEDIDAS,
+              categorias: Optional[Dict[str, List[Any]]] = None) -> 'ResumoAproximado':
+        """
+        Resume uma base (ou uma partição) em uma passada.
+
+        Parâmetros:
+            df (pd.DataFrame): Base com as colunas de grupo, categórica, idade e medidas
+            grupo (str): Coluna dos grupos comparados (linhas com grupo nulo são ignoradas)
+            categorica (str): Coluna categórica filtrável
+            idade (str): Coluna inteira de idade (faixa filtrável)
+            medidas (list): Medidas numéricas somadas por chave
+            categorias (dict): Categorias de grupo e categórica (padrão: as do df)
+
+        Retorna:
+            ResumoAproximado: Estruturas combináveis com merge
+        """
+        if categorias is None:
+            categorias = {col: list(df[col].astype('category').cat.categories) for col in (grupo, categorica)}
+        g = pd.Categorical(df[grupo], categories=categorias[grupo]).codes.astype(np.int64)
+        d = pd.Categorical(df[categorica], categories=categorias[categorica]).codes.astype(np.int64)
+        validos = g >= 0
+        n_grupos = len(categorias[grupo])
+        # Estrato (departamento, gênero); o código 0 de departamento é o nulo
+        estrato = ((d + 1) * n_grupos + g)[validos]
+        idades = df[idade].to_numpy()[validos].astype(np.int64)
+        if len(idades) and (idades.min() < 0 or idades.max() >= 1 << BITS_IDADE):
+            raise ValueError(f'{idade} fora do intervalo [0, {1 << BITS_IDADE})')
+        chaves = estrato << BITS_IDADE | idades
+
+        n_chaves = (len(categorias[categorica]) + 1) * n_grupos << BITS_IDADE
+        agregados = np.column_stack(
+            [np.bincount(chaves, minlength=n_chaves)]
+            + [np.bincount(chaves, weights=df[m].to_numpy(dtype=np.float64)[validos], minlength=n_chaves)
+               for m in medidas]
+        ).astype(np.float64).reshape(-1, 1 << BITS_IDADE, len(medidas) + 1)
+
+        return cls(
+            categorias=categorias,
+            agregados=agregados,
+            scores=TDigest.build(chaves, df[SCORE].to_numpy()[validos]),
+            idade_min=int(idades.min()) if len(idades) else 0,
+            idade_max=int(idades.max()) if len(idades) else 0,
+            grupo=grupo, categorica=categorica, idade=idade, medidas=medidas
+        )
+
+    @classmethod
+    def merge(cls, resumos: Sequence['ResumoAproximado']) -> 'ResumoAproximado':
+        """Combina resumos de partições com as mesmas categorias (os agregados são somados)"""
+        base = resumos[0]
+        if any(r.categorias != base.categorias for r in resumos):
+            raise ValueError('resumos com categorias diferentes')
+        presentes = [r for r in resumos if r.n] or [base]
+        return cls(
+            categorias=base.categorias,
+            agregados=np.sum([r.agregados for r in resumos], axis=0),
+            scores=TDigest.merge([r.scores for r in resumos]),
+            idade_min=min(r.idade_min for r in presentes),
+            idade_max=max(r.idade_max for r in presentes),
+            grupo=base.grupo, categorica=base.categorica, idade=base.idade, medidas=base.medidas
+        )
+
+    def _estratos(self, filtros: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Códigos de departamento (0 = nulo) selecionados pelos filtros"""
+        valor = (filtros or {}).get(self.categorica)
+        if valor is None:
+            return np.arange(len(self.categorias[self.categorica]) + 1)
+        if valor not in self.categorias[self.categorica]:
+            return np.array([], dtype=np.int64)
+        return np.array([self.categorias[self.categorica].index(valor) + 1])
+
+    def avaliar(self, faixa_idade: Optional[Tuple[int, int]] = None,
+                filtros: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Métricas por grupo, no formato de FilterEngine.avaliar.
+
+        Parâmetros:
+            faixa_idade: Faixa etária inclusiva (lo, hi)
+            filtros: {coluna categórica: valor}
+
+        Retorna:
+            dict: As chaves de FilterEngine.avaliar, com os mesmos valores (saem do
+            agregado exato), mais 'quantis_score' (quartis do t-digest por grupo)
+        """
+        lo, hi = faixa_idade if faixa_idade is not None else (self.idade_min, self.idade_max)
+        lo, hi = max(int(lo), self.idade_min), min(int(hi), self.idade_max)
+        idades = np.arange(lo, hi + 1)
+        departamentos = self._estratos(filtros)
+        grupos = pd.Index(self.categorias[self.grupo], name=self.grupo)
+        n_grupos = len(grupos)
+
+        # departamento x gênero x idade x (contagem, somas)
+        estratos = (departamentos[:, None] * n_grupos + np.arange(n_grupos)).ravel()
+        selecao = self.agregados[estratos, lo:hi + 1].reshape(len(departamentos), n_grupos, len(idades),
+                                                               len(self.medidas) + 1)
+        contagens = selecao[..., 0].astype(np.int64)
+        contagem = contagens.sum(axis=(0, 2))
+        somas = selecao[..., 1:].sum(axis=(0, 2))
+        presentes = contagem > 0
+
+        idade_por_grupo = np.zeros((self.idade_max - self.idade_min + 1, n_grupos), dtype=np.int64)
+        idade_por_grupo[lo - self.idade_min:hi - self.idade_min + 1] = contagens.sum(axis=0).T
+        rotulos = self.categorias[self.categorica]
+        tabela = np.zeros((len(rotulos) + 1, n_grupos), dtype=np.int64)
+        tabela[departamentos] = contagens.sum(axis=2)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            medias = pd.DataFrame(somas / contagem[:, None], index=grupos, columns=self.medidas)[presentes]
+
+        quantis = [self.scores.quantis([0.25, 0.5, 0.75], (estratos[estratos % n_grupos == i][:, None]
+                                                           << BITS_IDADE | idades).ravel())
+                   for i in range(n_grupos)]
+        return {
+            'contagem': pd.Series(contagem, index=grupos, name='count')[presentes].sort_values(ascending=False),
+            'medias': medias,
+            'idade_por_grupo': pd.DataFrame(
+                idade_por_grupo, index=pd.RangeIndex(self.idade_min, self.idade_max + 1, name=self.idade),
+                columns=grupos
+            ).loc[:, presentes],
+            'categoria_por_grupo': {
+                self.categorica: pd.DataFrame(tabela[1:], index=pd.Index(rotulos, name=self.categorica),
+                                              columns=grupos).loc[:, presentes]
+            },
+            'total': int(contagem.sum()),
+            'quantis_score': pd.DataFrame(quantis, index=grupos, columns=['q1', 'mediana', 'q3'])[presentes]
+        }
+
+
+def _resumo_faixa(arrow_path: Path, inicio: int, fim: int, categorias: Dict[str, List[Any]]) -> ResumoAproximado:
+    """Resumo de uma faixa de linhas (executado nos processos do pool)"""
+    from partitioned_store import ler_faixa
+
+    colunas = list(dict.fromkeys(['gender', 'department', 'age', SCORE, *MEDIDAS]))
+    return ResumoAproximado.build(ler_faixa(arrow_path, colunas, inicio, fim), categorias=categorias)
+
+
+def construir_resumo_paralelo(source: PathLike = DATA_PATH, processos: Optional[int] = None) -> ResumoAproximado:
+    """
+    Constrói o resumo por faixas de linhas em um pool de processos e combina os resultados.
+
+    Parâmetros:
+        source: Caminho do CSV processado
+        processos: Número de processos (None = núcleos disponíveis)
+
+    Retorna:
+        ResumoAproximado: Resumo da base inteira
+    """
+    from data_store import ensure_store, load_columns
+    from partitioned_store import faixas
+
+    arrow_path = ensure_store(source)
+    # As mesmas categorias em todas as faixas: os códigos das chaves precisam coincidir no merge
+    categorias = {col: list(serie.cat.categories)
+                  for col, serie in load_columns(['gender', 'department'], source).items()}
+    partes = faixas(feather.read_table(arrow_path, columns=['employee_id'], memory_map=True).num_rows,
+                    processos or os.cpu_count() or 1)
+    if len(partes) <= 1:
+        return ResumoAproximado.merge([_resumo_faixa(arrow_path, inicio, fim, categorias) for inicio, fim in partes])
+
+    # 'spawn' evita herdar por fork as threads do servidor Streamlit
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=len(partes), mp_context=contexto) as pool:
+        parciais = list(pool.map(_resumo_faixa, [arrow_path] * len(partes), *zip(*partes),
+                                 [categorias] * len(partes)))
+    return ResumoAproximado.merge(parciais)
@@ -0,0 +1,192 @@
+"""
+Execução local das consultas de `sql/` com DuckDB embarcado.
+
+A base colunar (Arrow IPC, via memory-map) é registrada sem cópia no DuckDB e
+exposta como `main_table`, com os nomes e tipos que os scripts PostgreSQL
+esperam. O dialeto do DuckDB já cobre FILTER, `::INT`, MODE() WITHIN GROUP,
+STDDEV, CORR e NTILE; a camada de compatibilidade cuida apenas do restante:
+
+- `KPIs_met >80%` vira `KPIs_met` (100 quando a meta foi atingida, 0 caso
+  contrário), de modo que `KPIs_met > 80` e `KPIs_met > 75` mantêm o sentido;
+- `awards_won?` vira o booleano `awards_won` e `is_promoted` é exposto como
+  booleano (os scripts usam `WHERE is_promoted` e `is_promoted::INT`);
+- `CREATE TABLE` é executado como `CREATE OR REPLACE TABLE`, permitindo
+  reexecutar os scripts de criação de tabelas;
+- DDL de desenho físico do PostgreSQL (índices com INCLUDE/parciais e
+  particionamento LIST) não tem equivalente e é ignorado com um aviso.
+
+Uso:
+    python streamlit/sql_engine.py sql/simple_queries/taxa_promo.sql
+"""
+
+import argparse
+import re
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+import pyarrow.feather as feather
+
+from data_store import DATA_PATH, PathLike, ensure_store
+
+SQL_DIR = Path(__file__).resolve().parent.parent / 'sql'
+
+MAIN_TABLE_VIEW = """
+CREATE OR REPLACE VIEW main_table AS
+SELECT
+    * EXCLUDE ("KPIs_met >80%", "awards_won?", is_promoted),
+    "KPIs_met >80%" * 100 AS KPIs_met,
+    "awards_won?"::BOOLEAN AS awards_won,
+    is_promoted::BOOLEAN AS is_promoted
+FROM base_processada
+"""
+
+_DDL_FISICO = re.compile(r'^\s*CREATE\s+(UNIQUE\s+)?INDEX\b|\bPARTITION\s+BY\s+LIST\b', re.IGNORECASE)
+_CREATE_TABLE = re.compile(r'^(\s*)CREATE\s+TABLE\s+(?!IF\s+NOT\s+EXISTS)(\w+)', re.IGNORECASE)
+_RETORNA_LINHAS = re.compile(r'^\s*(SELECT|WITH|VALUES|FROM|DESCRIBE|SHOW|PRAGMA|EXPLAIN)\b', re.IGNORECASE)
+
+
+class SQLCompatibilityWarning(UserWarning):
+    """Instrução PostgreSQL sem equivalente no motor local"""
+
+
+def dividir_instrucoes(sql: str) -> List[str]:
+    """
+    Divide um script em instruções, ignorando ';' em strings e comentários.
+
+    Os comentários são removidos; instruções vazias são descartadas.
+    """
+    instrucoes, atual = [], []
+    i, n = 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if sql.startswith('--', i):
+            fim = sql.find('\n', i)
+            i = n if fim < 0 else fim
+            continue
+        if sql.startswith('/*', i):
+            fim = sql.find('*/', i + 2)
+            i = n if fim < 0 else fim + 2
+            atual.append(' ')
+            continue
+        if c in ("'", '"'):
+            fim = i + 1
+            while fim < n:
+                if sql[fim] == c:
+                    if fim + 1 < n and sql[fim + 1] == c:
+                        fim += 2
+                        continue
+                    break
+                fim += 1
+            atual.append(sql[i:fim + 1])
+            i = fim + 1
+            continue
+        if c == ';':
+            instrucoes.append(''.join(atual))
+            atual = []
+        else:
+            atual.append(c)
+        i += 1
+    instrucoes.append(''.join(atual))
+    return [instrucao.strip() for instrucao in instrucoes if instrucao.strip()]
+
+
+class SQLEngine:
+    """Motor DuckDB com a base processada registrada como main_table"""
+
+    def __init__(self, source: PathLike = DATA_PATH, database: str = ':memory:'):
+        self.con = duckdb.connect(database)
+        self._lock = threading.Lock()
+        self._tabela = None
+        self.ignoradas: List[str] = []
+        self.recarregar(source)
+
+    def recarregar(self, source: PathLike = DATA_PATH) -> None:
+        """(Re)registra a versão atual da base colunar como main_table"""
+        tabela = feather.read_table(ensure_store(source), memory_map=True)
+        with self._lock:
+            self._tabela = tabela
+            self.con.register('base_processada', tabela)
+            self.con.execute(MAIN_TABLE_VIEW)
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Cursor próprio com a base registrada (registros não são compartilhados entre cursores)"""
+        with self._lock:
+            cursor = self.con.cursor()
+            cursor.register('base_processada', self._tabela)
+        return cursor
+
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+        """
+        Executa uma consulta e retorna o resultado como DataFrame.
+
+        Cada chamada usa um cursor próprio, permitindo uso concorrente entre sessões.
+        """
+        cursor = self.cursor()
+        try:
+            return cursor.execute(sql, params).df()
+        finally:
+            cursor.close()
+
+    def executar(self, sql: str) -> Optional[pd.DataFrame]:
+        """
+        Executa um script com uma ou mais instruções.
+
+        Retorna:
+            pd.DataFrame ou None: Resultado da última instrução que retorna linhas ou,
+            se o script apenas cria tabelas, o conteúdo da última tabela criada
+        """
+        resultado, criada = None, None
+        cursor = self.cursor()
+        try:
+            for instrucao in dividir_instrucoes(sql):
+                if _DDL_FISICO.search(instrucao):
+                    self.ignoradas.append(instrucao)
+                    warnings.warn(
+                        f"Instrução de desenho físico do PostgreSQL ignorada: {instrucao.splitlines()[0]}",
+                        SQLCompatibilityWarning, stacklevel=2
+                    )
+                    continue
+
+                criacao = _CREATE_TABLE.match(instrucao)
+                if criacao:
+                    criada = criacao.group(2)
+                    instrucao = _CREATE_TABLE.sub(r'\1CREATE OR REPLACE TABLE \2', instrucao, count=1)
+
+                cursor.execute(instrucao)
+                if _RETORNA_LINHAS.match(instrucao):
+                    resultado = cursor.df()
+
+            if resultado is None and criada is not None:
+                resultado = cursor.execute(f'SELECT * FROM {criada}').df()
+        finally:
+            cursor.close()
+        return resultado
+
+    def executar_arquivo(self, path: PathLike) -> Optional[pd.DataFrame]:
+        """Executa um arquivo .sql (caminho absoluto ou relativo à pasta sql/)"""
+        path = Path(path)
+        if not path.exists():
+            path = SQL_DIR / path
+        return self.executar(path.read_text(encoding='utf-8'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Executa scripts de sql/ sobre a base processada')
+    parser.add_argument('arquivos', nargs='+', help='Arquivos .sql')
+    parser.add_argument('--dados', default=str(DATA_PATH), help='CSV processado')
+    args = parser.parse_args()
+
+    engine = SQLEngine(args.dados)
+    for arquivo in args.arquivos:
+        print(f'-- {arquivo}')
+        resultado = engine.executar_arquivo(arquivo)
+        print(resultado.to_string(index=False) if resultado is not None else '(sem resultado)')
+        print()
+
+
+if __name__ == '__main__':
+    main()
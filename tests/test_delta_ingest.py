@@ -0,0 +1,90 @@
+"""
+Upsert incremental dos deltas (streamlit/delta_ingest.py).
+
+Depois de cada delta, a tabela em memória e o cubo têm de ser os mesmos de uma
+carga completa da base já com o upsert aplicado — inclusive quando o delta
+altera linhas de vários blocos, altera linhas anexadas por um delta anterior ou
+repete o mesmo employee_id (vale a última linha). Versões recentes continuam
+acessíveis por estado_de.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'benchmarks'))
+sys.path.insert(0, str(RAIZ / 'streamlit'))
+
+import delta_ingest  # noqa: E402
+from aggregate_cube import DIMENSOES, AggregateCube  # noqa: E402
+from gerar_dados import gerar_csv  # noqa: E402
+
+LINHAS = 5_000
+
+
+def _celulas(cubo: AggregateCube) -> pd.DataFrame:
+    cells = cubo.cells[cubo.cells['count'] != 0].astype({col: str for col in DIMENSOES})
+    return cells.sort_values(DIMENSOES).reset_index(drop=True)
+
+
+def _conferir(ingestor: delta_ingest.DeltaIngestor, esperado: pd.DataFrame) -> None:
+    tabela = ingestor.estado.tabela.to_pandas().sort_values('employee_id').reset_index(drop=True)
+    esperado = esperado.sort_values('employee_id').reset_index(drop=True)
+    pd.testing.assert_frame_equal(tabela, esperado[tabela.columns].astype(tabela.dtypes.to_dict()))
+
+    obtido, referencia = _celulas(ingestor.estado.cubo), _celulas(AggregateCube.build(tabela))
+    assert (obtido[DIMENSOES] == referencia[DIMENSOES]).all().all()
+    medidas = [col for col in obtido.columns if col not in DIMENSOES]
+    assert np.allclose(obtido[medidas].to_numpy(float), referencia[medidas].to_numpy(float))
+
+
+@pytest.fixture
+def ingestor(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> delta_ingest.DeltaIngestor:
+    # Blocos pequenos para que os deltas alterem vários blocos
+    monkeypatch.setattr(delta_ingest, 'BLOCO', 512)
+    return delta_ingest.DeltaIngestor(gerar_csv(LINHAS, tmp_path / 'train_atualizado.csv'))
+
+
+def test_upsert_igual_a_carga_completa(ingestor: delta_ingest.DeltaIngestor) -> None:
+    base = pd.read_csv(ingestor.source)
+    alteradas = base.sample(400, random_state=1).assign(avg_training_score=99)
+    incluidas = base.sample(50, random_state=2).assign(employee_id=lambda df: df['employee_id'] + 10 * LINHAS)
+    # O mesmo id duas vezes no delta: só a última linha conta
+    repetidas = alteradas.head(10).assign(avg_training_score=11)
+    pd.concat([alteradas, incluidas, repetidas, incluidas.head(5)]).to_csv(
+        ingestor.source.with_name('train_atualizado_delta1.csv'), index=False)
+
+    (relatorio,) = ingestor.verificar()
+    assert (relatorio['alterados'], relatorio['incluidos']) == (400, 50)
+    esperado = pd.concat([base[~base['employee_id'].isin(alteradas['employee_id'])],
+                          alteradas.iloc[10:], repetidas, incluidas])
+    _conferir(ingestor, esperado)
+
+    # Segundo delta sobre linhas anexadas pelo primeiro e sobre linhas da base
+    segundo = pd.concat([incluidas.head(20).assign(age=30), alteradas.tail(20).assign(gender='f')])
+    segundo.to_csv(ingestor.source.with_name('train_atualizado_delta2.csv'), index=False)
+    (relatorio,) = ingestor.verificar()
+    assert (relatorio['alterados'], relatorio['incluidos']) == (40, 0)
+    esperado = pd.concat([esperado[~esperado['employee_id'].isin(segundo['employee_id'])], segundo])
+    _conferir(ingestor, esperado)
+
+
+def test_estado_de_versoes_recentes(ingestor: delta_ingest.DeltaIngestor) -> None:
+    anterior = ingestor.estado
+    base = pd.read_csv(ingestor.source)
+    base.head(100).assign(employee_id=lambda df: df['employee_id'] + 10 * LINHAS).to_csv(
+        ingestor.source.with_name('train_atualizado_delta1.csv'), index=False)
+    ingestor.verificar()
+
+    # A versão anterior continua servindo a tabela e o cubo dela, não os da atual
+    assert ingestor.estado_de(anterior.versao) is anterior
+    assert ingestor.estado_de(ingestor.versao).tabela.num_rows == LINHAS + 100
+    for i in range(delta_ingest.HISTORICO):
+        base.iloc[[i]].to_csv(ingestor.source.with_name(f'train_atualizado_delta{i + 2}.csv'), index=False)
+        ingestor.verificar()
+    with pytest.raises(KeyError):
+        ingestor.estado_de(anterior.versao)
@@ -0,0 +1,41 @@
+"""
+Orçamento de inicialização (cold start) das páginas Streamlit.
+
+Cada página é medida em um interpretador novo por benchmarks/inicializacao.py
+sobre a base sintética, e as medianas de importação e primeira tela têm de
+ficar dentro de benchmarks/orcamento_inicializacao.json. Um import pesado no
+topo de um módulo ou um cálculo a mais na primeira renderização fazem o teste
+falhar com a métrica e o limite estourados.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / 'benchmarks'
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+import inicializacao  # noqa: E402
+
+LINHAS = 50_000
+
+
+@pytest.fixture(scope='module')
+def dados() -> Path:
+    """Base sintética com o armazenamento colunar e o cubo prontos (reaproveitada entre execuções)"""
+    return inicializacao.preparar_dados(LINHAS)
+
+
+@pytest.fixture(scope='module')
+def orcamento() -> dict:
+    return json.loads(inicializacao.ORCAMENTO_PATH.read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize('pagina', inicializacao.paginas_padrao())
+def test_pagina_dentro_do_orcamento(pagina: str, dados: Path, orcamento: dict) -> None:
+    resultado, estouros = inicializacao.avaliar_pagina(pagina, dados, orcamento)
+    tempos = ', '.join(f'{metrica} {resultado[metrica]:.2f}s' for metrica in inicializacao.METRICAS
+                       if resultado[metrica] is not None)
+    assert not estouros, f'{pagina} fora do orçamento: {"; ".join(estouros)} ({tempos})'